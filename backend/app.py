@@ -1,31 +1,113 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request, send_file, stream_with_context
 from apscheduler.schedulers.background import BackgroundScheduler
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager, create_access_token, get_jwt_identity, jwt_required, verify_jwt_in_request
 from functools import wraps
+import atexit
 from datetime import datetime, timedelta
-import re
+from itertools import islice
 import os
-import mysql.connector
-from mysql.connector import Error
 import requests
-from bs4 import BeautifulSoup
-from werkzeug.security import check_password_hash, generate_password_hash
-from scraper.competitor_scraper import scrape_competitor_file
+import hmac
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from auth.password_pool import PasswordPoolBusy, hash_password, shutdown_password_pool, verify_password
+from auth.throttle import FixedWindowLimiter
+from scraper.competitor_scraper import iter_competitor_file
+from scraper.adapters import resolve_adapter, resolve_competitor_adapter
+from storage.backends import DatabaseError as Error
+from storage.backends import get_connection, is_embedded_storage
+from storage.sqlite_schema import ensure_embedded_schema
+from storage.history_archive import archive_price_history, hot_window_start, read_archived_daily_totals
+from storage.snapshot_store import SnapshotWriter, record_snapshot
+from storage.partitions import (
+    drop_partitions_before,
+    ensure_monthly_partitions,
+    is_partitioning_enabled,
+    month_start,
+    use_utc_session,
+)
+from scraper.parse_pool import get_parse_pool, parse_html_bytes, shutdown_parse_pool
+from diagnostics.profiler import (
+    ProfileSession,
+    claim_pass_profile,
+    list_profiles,
+    pending_pass_profiles,
+    request_pass_profiles,
+    resolve_profile_path,
+)
+from scheduling.partition import (
+    acquire_competitor_lease,
+    current_node_id,
+    fetch_live_nodes,
+    is_distributed_mode,
+    owner_for,
+    register_heartbeat,
+    remove_node,
+)
+from scheduling.cadence import MenuFingerprint, record_scrape_outcome
+from scheduling.pass_metrics import ScrapePassStats, fetch_pass_metrics, record_pass_metrics
+from scheduling.health import (
+    CIRCUIT_OPEN,
+    EmptyMenuError,
+    begin_probe,
+    counts_against_source,
+    fetch_dead_letters,
+    record_scrape_failure,
+    record_scrape_success,
+    reset_competitor_health,
+)
+from pricing.summary import fetch_restaurant_summary, refresh_restaurant_summary
+from pricing.recommendations import bump_pricing_version, get_recommendations
+from pricing.reprice import apply_reprice, parse_reprice_payload
+from pricing.records import PriceColumns
+from pricing.menu_diff import PRICED_CHANGES, diff_menu, dish_key, fetch_menu_baseline, store_menu_changes
+from pricing.anomalies import screen_menu_changes, store_anomalies, store_series_state
+from pricing.forecast import run_price_forecasts
+from pricing.market_index import fetch_market_index, normalize_market_area, record_market_observations
+from pricing.bulk_io import (
+    detect_bulk_format,
+    iter_csv_export,
+    iter_import_rows,
+    iter_ndjson_export,
+    iter_text_lines,
+)
 
-from config import DB_CONFIG
+from config import (
+    ARCHIVE_CONFIG,
+    AUTH_CONFIG,
+    BULK_CONFIG,
+    CADENCE_CONFIG,
+    DB_CONFIG,
+    FORECAST_CONFIG,
+    PARTITION_CONFIG,
+    PROFILER_CONFIG,
+    SCHEDULER_CONFIG,
+    SCRAPER_CONFIG,
+    SNAPSHOT_CONFIG,
+    STREAM_CONFIG,
+)
 
 app = Flask(__name__)
 CORS(
     app,
     resources={r"/api/*": {"origins": "*"}},
-    allow_headers=["Content-Type", "Authorization"],
+    allow_headers=["Content-Type", "Authorization", PROFILER_CONFIG["request_header"]],
+    expose_headers=["X-Profile-Name"],
     methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
 )
 app.config["JWT_SECRET_KEY"] = "super-secret-key"
 jwt = JWTManager(app)
 scheduler = BackgroundScheduler()
+scrape_pass_lock = threading.Lock()
 ALLOWED_CATEGORY_LEVELS = {"low", "medium", "high", "premium"}
+login_ip_limiter = FixedWindowLimiter(
+    AUTH_CONFIG["ip_max_failures"], AUTH_CONFIG["ip_window_seconds"], AUTH_CONFIG["max_tracked_keys"]
+)
+login_account_limiter = FixedWindowLimiter(
+    AUTH_CONFIG["account_max_failures"], AUTH_CONFIG["account_window_seconds"], AUTH_CONFIG["max_tracked_keys"]
+)
 
 
 @app.before_request
@@ -34,13 +116,45 @@ def handle_api_preflight():
         return "", 200
 
 
+@app.before_request
+def start_request_profile():
+    requested_mode = request.headers.get(PROFILER_CONFIG["request_header"])
+    if not requested_mode or not request.path.startswith("/api/"):
+        return None
+
+    try:
+        verify_jwt_in_request(optional=True)
+        current_user_id = get_jwt_identity()
+    except Exception:
+        return None
+
+    current_user = get_user_by_id(current_user_id) if current_user_id else None
+    if not current_user or current_user.get("role") != "admin":
+        return None
+
+    g.profile_session = ProfileSession(request.endpoint or "request", requested_mode).start()
+    return None
+
+
+@app.after_request
+def finish_request_profile(response):
+    profile_session = g.pop("profile_session", None)
+    if profile_session:
+        profile_name = profile_session.stop()
+        if profile_name:
+            response.headers["X-Profile-Name"] = profile_name
+    return response
+
+
+@app.teardown_request
+def abort_request_profile(error=None):
+    profile_session = g.pop("profile_session", None)
+    if profile_session:
+        profile_session.stop()
+
+
 def get_db_connection():
-    return mysql.connector.connect(
-        host=DB_CONFIG["host"],
-        user=DB_CONFIG["user"],
-        password=DB_CONFIG["password"],
-        database=DB_CONFIG["database"],
-    )
+    return get_connection()
 
 
 def normalize_category_level(raw_value, default="medium"):
@@ -54,11 +168,7 @@ def ensure_database() -> None:
     connection = None
     cursor = None
     try:
-        connection = mysql.connector.connect(
-            host=DB_CONFIG["host"],
-            user=DB_CONFIG["user"],
-            password=DB_CONFIG["password"],
-        )
+        connection = get_connection(include_database=False)
         cursor = connection.cursor()
         cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{DB_CONFIG['database']}`")
         connection.commit()
@@ -315,6 +425,90 @@ def ensure_competitors_table() -> None:
         if not has_last_updated:
             cursor.execute("ALTER TABLE competitors ADD COLUMN last_updated DATETIME")
 
+        cursor.execute(
+            """
+            SELECT COUNT(*)
+            FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_SCHEMA = %s
+              AND TABLE_NAME = 'competitors'
+              AND COLUMN_NAME = 'scrape_interval_seconds'
+            """,
+            (DB_CONFIG["database"],),
+        )
+        has_scrape_interval = cursor.fetchone()[0] > 0
+        if not has_scrape_interval:
+            cursor.execute("ALTER TABLE competitors ADD COLUMN scrape_interval_seconds INT")
+
+        cursor.execute(
+            """
+            SELECT COUNT(*)
+            FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_SCHEMA = %s
+              AND TABLE_NAME = 'competitors'
+              AND COLUMN_NAME = 'next_scrape_at'
+            """,
+            (DB_CONFIG["database"],),
+        )
+        has_next_scrape_at = cursor.fetchone()[0] > 0
+        if not has_next_scrape_at:
+            cursor.execute("ALTER TABLE competitors ADD COLUMN next_scrape_at DATETIME")
+
+        cursor.execute(
+            """
+            SELECT COUNT(*)
+            FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_SCHEMA = %s
+              AND TABLE_NAME = 'competitors'
+              AND COLUMN_NAME = 'menu_fingerprint'
+            """,
+            (DB_CONFIG["database"],),
+        )
+        has_menu_fingerprint = cursor.fetchone()[0] > 0
+        if not has_menu_fingerprint:
+            cursor.execute("ALTER TABLE competitors ADD COLUMN menu_fingerprint CHAR(40)")
+
+        cursor.execute(
+            """
+            SELECT COUNT(*)
+            FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_SCHEMA = %s
+              AND TABLE_NAME = 'competitors'
+              AND COLUMN_NAME = 'last_changed_at'
+            """,
+            (DB_CONFIG["database"],),
+        )
+        has_last_changed_at = cursor.fetchone()[0] > 0
+        if not has_last_changed_at:
+            cursor.execute("ALTER TABLE competitors ADD COLUMN last_changed_at DATETIME")
+
+        cursor.execute(
+            """
+            SELECT COUNT(*)
+            FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_SCHEMA = %s
+              AND TABLE_NAME = 'competitors'
+              AND COLUMN_NAME = 'last_scraped_at'
+            """,
+            (DB_CONFIG["database"],),
+        )
+        has_last_scraped_at = cursor.fetchone()[0] > 0
+        if not has_last_scraped_at:
+            cursor.execute("ALTER TABLE competitors ADD COLUMN last_scraped_at DATETIME")
+
+        cursor.execute(
+            """
+            SELECT COUNT(*)
+            FROM INFORMATION_SCHEMA.STATISTICS
+            WHERE TABLE_SCHEMA = %s
+              AND TABLE_NAME = 'competitors'
+              AND INDEX_NAME = 'idx_competitors_next_scrape'
+            """,
+            (DB_CONFIG["database"],),
+        )
+        has_next_scrape_index = cursor.fetchone()[0] > 0
+        if not has_next_scrape_index:
+            cursor.execute("CREATE INDEX idx_competitors_next_scrape ON competitors (next_scrape_at, id)")
+
         cursor.execute(
             """
             SELECT COUNT(*)
@@ -363,10 +557,7 @@ def ensure_alerts_table() -> None:
                 new_price FLOAT,
                 message VARCHAR(255),
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                is_read BOOLEAN DEFAULT FALSE,
-                CONSTRAINT fk_alerts_restaurant
-                    FOREIGN KEY (restaurant_id) REFERENCES users(id)
-                    ON DELETE CASCADE
+                is_read BOOLEAN DEFAULT FALSE
             )
             """
         )
@@ -397,7 +588,13 @@ def ensure_alerts_table() -> None:
             (DB_CONFIG["database"],),
         )
         has_fk = cursor.fetchone()[0] > 0
-        if not has_fk:
+        if is_partitioning_enabled():
+            if has_fk:
+                cursor.execute("ALTER TABLE alerts DROP FOREIGN KEY fk_alerts_restaurant")
+            ensure_monthly_partitions(
+                cursor, DB_CONFIG["database"], "alerts", datetime.utcnow(), PARTITION_CONFIG["months_ahead"]
+            )
+        elif not has_fk:
             cursor.execute(
                 """
                 ALTER TABLE alerts
@@ -432,12 +629,35 @@ def ensure_price_history_table() -> None:
                 dish_name VARCHAR(255),
                 metric VARCHAR(32) NOT NULL,
                 price_value FLOAT,
+                competitor_id INT,
                 recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 INDEX idx_price_history_restaurant_metric_time (restaurant_id, metric, recorded_at),
                 INDEX idx_price_history_dish_metric_time (dish_id, metric, recorded_at)
             )
             """
         )
+
+        cursor.execute(
+            """
+            SELECT COUNT(*)
+            FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_SCHEMA = %s
+              AND TABLE_NAME = 'dish_price_history'
+              AND COLUMN_NAME = 'competitor_id'
+            """,
+            (DB_CONFIG["database"],),
+        )
+        has_competitor_id = cursor.fetchone()[0] > 0
+        if not has_competitor_id:
+            cursor.execute("ALTER TABLE dish_price_history ADD COLUMN competitor_id INT AFTER price_value")
+        if is_partitioning_enabled():
+            ensure_monthly_partitions(
+                cursor,
+                DB_CONFIG["database"],
+                "dish_price_history",
+                datetime.utcnow(),
+                PARTITION_CONFIG["months_ahead"],
+            )
         connection.commit()
     except Error as error:
         print(f"Failed to ensure price history table: {error}")
@@ -448,6 +668,412 @@ def ensure_price_history_table() -> None:
             connection.close()
 
 
+def ensure_restaurant_summaries_table() -> None:
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS restaurant_summaries (
+                restaurant_id INT PRIMARY KEY,
+                total_competitors INT NOT NULL DEFAULT 0,
+                dishes_tracked_total INT NOT NULL DEFAULT 0,
+                low_count INT NOT NULL DEFAULT 0,
+                low_dishes_tracked INT NOT NULL DEFAULT 0,
+                medium_count INT NOT NULL DEFAULT 0,
+                medium_dishes_tracked INT NOT NULL DEFAULT 0,
+                premium_count INT NOT NULL DEFAULT 0,
+                premium_dishes_tracked INT NOT NULL DEFAULT 0,
+                last_scraped_at DATETIME,
+                last_updated DATETIME,
+                refreshed_at DATETIME,
+                CONSTRAINT fk_restaurant_summaries_restaurant
+                    FOREIGN KEY (restaurant_id) REFERENCES users(id)
+                    ON DELETE CASCADE
+            )
+            """
+        )
+        connection.commit()
+    except Error as error:
+        print(f"Failed to ensure restaurant summaries table: {error}")
+    finally:
+        if cursor:
+            cursor.close()
+        if connection and connection.is_connected():
+            connection.close()
+
+
+def ensure_pricing_versions_table() -> None:
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS restaurant_pricing_versions (
+                restaurant_id INT PRIMARY KEY,
+                version BIGINT NOT NULL DEFAULT 0,
+                CONSTRAINT fk_pricing_versions_restaurant
+                    FOREIGN KEY (restaurant_id) REFERENCES users(id)
+                    ON DELETE CASCADE
+            )
+            """
+        )
+        connection.commit()
+    except Error as error:
+        print(f"Failed to ensure pricing versions table: {error}")
+    finally:
+        if cursor:
+            cursor.close()
+        if connection and connection.is_connected():
+            connection.close()
+
+
+def ensure_menu_tables() -> None:
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS competitor_menu_items (
+                competitor_id INT NOT NULL,
+                dish_key VARCHAR(255) NOT NULL,
+                dish_name VARCHAR(255) NOT NULL,
+                price DECIMAL(10, 2) NOT NULL,
+                ewma_mean DOUBLE,
+                ewma_var DOUBLE,
+                sample_count INT,
+                pending_price DECIMAL(10, 2),
+                pending_count INT NOT NULL DEFAULT 0,
+                PRIMARY KEY (competitor_id, dish_key),
+                CONSTRAINT fk_competitor_menu_items_competitor
+                    FOREIGN KEY (competitor_id) REFERENCES competitors(id)
+                    ON DELETE CASCADE
+            )
+            """
+        )
+        for column_name, column_definition in (
+            ("ewma_mean", "DOUBLE"),
+            ("ewma_var", "DOUBLE"),
+            ("sample_count", "INT"),
+            ("pending_price", "DECIMAL(10, 2)"),
+            ("pending_count", "INT NOT NULL DEFAULT 0"),
+        ):
+            cursor.execute(
+                """
+                SELECT COUNT(*)
+                FROM INFORMATION_SCHEMA.COLUMNS
+                WHERE TABLE_SCHEMA = %s
+                  AND TABLE_NAME = 'competitor_menu_items'
+                  AND COLUMN_NAME = %s
+                """,
+                (DB_CONFIG["database"], column_name),
+            )
+            if cursor.fetchone()[0] == 0:
+                cursor.execute(f"ALTER TABLE competitor_menu_items ADD COLUMN {column_name} {column_definition}")
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS price_anomalies (
+                id BIGINT PRIMARY KEY AUTO_INCREMENT,
+                competitor_id INT NOT NULL,
+                restaurant_id INT,
+                dish_name VARCHAR(255) NOT NULL,
+                observed_price DECIMAL(10, 2) NOT NULL,
+                expected_price DECIMAL(10, 2),
+                score DECIMAL(10, 2),
+                status VARCHAR(16) NOT NULL,
+                detected_at DATETIME(6) NOT NULL,
+                INDEX idx_price_anomalies_restaurant_time (restaurant_id, detected_at)
+            )
+            """
+        )
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS competitor_menu_changes (
+                id BIGINT PRIMARY KEY AUTO_INCREMENT,
+                competitor_id INT NOT NULL,
+                restaurant_id INT,
+                dish_name VARCHAR(255) NOT NULL,
+                change_type VARCHAR(16) NOT NULL,
+                old_price DECIMAL(10, 2),
+                new_price DECIMAL(10, 2),
+                change_percent DECIMAL(10, 2),
+                detected_at DATETIME(6) NOT NULL,
+                INDEX idx_menu_changes_restaurant_time (restaurant_id, detected_at),
+                INDEX idx_menu_changes_competitor_time (competitor_id, detected_at)
+            )
+            """
+        )
+        connection.commit()
+    except Error as error:
+        print(f"Failed to ensure competitor menu tables: {error}")
+    finally:
+        if cursor:
+            cursor.close()
+        if connection and connection.is_connected():
+            connection.close()
+
+
+def ensure_health_tables() -> None:
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS competitor_health (
+                competitor_id INT PRIMARY KEY,
+                state VARCHAR(16) NOT NULL DEFAULT 'closed',
+                consecutive_failures INT NOT NULL DEFAULT 0,
+                opened_at DATETIME,
+                probe_started_at DATETIME,
+                last_failure_kind VARCHAR(32),
+                last_failure_reason VARCHAR(1000),
+                last_failure_at DATETIME,
+                CONSTRAINT fk_competitor_health_competitor
+                    FOREIGN KEY (competitor_id) REFERENCES competitors(id)
+                    ON DELETE CASCADE
+            )
+            """
+        )
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS competitor_dead_letters (
+                id BIGINT PRIMARY KEY AUTO_INCREMENT,
+                competitor_id INT NOT NULL,
+                restaurant_id INT,
+                failure_kind VARCHAR(32) NOT NULL,
+                failure_reason VARCHAR(1000),
+                failure_count INT NOT NULL,
+                retry_at DATETIME,
+                created_at DATETIME NOT NULL,
+                resolved_at DATETIME,
+                INDEX idx_dead_letters_restaurant (restaurant_id, resolved_at, created_at),
+                INDEX idx_dead_letters_competitor (competitor_id, resolved_at),
+                CONSTRAINT fk_dead_letters_competitor
+                    FOREIGN KEY (competitor_id) REFERENCES competitors(id)
+                    ON DELETE CASCADE
+            )
+            """
+        )
+        connection.commit()
+    except Error as error:
+        print(f"Failed to ensure competitor health tables: {error}")
+    finally:
+        if cursor:
+            cursor.close()
+        if connection and connection.is_connected():
+            connection.close()
+
+
+def ensure_market_index_tables() -> None:
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS market_price_index (
+                area VARCHAR(100) NOT NULL,
+                dish_key VARCHAR(255) NOT NULL,
+                dish_name VARCHAR(255) NOT NULL,
+                observation_count BIGINT NOT NULL,
+                price_sum DOUBLE NOT NULL,
+                mean_price DOUBLE NOT NULL,
+                min_price DOUBLE NOT NULL,
+                max_price DOUBLE NOT NULL,
+                p25_price DOUBLE NOT NULL,
+                median_price DOUBLE NOT NULL,
+                p75_price DOUBLE NOT NULL,
+                updated_at DATETIME(6) NOT NULL,
+                PRIMARY KEY (area, dish_key)
+            )
+            """
+        )
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS market_index_sources (
+                area VARCHAR(100) NOT NULL DEFAULT '',
+                source_key CHAR(40) NOT NULL,
+                dish_key VARCHAR(255) NOT NULL,
+                price DECIMAL(10, 2) NOT NULL,
+                observed_at DATETIME(6) NOT NULL,
+                PRIMARY KEY (area, dish_key, source_key)
+            )
+            """
+        )
+
+        cursor.execute(
+            """
+            SELECT COUNT(*)
+            FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_SCHEMA = %s
+              AND TABLE_NAME = 'market_index_sources'
+              AND COLUMN_NAME = 'area'
+            """,
+            (DB_CONFIG["database"],),
+        )
+        has_area = cursor.fetchone()[0] > 0
+        if not has_area:
+            cursor.execute(
+                """
+                ALTER TABLE market_index_sources
+                ADD COLUMN area VARCHAR(100) NOT NULL DEFAULT '' FIRST,
+                DROP PRIMARY KEY,
+                ADD PRIMARY KEY (area, dish_key, source_key)
+                """
+            )
+
+        cursor.execute(
+            """
+            SELECT COUNT(*)
+            FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_SCHEMA = %s
+              AND TABLE_NAME = 'market_price_index'
+              AND COLUMN_NAME = 'sketch'
+            """,
+            (DB_CONFIG["database"],),
+        )
+        has_sketch = cursor.fetchone()[0] > 0
+        if has_sketch:
+            cursor.execute("ALTER TABLE market_price_index DROP COLUMN sketch")
+        connection.commit()
+    except Error as error:
+        print(f"Failed to ensure market index tables: {error}")
+    finally:
+        if cursor:
+            cursor.close()
+        if connection and connection.is_connected():
+            connection.close()
+
+
+def ensure_forecast_table() -> None:
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS price_forecasts (
+                restaurant_id INT NOT NULL,
+                dish_id INT NOT NULL,
+                forecast_date DATE NOT NULL,
+                predicted_price DECIMAL(10, 2) NOT NULL,
+                lower_price DECIMAL(10, 2) NOT NULL,
+                upper_price DECIMAL(10, 2) NOT NULL,
+                generated_at DATETIME(6) NOT NULL,
+                PRIMARY KEY (restaurant_id, dish_id, forecast_date),
+                INDEX idx_price_forecasts_generated (generated_at)
+            )
+            """
+        )
+        connection.commit()
+    except Error as error:
+        print(f"Failed to ensure price forecasts table: {error}")
+    finally:
+        if cursor:
+            cursor.close()
+        if connection and connection.is_connected():
+            connection.close()
+
+
+def ensure_snapshot_table() -> None:
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS competitor_snapshots (
+                id BIGINT PRIMARY KEY AUTO_INCREMENT,
+                competitor_id INT NOT NULL,
+                restaurant_id INT,
+                source VARCHAR(16) NOT NULL,
+                content_hash CHAR(64) NOT NULL,
+                byte_size INT NOT NULL,
+                captured_at DATETIME(6) NOT NULL,
+                INDEX idx_competitor_snapshots_competitor_time (competitor_id, captured_at),
+                INDEX idx_competitor_snapshots_time (captured_at)
+            )
+            """
+        )
+        connection.commit()
+    except Error as error:
+        print(f"Failed to ensure competitor snapshots table: {error}")
+    finally:
+        if cursor:
+            cursor.close()
+        if connection and connection.is_connected():
+            connection.close()
+
+
+def ensure_scheduler_tables() -> None:
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS scheduler_nodes (
+                node_id VARCHAR(191) PRIMARY KEY,
+                heartbeat_at DATETIME(6) NOT NULL,
+                INDEX idx_scheduler_nodes_heartbeat (heartbeat_at)
+            )
+            """
+        )
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS competitor_leases (
+                competitor_id INT PRIMARY KEY,
+                node_id VARCHAR(191) NOT NULL,
+                lease_token CHAR(32) NOT NULL,
+                lease_until DATETIME(6) NOT NULL,
+                CONSTRAINT fk_competitor_leases_competitor
+                    FOREIGN KEY (competitor_id) REFERENCES competitors(id)
+                    ON DELETE CASCADE
+            )
+            """
+        )
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS scrape_pass_metrics (
+                id BIGINT PRIMARY KEY AUTO_INCREMENT,
+                node_id VARCHAR(191) NOT NULL,
+                started_at DATETIME(6) NOT NULL,
+                duration_seconds DECIMAL(10, 3) NOT NULL,
+                budget_seconds INT NOT NULL,
+                due_count INT NOT NULL,
+                scraped_count INT NOT NULL,
+                failed_count INT NOT NULL,
+                deferred_count INT NOT NULL,
+                max_lag_seconds DECIMAL(12, 3) NOT NULL,
+                avg_lag_seconds DECIMAL(12, 3) NOT NULL,
+                max_write_wait_seconds DECIMAL(10, 3) NOT NULL,
+                budget_exhausted TINYINT(1) NOT NULL DEFAULT 0,
+                INDEX idx_scrape_pass_metrics_started (started_at)
+            )
+            """
+        )
+        connection.commit()
+    except Error as error:
+        print(f"Failed to ensure scheduler tables: {error}")
+    finally:
+        if cursor:
+            cursor.close()
+        if connection and connection.is_connected():
+            connection.close()
+
+
 def log_price_history(connection, restaurant_id, dish_id, dish_name, metric, price_value):
     if not connection or not restaurant_id or not metric:
         return
@@ -474,6 +1100,41 @@ def log_price_history(connection, restaurant_id, dish_id, dish_name, metric, pri
             history_cursor.close()
 
 
+def log_price_history_batch(connection, history_rows, competitor_id=None):
+    if not connection:
+        return 0
+
+    parsed_rows = []
+    for restaurant_id, dish_id, dish_name, metric, price_value in history_rows:
+        if not restaurant_id or not metric:
+            continue
+        try:
+            parsed_rows.append((restaurant_id, dish_id, dish_name, metric, float(price_value), competitor_id))
+        except (TypeError, ValueError):
+            continue
+
+    if not parsed_rows:
+        return 0
+
+    history_cursor = None
+    try:
+        history_cursor = connection.cursor()
+        history_cursor.executemany(
+            """
+            INSERT INTO dish_price_history (restaurant_id, dish_id, dish_name, metric, price_value, competitor_id)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            """,
+            parsed_rows,
+        )
+        return len(parsed_rows)
+    except Error as error:
+        print(f"Failed to log price history: {error}")
+        return 0
+    finally:
+        if history_cursor:
+            history_cursor.close()
+
+
 def ensure_users_table() -> None:
     connection = None
     cursor = None
@@ -541,6 +1202,53 @@ def ensure_users_table() -> None:
         if not has_category_level_column:
             cursor.execute("ALTER TABLE users ADD COLUMN category_level VARCHAR(20) DEFAULT 'medium'")
 
+        cursor.execute(
+            """
+            SELECT COUNT(*)
+            FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_SCHEMA = %s
+              AND TABLE_NAME = 'users'
+              AND COLUMN_NAME = 'market_area'
+            """,
+            (DB_CONFIG["database"],),
+        )
+        has_market_area_column = cursor.fetchone()[0] > 0
+        if not has_market_area_column:
+            cursor.execute("ALTER TABLE users ADD COLUMN market_area VARCHAR(100) NOT NULL DEFAULT ''")
+
+        cursor.execute(
+            """
+            SELECT COUNT(*)
+            FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_SCHEMA = %s
+              AND TABLE_NAME = 'users'
+              AND COLUMN_NAME = 'email_normalized'
+            """,
+            (DB_CONFIG["database"],),
+        )
+        has_email_normalized_column = cursor.fetchone()[0] > 0
+        if not has_email_normalized_column:
+            cursor.execute(
+                """
+                ALTER TABLE users
+                ADD COLUMN email_normalized VARCHAR(255) AS (LOWER(TRIM(email))) STORED
+                """
+            )
+
+        cursor.execute(
+            """
+            SELECT COUNT(*)
+            FROM INFORMATION_SCHEMA.STATISTICS
+            WHERE TABLE_SCHEMA = %s
+              AND TABLE_NAME = 'users'
+              AND INDEX_NAME = 'idx_users_email_normalized'
+            """,
+            (DB_CONFIG["database"],),
+        )
+        has_email_normalized_index = cursor.fetchone()[0] > 0
+        if not has_email_normalized_index:
+            cursor.execute("CREATE INDEX idx_users_email_normalized ON users (email_normalized)")
+
         cursor.execute(
             """
             SELECT COUNT(*)
@@ -620,7 +1328,7 @@ def get_user_by_id(user_id: str):
         cursor = connection.cursor(dictionary=True)
         cursor.execute(
             """
-            SELECT id, restaurant_id, restaurant_name, owner_name, email, category_level, role
+            SELECT id, restaurant_id, restaurant_name, owner_name, email, category_level, market_area, role
             FROM users
             WHERE id = %s
             """,
@@ -657,7 +1365,21 @@ def role_required(required_role: str):
     return decorator
 
 
-def scrape_competitor_website(website_url: str):
+def new_snapshot_writer():
+    return SnapshotWriter() if SNAPSHOT_CONFIG["enabled"] else None
+
+
+def save_snapshot(connection, competitor, source, snapshot, captured_at) -> None:
+    if not snapshot:
+        return
+    try:
+        record_snapshot(connection, competitor, source, snapshot, captured_at)
+    except OSError as error:
+        snapshot.discard()
+        print(f"Failed to store snapshot for competitor {competitor.get('id')}: {error}")
+
+
+def scrape_competitor_website(website_url: str, snapshot=None, adapter=None):
     response = requests.get(
         website_url,
         timeout=12,
@@ -666,147 +1388,527 @@ def scrape_competitor_website(website_url: str):
         },
     )
     response.raise_for_status()
+    if snapshot:
+        snapshot.write(response.content)
+
+    adapter = adapter or resolve_adapter(website_url=website_url)
+    if SCRAPER_CONFIG["parse_backend"] == "process":
+        title, observations = parse_html_bytes(response.content, adapter.name, response.encoding or "utf-8")
+    else:
+        title, dishes = adapter.extract(response.text)
+        observations = PriceColumns(dishes)
 
-    soup = BeautifulSoup(response.text, "html.parser")
-    title = soup.title.string.strip() if soup.title and soup.title.string else "Unknown title"
-    page_text = soup.get_text(" ", strip=True)
+    return {
+        "title": (title or "Unknown title")[:500],
+        "dishes_tracked": len(observations),
+        "dishes": observations,
+    }
 
-    price_tokens = re.findall(r"(?:₹|Rs\.?|INR)\s*\d+(?:\.\d{1,2})?", page_text, flags=re.IGNORECASE)
-    dishes_tracked = len(set(price_tokens))
+
+def iter_due_competitors(connection, now):
+    cursor = connection.cursor(dictionary=True, buffered=False)
+    try:
+        cursor.execute(
+            """
+            SELECT c.id, c.restaurant_id, c.mock_file, c.platform, c.website_url, c.next_scrape_at,
+                   c.scrape_interval_seconds, c.menu_fingerprint,
+                   h.state AS health_state, h.consecutive_failures, h.opened_at AS circuit_opened_at
+            FROM competitors c
+            LEFT JOIN competitor_health h ON h.competitor_id = c.id
+            WHERE c.next_scrape_at IS NULL OR c.next_scrape_at <= %s
+            ORDER BY c.next_scrape_at IS NOT NULL, c.next_scrape_at, c.id
+            """,
+            (now,),
+        )
+        for competitor in cursor:
+            yield competitor
+    finally:
+        cursor.close()
+
+
+def fetch_competitor_menu(competitor):
+    snapshot = new_snapshot_writer()
+    try:
+        mock_file_name = competitor.get("mock_file") or ""
+        if mock_file_name:
+            snapshot_source = "file"
+            adapter = resolve_competitor_adapter(competitor, snapshot_source)
+            observations = PriceColumns(iter_competitor_file(mock_file_name, snapshot=snapshot, adapter=adapter))
+        else:
+            snapshot_source = "website"
+            adapter = resolve_competitor_adapter(competitor, snapshot_source)
+            observations = scrape_competitor_website(
+                competitor.get("website_url"), snapshot=snapshot, adapter=adapter
+            )["dishes"]
+
+        fingerprint = MenuFingerprint()
+        fingerprint.update(observations)
+        menu_digest = fingerprint.hexdigest()
+        if menu_digest is None:
+            raise EmptyMenuError("No dishes could be extracted from the page")
+    except Exception:
+        if snapshot:
+            snapshot.discard()
+        raise
 
     return {
-        "title": title,
-        "dishes_tracked": dishes_tracked,
+        "source": snapshot_source,
+        "snapshot": snapshot,
+        "observations": observations,
+        "menu_digest": menu_digest,
+        "fetched_at": time.monotonic(),
     }
 
 
+def write_competitor_menu(connection, competitor, fetched, now) -> None:
+    snapshot = fetched["snapshot"]
+    try:
+        menu_digest = fetched["menu_digest"]
+        quarantined_count = 0
+        if menu_digest != competitor.get("menu_fingerprint"):
+            _, quarantined_count = apply_competitor_menu(connection, competitor, fetched["observations"], now)
+        record_scrape_outcome(connection, competitor, menu_digest, now, hold_fingerprint=bool(quarantined_count))
+        record_scrape_success(connection, competitor, now)
+        save_snapshot(connection, competitor, fetched["source"], snapshot, now)
+        connection.commit()
+    except Exception:
+        if snapshot:
+            snapshot.discard()
+        raise
+
+
+def record_competitor_failure(connection, competitor, error, now) -> None:
+    connection.rollback()
+    print(f"Auto scrape failed for competitor {competitor.get('id')}: {error}")
+    if not counts_against_source(error):
+        return
+
+    try:
+        state = record_scrape_failure(connection, competitor, error, now)
+        connection.commit()
+        if state == CIRCUIT_OPEN:
+            print(f"Circuit open for competitor {competitor.get('id')}")
+    except Error as health_error:
+        connection.rollback()
+        print(f"Failed to record scrape failure for competitor {competitor.get('id')}: {health_error}")
+
+
 def auto_scrape_all():
     connection = None
-    competitors_cursor = None
-    dishes_cursor = None
+    read_connection = None
     try:
         connection = get_db_connection()
-        competitors_cursor = connection.cursor(dictionary=True)
-        competitors_cursor.execute(
-            """
-            SELECT id, restaurant_id, mock_file
-            FROM competitors
-            """
-        )
-        competitors = competitors_cursor.fetchall()
+        read_connection = get_db_connection()
+
+        distributed = is_distributed_mode()
+        node_id = current_node_id()
+        live_nodes = []
+        if distributed:
+            register_heartbeat(connection, node_id)
+            connection.commit()
+            live_nodes = fetch_live_nodes(connection)
+            if node_id not in live_nodes:
+                live_nodes.append(node_id)
+
+        now = datetime.utcnow()
+        lease_seconds = max(1, int(CADENCE_CONFIG["min_interval_seconds"] * 0.9))
+        scraped_restaurant_ids = set()
+        stats = ScrapePassStats(node_id, now, SCHEDULER_CONFIG["pass_budget_seconds"])
+        pending_fetches = {}
+
+        def write_completed(block):
+            done, _ = wait(pending_fetches, timeout=None if block else 0, return_when=FIRST_COMPLETED)
+            for future in done:
+                competitor = pending_fetches.pop(future)
+                try:
+                    fetched = future.result()
+                    stats.record_write_wait(fetched["fetched_at"])
+                    write_competitor_menu(connection, competitor, fetched, now)
+                except Exception as error:
+                    stats.failed_count += 1
+                    record_competitor_failure(connection, competitor, error, now)
+                    continue
+                stats.scraped_count += 1
+                scraped_restaurant_ids.add(competitor.get("restaurant_id"))
+
+        with ThreadPoolExecutor(
+            max_workers=max(1, SCHEDULER_CONFIG["fetch_workers"]), thread_name_prefix="scrape-fetch"
+        ) as fetch_pool:
+            for competitor in iter_due_competitors(read_connection, now):
+                if not competitor.get("mock_file") and not competitor.get("website_url"):
+                    continue
+                if distributed and owner_for(competitor.get("id"), live_nodes) != node_id:
+                    continue
+                if stats.budget_exhausted():
+                    stats.deferred_count += 1
+                    continue
 
-        for competitor in competitors:
-            try:
-                mock_file_name = competitor.get("mock_file") or ""
-                if not mock_file_name:
+                try:
+                    if distributed:
+                        if not acquire_competitor_lease(connection, competitor.get("id"), node_id, lease_seconds):
+                            continue
+                        connection.commit()
+                    if begin_probe(connection, competitor, now):
+                        connection.commit()
+                except Error as error:
+                    connection.rollback()
+                    print(f"Failed to claim competitor {competitor.get('id')}: {error}")
                     continue
 
-                scrape_result = scrape_competitor_file(mock_file_name)
-                scraped_data = scrape_result.get("data", []) if isinstance(scrape_result, dict) else []
+                stats.record_due(competitor)
+                while len(pending_fetches) >= SCHEDULER_CONFIG["max_pending_writes"]:
+                    write_completed(block=True)
+                pending_fetches[fetch_pool.submit(fetch_competitor_menu, competitor)] = competitor
+                write_completed(block=False)
+
+            while pending_fetches:
+                write_completed(block=True)
+
+        for restaurant_id in scraped_restaurant_ids:
+            refresh_restaurant_summary(connection, restaurant_id)
+        stats.finish()
+        record_pass_metrics(connection, stats)
+        connection.commit()
+        print(
+            f"Auto scraping completed: {stats.scraped_count} scraped, {stats.failed_count} failed, "
+            f"{stats.deferred_count} deferred in {stats.duration_seconds:.1f}s"
+        )
+    except Error as error:
+        print(f"Auto scraping failed: {error}")
+    finally:
+        if read_connection and read_connection.is_connected():
+            read_connection.close()
+        if connection and connection.is_connected():
+            connection.close()
+
+
+def iter_batches(items, batch_size):
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def fetch_scraped_competitor_prices(connection, restaurant_id, dish_names):
+    dish_keys = list({dish_key(str(dish_name)) for dish_name in dish_names if dish_name})
+    if not restaurant_id or not dish_keys:
+        return {}
+
+    placeholders = ", ".join(["%s"] * len(dish_keys))
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            f"""
+            SELECT i.dish_key, AVG(i.price)
+            FROM competitor_menu_items i
+            JOIN competitors c ON c.id = i.competitor_id
+            WHERE c.restaurant_id = %s AND i.dish_key IN ({placeholders})
+            GROUP BY i.dish_key
+            """,
+            (restaurant_id, *dish_keys),
+        )
+        return {key: round(float(average_price), 2) for key, average_price in cursor.fetchall()}
+    finally:
+        cursor.close()
+
 
-                apply_scraped_prices(connection, competitor.get("restaurant_id"), scraped_data)
-            except Exception as error:
-                print(f"Auto scrape failed for competitor {competitor.get('id')}: {error}")
+def apply_scraped_prices(connection, restaurant_id, menu_changes, competitor_id=None):
+    if not restaurant_id:
+        return 0
+
+    lookup_cursor = None
+    update_cursor = None
+    alert_cursor = None
+    updated_dishes = 0
+
+    try:
+        lookup_cursor = connection.cursor()
+        update_cursor = connection.cursor()
+        alert_cursor = connection.cursor()
+
+        priced_changes = (change for change in menu_changes if change.change_type in PRICED_CHANGES)
+        for batch in iter_batches(priced_changes, STREAM_CONFIG["write_batch_size"]):
+            batch_names = list({change.dish_name for change in batch})
+            if not batch_names:
                 continue
 
-        connection.commit()
-        print("Auto scraping completed")
+            placeholders = ", ".join(["%s"] * len(batch_names))
+            lookup_cursor.execute(
+                f"""
+                SELECT id, dish_name, competitor_avg
+                FROM dishes
+                WHERE restaurant_id = %s AND dish_name IN ({placeholders})
+                ORDER BY id ASC
+                """,
+                (restaurant_id, *batch_names),
+            )
+            existing_dishes = {}
+            for dish_id, dish_name, competitor_avg in lookup_cursor.fetchall():
+                if dish_name not in existing_dishes:
+                    existing_dishes[dish_name] = [dish_id, competitor_avg]
+
+            alert_rows = []
+            update_rows = []
+            history_rows = []
+            for change in batch:
+                dish_name = change.dish_name
+                new_price = change.new_price
+
+                existing_dish = existing_dishes.get(dish_name)
+                if not existing_dish:
+                    continue
+
+                dish_id, old_price = existing_dish
+                if old_price is not None and new_price == float(old_price):
+                    continue
+
+                if old_price is not None and new_price < float(old_price):
+                    message = f"Competitor dropped price for {dish_name} from {old_price} to {new_price}"
+                    alert_rows.append((restaurant_id, dish_name, old_price, new_price, message))
+
+                update_rows.append((new_price, dish_name, restaurant_id))
+                history_rows.append((restaurant_id, dish_id, dish_name, "competitor_avg", new_price))
+                existing_dish[1] = new_price
+
+            if alert_rows:
+                alert_cursor.executemany(
+                    """
+                    INSERT INTO alerts (restaurant_id, dish_name, old_price, new_price, message)
+                    VALUES (%s, %s, %s, %s, %s)
+                    """,
+                    alert_rows,
+                )
+
+            if update_rows:
+                update_cursor.executemany(
+                    """
+                    UPDATE dishes
+                    SET competitor_avg = %s
+                    WHERE dish_name = %s AND restaurant_id = %s
+                    """,
+                    update_rows,
+                )
+                updated_dishes += max(update_cursor.rowcount, 0)
+                log_price_history_batch(connection, history_rows, competitor_id)
+                bump_pricing_version(connection, restaurant_id)
+    finally:
+        if lookup_cursor:
+            lookup_cursor.close()
+        if update_cursor:
+            update_cursor.close()
+        if alert_cursor:
+            alert_cursor.close()
+
+    return updated_dishes
+
+
+def apply_competitor_menu(connection, competitor, observations, detected_at):
+    menu_changes = diff_menu(fetch_menu_baseline(connection, competitor["id"]), observations)
+    accepted_changes, anomalies, series_rows = screen_menu_changes(connection, competitor, menu_changes)
+    store_menu_changes(connection, competitor, accepted_changes, detected_at)
+    store_series_state(connection, series_rows)
+    store_anomalies(connection, competitor, anomalies, detected_at)
+    record_market_observations(connection, competitor, accepted_changes, detected_at)
+    updated_dishes = apply_scraped_prices(
+        connection, competitor.get("restaurant_id"), accepted_changes, competitor_id=competitor.get("id")
+    )
+    return updated_dishes, len(menu_changes) - len(accepted_changes)
+
+
+def auto_scrape_all_job():
+    if not scrape_pass_lock.acquire(blocking=False):
+        print("Previous auto scrape pass is still running; skipping this tick")
+        return
+
+    try:
+        if claim_pass_profile():
+            with ProfileSession("auto_scrape_all"):
+                auto_scrape_all()
+        else:
+            auto_scrape_all()
+    finally:
+        scrape_pass_lock.release()
+
+
+def scheduler_heartbeat_job():
+    connection = None
+    try:
+        connection = get_db_connection()
+        register_heartbeat(connection, current_node_id())
+        connection.commit()
+    except Error as error:
+        print(f"Scheduler heartbeat failed: {error}")
+    finally:
+        if connection and connection.is_connected():
+            connection.close()
+
+
+def owns_maintenance_job(connection, job_name) -> bool:
+    if not is_distributed_mode():
+        return True
+    return owner_for(job_name, fetch_live_nodes(connection)) == current_node_id()
+
+
+def archive_price_history_job():
+    connection = None
+    read_connection = None
+    try:
+        connection = get_db_connection()
+        if not owns_maintenance_job(connection, "price_history_archive"):
+            return
+        use_utc_session(connection)
+
+        read_connection = get_db_connection()
+        use_utc_session(read_connection)
+        cutoff = hot_window_start(datetime.utcnow())
+        if is_partitioning_enabled():
+            cutoff = month_start(cutoff)
+            archived_rows = archive_price_history(read_connection, connection, cutoff, delete_rows=False)
+            cursor = connection.cursor()
+            try:
+                drop_partitions_before(cursor, DB_CONFIG["database"], "dish_price_history", cutoff)
+            finally:
+                cursor.close()
+        else:
+            archived_rows = archive_price_history(read_connection, connection, cutoff)
+        connection.commit()
+        if archived_rows:
+            print(f"Archived {archived_rows} price history rows older than {cutoff:%Y-%m-%d}")
+    except (Error, OSError) as error:
+        if connection and connection.is_connected():
+            connection.rollback()
+        print(f"Price history archive failed: {error}")
+    finally:
+        if read_connection and read_connection.is_connected():
+            read_connection.close()
+        if connection and connection.is_connected():
+            connection.close()
+
+
+def price_forecast_job():
+    connection = None
+    read_connection = None
+    try:
+        connection = get_db_connection()
+        if not owns_maintenance_job(connection, "price_forecast"):
+            return
+
+        read_connection = get_db_connection()
+        series_count, written_rows, elapsed_seconds = run_price_forecasts(
+            read_connection, connection, datetime.utcnow()
+        )
+        print(f"Forecast {series_count} price series ({written_rows} rows) in {elapsed_seconds:.1f}s")
     except Error as error:
-        print(f"Auto scraping failed: {error}")
+        if connection and connection.is_connected():
+            connection.rollback()
+        print(f"Price forecasting failed: {error}")
     finally:
-        if competitors_cursor:
-            competitors_cursor.close()
+        if read_connection and read_connection.is_connected():
+            read_connection.close()
         if connection and connection.is_connected():
             connection.close()
 
 
-def apply_scraped_prices(connection, restaurant_id, scraped_data):
-    if not restaurant_id:
-        return 0
-
-    lookup_cursor = None
-    update_cursor = None
-    alert_cursor = None
-    updated_dishes = 0
-
+def partition_maintenance_job():
+    connection = None
+    cursor = None
     try:
-        lookup_cursor = connection.cursor(dictionary=True)
-        update_cursor = connection.cursor()
-        alert_cursor = connection.cursor()
-
-        for item in scraped_data:
-            dish_name = item.get("dish_name")
-            new_price = item.get("price")
-
-            if dish_name is None or new_price is None:
-                continue
-
-            lookup_cursor.execute(
-                """
-                SELECT id, competitor_avg
-                FROM dishes
-                WHERE dish_name = %s AND restaurant_id = %s
-                LIMIT 1
-                """,
-                (dish_name, restaurant_id),
-            )
-            existing_dish = lookup_cursor.fetchone()
-
-            if not existing_dish:
-                continue
-
-            old_price = existing_dish.get("competitor_avg")
+        connection = get_db_connection()
+        if not owns_maintenance_job(connection, "partition_maintenance"):
+            return
+        use_utc_session(connection)
 
-            if old_price is not None and float(new_price) < float(old_price):
-                message = f"Competitor dropped price for {dish_name} from {old_price} to {new_price}"
-                alert_cursor.execute(
-                    """
-                    INSERT INTO alerts (restaurant_id, dish_name, old_price, new_price, message)
-                    VALUES (%s, %s, %s, %s, %s)
-                    """,
-                    (restaurant_id, dish_name, old_price, new_price, message),
+        now = datetime.utcnow()
+        alerts_cutoff = now - timedelta(days=PARTITION_CONFIG["alerts_retention_days"])
+        cursor = connection.cursor()
+        if is_partitioning_enabled():
+            for table_name in ("dish_price_history", "alerts"):
+                ensure_monthly_partitions(
+                    cursor, DB_CONFIG["database"], table_name, now, PARTITION_CONFIG["months_ahead"]
                 )
+            drop_partitions_before(cursor, DB_CONFIG["database"], "alerts", month_start(alerts_cutoff))
+        else:
+            cursor.execute("DELETE FROM alerts WHERE created_at < %s", (alerts_cutoff,))
+        cursor.execute(
+            "DELETE FROM scrape_pass_metrics WHERE started_at < %s",
+            (now - timedelta(days=SCHEDULER_CONFIG["pass_metrics_retention_days"]),),
+        )
+        connection.commit()
+    except Error as error:
+        print(f"Partition maintenance failed: {error}")
+    finally:
+        if cursor:
+            cursor.close()
+        if connection and connection.is_connected():
+            connection.close()
 
-            update_cursor.execute(
-                """
-                UPDATE dishes
-                SET competitor_avg = %s
-                WHERE dish_name = %s AND restaurant_id = %s
-                """,
-                (new_price, dish_name, restaurant_id),
-            )
 
-            if update_cursor.rowcount > 0:
-                log_price_history(
-                    connection,
-                    restaurant_id,
-                    existing_dish.get("id"),
-                    dish_name,
-                    "competitor_avg",
-                    new_price,
-                )
-                updated_dishes += update_cursor.rowcount
+def leave_scheduler_cluster():
+    connection = None
+    try:
+        connection = get_db_connection()
+        remove_node(connection, current_node_id())
+        connection.commit()
+    except Error as error:
+        print(f"Failed to leave scheduler cluster: {error}")
     finally:
-        if lookup_cursor:
-            lookup_cursor.close()
-        if update_cursor:
-            update_cursor.close()
-        if alert_cursor:
-            alert_cursor.close()
-
-    return updated_dishes
+        if connection and connection.is_connected():
+            connection.close()
 
 
 def start_scheduler() -> None:
     try:
         scheduler.add_job(
-            func=auto_scrape_all,
+            func=auto_scrape_all_job,
             trigger="interval",
-            minutes=5,
+            seconds=CADENCE_CONFIG["tick_seconds"],
             id="auto_scrape_all_job",
+            max_instances=1,
+            coalesce=True,
             replace_existing=True,
         )
 
+        scheduler.add_job(
+            func=archive_price_history_job,
+            trigger="cron",
+            hour=ARCHIVE_CONFIG["run_hour_utc"],
+            timezone="UTC",
+            id="archive_price_history_job",
+            replace_existing=True,
+        )
+
+        scheduler.add_job(
+            func=price_forecast_job,
+            trigger="interval",
+            hours=FORECAST_CONFIG["refit_hours"],
+            id="price_forecast_job",
+            max_instances=1,
+            coalesce=True,
+            replace_existing=True,
+        )
+
+        scheduler.add_job(
+            func=partition_maintenance_job,
+            trigger="cron",
+            hour=PARTITION_CONFIG["maintenance_hour_utc"],
+            timezone="UTC",
+            id="partition_maintenance_job",
+            replace_existing=True,
+        )
+
+        if is_distributed_mode():
+            scheduler.add_job(
+                func=scheduler_heartbeat_job,
+                trigger="interval",
+                seconds=SCHEDULER_CONFIG["heartbeat_seconds"],
+                id="scheduler_heartbeat_job",
+                replace_existing=True,
+            )
+            scheduler_heartbeat_job()
+            atexit.register(leave_scheduler_cluster)
+
         if not scheduler.running:
             scheduler.start()
     except Exception as error:
@@ -821,6 +1923,7 @@ def register_user():
     email = payload.get("email")
     password = payload.get("password")
     requested_category_level = normalize_category_level(payload.get("category_level"))
+    requested_market_area = normalize_market_area(payload.get("market_area"))
 
     if not owner_name or not email or not password:
         return jsonify({"error": "owner_name, email, and password are required"}), 400
@@ -849,7 +1952,10 @@ def register_user():
     try:
         connection = get_db_connection()
         check_cursor = connection.cursor(dictionary=True)
-        check_cursor.execute("SELECT id FROM users WHERE email = %s", (email,))
+        check_cursor.execute(
+            "SELECT id FROM users WHERE email_normalized = %s",
+            (email.strip().lower(),),
+        )
         existing_user = check_cursor.fetchone()
 
         if existing_user:
@@ -860,19 +1966,23 @@ def register_user():
             assigned_restaurant_id = current_admin_user.get("restaurant_id") or current_admin_user["id"]
             effective_restaurant_name = current_admin_user.get("restaurant_name")
             assigned_category_level = normalize_category_level(current_admin_user.get("category_level"))
+            assigned_market_area = normalize_market_area(current_admin_user.get("market_area"))
         else:
             assigned_role = "admin"
             assigned_restaurant_id = None
             effective_restaurant_name = restaurant_name
             assigned_category_level = requested_category_level
+            assigned_market_area = requested_market_area
 
-        hashed_password = generate_password_hash(password)
+        hashed_password = hash_password(password)
 
         insert_cursor = connection.cursor()
         insert_cursor.execute(
             """
-            INSERT INTO users (restaurant_id, restaurant_name, owner_name, email, password, category_level, role)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            INSERT INTO users (
+                restaurant_id, restaurant_name, owner_name, email, password, category_level, market_area, role
+            )
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
             """,
             (
                 assigned_restaurant_id,
@@ -881,6 +1991,7 @@ def register_user():
                 email,
                 hashed_password,
                 assigned_category_level,
+                assigned_market_area,
                 assigned_role,
             ),
         )
@@ -895,6 +2006,8 @@ def register_user():
         connection.commit()
 
         return jsonify({"message": "User registered successfully"}), 201
+    except PasswordPoolBusy:
+        return jsonify({"error": "Server is busy, please retry"}), 503, {"Retry-After": "1"}
     except Error as error:
         return jsonify({"error": f"Failed to register user: {error}"}), 500
     finally:
@@ -930,20 +2043,25 @@ def create_staff_user():
     try:
         connection = get_db_connection()
         check_cursor = connection.cursor(dictionary=True)
-        check_cursor.execute("SELECT id FROM users WHERE email = %s", (email,))
+        check_cursor.execute(
+            "SELECT id FROM users WHERE email_normalized = %s",
+            (email.strip().lower(),),
+        )
         existing_user = check_cursor.fetchone()
 
         if existing_user:
             return jsonify({"error": "Email already exists"}), 409
 
-        hashed_password = generate_password_hash(password)
+        hashed_password = hash_password(password)
         restaurant_id = admin_user.get("restaurant_id") or admin_user.get("id")
 
         insert_cursor = connection.cursor()
         insert_cursor.execute(
             """
-            INSERT INTO users (restaurant_id, restaurant_name, owner_name, email, password, category_level, role)
-            VALUES (%s, %s, %s, %s, %s, %s, 'staff')
+            INSERT INTO users (
+                restaurant_id, restaurant_name, owner_name, email, password, category_level, market_area, role
+            )
+            VALUES (%s, %s, %s, %s, %s, %s, %s, 'staff')
             """,
             (
                 restaurant_id,
@@ -952,11 +2070,14 @@ def create_staff_user():
                 email,
                 hashed_password,
                 normalize_category_level(admin_user.get("category_level")),
+                normalize_market_area(admin_user.get("market_area")),
             ),
         )
         connection.commit()
 
         return jsonify({"message": "Staff account created successfully"}), 201
+    except PasswordPoolBusy:
+        return jsonify({"error": "Server is busy, please retry"}), 503, {"Retry-After": "1"}
     except Error as error:
         return jsonify({"error": f"Failed to create staff user: {error}"}), 500
     finally:
@@ -1061,6 +2182,11 @@ def delete_staff_user(staff_id: int):
             connection.close()
 
 
+def record_login_failure(client_ip, email) -> None:
+    login_ip_limiter.hit(client_ip)
+    login_account_limiter.hit(email)
+
+
 @app.route("/api/login", methods=["POST"])
 def login_user():
     payload = request.get_json(silent=True) or {}
@@ -1070,6 +2196,11 @@ def login_user():
     if not email or not password:
         return jsonify({"error": "email and password are required"}), 400
 
+    client_ip = request.remote_addr or "unknown"
+    retry_after = login_ip_limiter.retry_after(client_ip) or login_account_limiter.retry_after(email)
+    if retry_after:
+        return jsonify({"error": "Too many login attempts, please retry later"}), 429, {"Retry-After": str(retry_after)}
+
     connection = None
     cursor = None
     try:
@@ -1079,24 +2210,25 @@ def login_user():
             """
             SELECT id, restaurant_id, restaurant_name, owner_name, email, password, category_level, role
             FROM users
-            WHERE LOWER(TRIM(email)) = %s
+            WHERE email_normalized = %s
             """,
             (email,),
         )
         user = cursor.fetchone()
 
         if not user:
+            record_login_failure(client_ip, email)
             return jsonify({"error": "Invalid email or password"}), 401
 
         stored_password = user.get("password") or ""
         is_valid_password = False
 
         if stored_password.startswith(("pbkdf2:", "scrypt:")):
-            is_valid_password = check_password_hash(stored_password, password)
+            is_valid_password = verify_password(stored_password, password)
         else:
-            is_valid_password = stored_password == password
+            is_valid_password = hmac.compare_digest(stored_password.encode(), str(password).encode())
             if is_valid_password:
-                upgraded_password = generate_password_hash(password)
+                upgraded_password = hash_password(password)
                 cursor.execute(
                     "UPDATE users SET password = %s WHERE id = %s",
                     (upgraded_password, user["id"]),
@@ -1104,8 +2236,10 @@ def login_user():
                 connection.commit()
 
         if not is_valid_password:
+            record_login_failure(client_ip, email)
             return jsonify({"error": "Invalid email or password"}), 401
 
+        login_account_limiter.reset(email)
         access_token = create_access_token(identity=str(user["id"]))
 
         return (
@@ -1125,6 +2259,8 @@ def login_user():
             ),
             200,
         )
+    except PasswordPoolBusy:
+        return jsonify({"error": "Server is busy, please retry"}), 503, {"Retry-After": "1"}
     except Error as error:
         return jsonify({"error": f"Failed to login user: {error}"}), 500
     finally:
@@ -1213,8 +2349,10 @@ def create_competitor():
             """,
             (restaurant_id, restaurant_name, platform, website_url, status, datetime.utcnow(), mock_file),
         )
+        competitor_id = cursor.lastrowid
+        refresh_restaurant_summary(connection, restaurant_id)
         connection.commit()
-        return jsonify({"message": "Competitor added successfully", "id": cursor.lastrowid}), 201
+        return jsonify({"message": "Competitor added successfully", "id": competitor_id}), 201
     except Error as error:
         return jsonify({"error": f"Failed to add competitor: {error}"}), 500
     finally:
@@ -1254,11 +2392,14 @@ def update_competitor(competitor_id: int):
             """,
             (status, datetime.utcnow(), competitor_id, restaurant_id),
         )
-        connection.commit()
 
         if cursor.rowcount == 0:
+            connection.rollback()
             return jsonify({"error": "Competitor not found or unauthorized"}), 404
 
+        refresh_restaurant_summary(connection, restaurant_id)
+        connection.commit()
+
         return jsonify({"message": "Competitor updated successfully"}), 200
     except Error as error:
         return jsonify({"error": f"Failed to update competitor: {error}"}), 500
@@ -1290,11 +2431,14 @@ def delete_competitor(competitor_id: int):
             "DELETE FROM competitors WHERE id = %s AND restaurant_id = %s",
             (competitor_id, restaurant_id),
         )
-        connection.commit()
 
         if cursor.rowcount == 0:
+            connection.rollback()
             return jsonify({"error": "Competitor not found or unauthorized"}), 404
 
+        refresh_restaurant_summary(connection, restaurant_id)
+        connection.commit()
+
         return jsonify({"message": "Competitor deleted successfully"}), 200
     except Error as error:
         return jsonify({"error": f"Failed to delete competitor: {error}"}), 500
@@ -1325,7 +2469,7 @@ def scrape_competitor(competitor_id: int):
         read_cursor = connection.cursor(dictionary=True)
         read_cursor.execute(
             """
-            SELECT id, website_url
+            SELECT id, restaurant_id, platform, website_url
             FROM competitors
             WHERE id = %s AND restaurant_id = %s
             """,
@@ -1336,7 +2480,20 @@ def scrape_competitor(competitor_id: int):
         if not competitor:
             return jsonify({"error": "Competitor not found or unauthorized"}), 404
 
-        scrape_result = scrape_competitor_website(competitor["website_url"])
+        snapshot = new_snapshot_writer()
+        try:
+            scrape_result = scrape_competitor_website(
+                competitor["website_url"],
+                snapshot=snapshot,
+                adapter=resolve_competitor_adapter(competitor, "website"),
+            )
+        except requests.RequestException:
+            if snapshot:
+                snapshot.discard()
+            raise
+        scraped_at = datetime.utcnow()
+        updated_dishes, _ = apply_competitor_menu(connection, competitor, scrape_result["dishes"], scraped_at)
+        save_snapshot(connection, competitor, "website", snapshot, scraped_at)
 
         write_cursor = connection.cursor()
         write_cursor.execute(
@@ -1345,17 +2502,20 @@ def scrape_competitor(competitor_id: int):
             SET dishes_tracked = %s,
                 scraped_title = %s,
                 last_updated = %s,
+                last_scraped_at = %s,
                 status = 'Active'
             WHERE id = %s AND restaurant_id = %s
             """,
             (
                 scrape_result["dishes_tracked"],
                 scrape_result["title"],
-                datetime.utcnow(),
+                scraped_at,
+                scraped_at,
                 competitor_id,
                 restaurant_id,
             ),
         )
+        refresh_restaurant_summary(connection, restaurant_id)
         connection.commit()
 
         return (
@@ -1364,26 +2524,284 @@ def scrape_competitor(competitor_id: int):
                     "message": "Competitor scraped successfully",
                     "title": scrape_result["title"],
                     "dishes_tracked": scrape_result["dishes_tracked"],
+                    "updated": updated_dishes,
                 }
             ),
             200,
         )
-    except requests.RequestException as error:
-        return jsonify({"error": f"Failed to scrape competitor website: {error}"}), 502
+    except requests.RequestException as error:
+        return jsonify({"error": f"Failed to scrape competitor website: {error}"}), 502
+    except Error as error:
+        return jsonify({"error": f"Failed to scrape competitor: {error}"}), 500
+    finally:
+        if read_cursor:
+            read_cursor.close()
+        if write_cursor:
+            write_cursor.close()
+        if connection and connection.is_connected():
+            connection.close()
+
+
+@app.route("/api/scrape/<int:competitor_id>", methods=["POST"])
+@jwt_required()
+def scrape_competitor_data(competitor_id: int):
+    current_user_id = get_jwt_identity()
+    current_user = get_user_by_id(current_user_id)
+
+    if not current_user:
+        return jsonify({"error": "User not found"}), 404
+
+    restaurant_id = current_user.get("restaurant_id") or current_user.get("id")
+
+    connection = None
+    competitor_cursor = None
+    try:
+        connection = get_db_connection()
+        competitor_cursor = connection.cursor(dictionary=True)
+        competitor_cursor.execute(
+            """
+            SELECT id, restaurant_id, mock_file, platform, website_url
+            FROM competitors
+            WHERE id = %s AND restaurant_id = %s
+            """,
+            (competitor_id, restaurant_id),
+        )
+        competitor = competitor_cursor.fetchone()
+
+        if not competitor:
+            return jsonify({"error": "Unauthorized"}), 403
+
+        snapshot = new_snapshot_writer()
+        adapter = resolve_competitor_adapter(competitor, "file")
+        observations = PriceColumns(
+            iter_competitor_file(competitor.get("mock_file"), snapshot=snapshot, adapter=adapter)
+        )
+        scraped_at = datetime.utcnow()
+        updated_dishes, _ = apply_competitor_menu(connection, competitor, observations, scraped_at)
+        competitor_cursor.execute(
+            "UPDATE competitors SET last_scraped_at = %s WHERE id = %s",
+            (scraped_at, competitor_id),
+        )
+        save_snapshot(connection, competitor, "file", snapshot, scraped_at)
+        refresh_restaurant_summary(connection, restaurant_id)
+
+        connection.commit()
+
+        return jsonify({"message": "Scraping completed", "updated": updated_dishes}), 200
+    except Error as error:
+        return jsonify({"error": f"Failed to scrape competitor data: {error}"}), 500
+    finally:
+        if competitor_cursor:
+            competitor_cursor.close()
+        if connection and connection.is_connected():
+            connection.close()
+
+
+@app.route("/api/menu-changes", methods=["GET"])
+@jwt_required()
+def get_menu_changes():
+    current_user_id = get_jwt_identity()
+    current_user = get_user_by_id(current_user_id)
+
+    if not current_user:
+        return jsonify({"error": "User not found"}), 404
+
+    restaurant_id = current_user.get("restaurant_id") or current_user.get("id")
+    limit = max(1, min(request.args.get("limit", 100, type=int) or 100, 500))
+    competitor_id = request.args.get("competitor_id", type=int)
+
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor(dictionary=True)
+        query = """
+            SELECT id, competitor_id, dish_name, change_type, old_price, new_price, change_percent, detected_at
+            FROM competitor_menu_changes
+            WHERE restaurant_id = %s
+        """
+        params = [restaurant_id]
+        if competitor_id is not None:
+            query += " AND competitor_id = %s"
+            params.append(competitor_id)
+        query += " ORDER BY detected_at DESC, id DESC LIMIT %s"
+        params.append(limit)
+
+        cursor.execute(query, tuple(params))
+        changes = cursor.fetchall()
+        for change in changes:
+            for field in ("old_price", "new_price", "change_percent"):
+                if change[field] is not None:
+                    change[field] = float(change[field])
+        return jsonify(changes), 200
+    except Error as error:
+        return jsonify({"error": f"Failed to fetch menu changes: {error}"}), 500
+    finally:
+        if cursor:
+            cursor.close()
+        if connection and connection.is_connected():
+            connection.close()
+
+
+@app.route("/api/market-index", methods=["GET"])
+@jwt_required()
+def get_market_index():
+    current_user_id = get_jwt_identity()
+    current_user = get_user_by_id(current_user_id)
+
+    if not current_user:
+        return jsonify({"error": "User not found"}), 404
+
+    restaurant_id = current_user.get("restaurant_id") or current_user.get("id")
+    requested_dish = (request.args.get("dish_name") or "").strip()
+
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor(dictionary=True)
+        if requested_dish:
+            dishes = [{"id": None, "dish_name": requested_dish, "our_price": None}]
+        else:
+            cursor.execute(
+                "SELECT id, dish_name, our_price FROM dishes WHERE restaurant_id = %s ORDER BY id ASC",
+                (restaurant_id,),
+            )
+            dishes = cursor.fetchall()
+
+        entries = fetch_market_index(
+            connection,
+            current_user.get("market_area"),
+            [dish_key(dish["dish_name"]) for dish in dishes if dish["dish_name"]],
+        )
+        return jsonify(
+            {
+                "market_area": normalize_market_area(current_user.get("market_area")) or None,
+                "dishes": [
+                    {
+                        "dish_id": dish["id"],
+                        "dish_name": dish["dish_name"],
+                        "our_price": float(dish["our_price"]) if dish["our_price"] is not None else None,
+                        "market": entries.get(dish_key(dish["dish_name"])) if dish["dish_name"] else None,
+                    }
+                    for dish in dishes
+                ],
+            }
+        ), 200
+    except Error as error:
+        return jsonify({"error": f"Failed to fetch market index: {error}"}), 500
+    finally:
+        if cursor:
+            cursor.close()
+        if connection and connection.is_connected():
+            connection.close()
+
+
+@app.route("/api/price-forecasts", methods=["GET"])
+@jwt_required()
+def get_price_forecasts():
+    current_user_id = get_jwt_identity()
+    current_user = get_user_by_id(current_user_id)
+
+    if not current_user:
+        return jsonify({"error": "User not found"}), 404
+
+    restaurant_id = current_user.get("restaurant_id") or current_user.get("id")
+    dish_id = request.args.get("dish_id", type=int)
+
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor(dictionary=True)
+        query = """
+            SELECT f.dish_id, d.dish_name, f.forecast_date, f.predicted_price, f.lower_price, f.upper_price,
+                   f.generated_at
+            FROM price_forecasts f
+            JOIN dishes d ON d.id = f.dish_id
+            WHERE f.restaurant_id = %s
+        """
+        params = [restaurant_id]
+        if dish_id is not None:
+            query += " AND f.dish_id = %s"
+            params.append(dish_id)
+        query += " ORDER BY f.dish_id ASC, f.forecast_date ASC"
+
+        cursor.execute(query, tuple(params))
+        forecasts = {}
+        for row in cursor.fetchall():
+            dish_forecast = forecasts.setdefault(
+                row["dish_id"],
+                {
+                    "dish_id": row["dish_id"],
+                    "dish_name": row["dish_name"],
+                    "generated_at": row["generated_at"],
+                    "points": [],
+                },
+            )
+            dish_forecast["points"].append(
+                {
+                    "date": str(row["forecast_date"]),
+                    "predicted_price": float(row["predicted_price"]),
+                    "lower_price": float(row["lower_price"]),
+                    "upper_price": float(row["upper_price"]),
+                }
+            )
+        return jsonify(list(forecasts.values())), 200
+    except Error as error:
+        return jsonify({"error": f"Failed to fetch price forecasts: {error}"}), 500
+    finally:
+        if cursor:
+            cursor.close()
+        if connection and connection.is_connected():
+            connection.close()
+
+
+@app.route("/api/price-anomalies", methods=["GET"])
+@jwt_required()
+def get_price_anomalies():
+    current_user_id = get_jwt_identity()
+    current_user = get_user_by_id(current_user_id)
+
+    if not current_user:
+        return jsonify({"error": "User not found"}), 404
+
+    restaurant_id = current_user.get("restaurant_id") or current_user.get("id")
+    limit = max(1, min(request.args.get("limit", 100, type=int) or 100, 500))
+
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute(
+            """
+            SELECT id, competitor_id, dish_name, observed_price, expected_price, score, status, detected_at
+            FROM price_anomalies
+            WHERE restaurant_id = %s
+            ORDER BY detected_at DESC, id DESC
+            LIMIT %s
+            """,
+            (restaurant_id, limit),
+        )
+        anomalies = cursor.fetchall()
+        for anomaly in anomalies:
+            for field in ("observed_price", "expected_price", "score"):
+                if anomaly[field] is not None:
+                    anomaly[field] = float(anomaly[field])
+        return jsonify(anomalies), 200
     except Error as error:
-        return jsonify({"error": f"Failed to scrape competitor: {error}"}), 500
+        return jsonify({"error": f"Failed to fetch price anomalies: {error}"}), 500
     finally:
-        if read_cursor:
-            read_cursor.close()
-        if write_cursor:
-            write_cursor.close()
+        if cursor:
+            cursor.close()
         if connection and connection.is_connected():
             connection.close()
 
 
-@app.route("/api/scrape/<int:competitor_id>", methods=["POST"])
+@app.route("/api/scrape/dead-letters", methods=["GET"])
 @jwt_required()
-def scrape_competitor_data(competitor_id: int):
+def get_scrape_dead_letters():
     current_user_id = get_jwt_identity()
     current_user = get_user_by_id(current_user_id)
 
@@ -1391,38 +2809,52 @@ def scrape_competitor_data(competitor_id: int):
         return jsonify({"error": "User not found"}), 404
 
     restaurant_id = current_user.get("restaurant_id") or current_user.get("id")
+    limit = max(1, min(request.args.get("limit", 100, type=int) or 100, 500))
+    include_resolved = request.args.get("include_resolved", "").lower() in ("1", "true", "yes")
 
     connection = None
-    competitor_cursor = None
     try:
         connection = get_db_connection()
-        competitor_cursor = connection.cursor(dictionary=True)
-        competitor_cursor.execute(
-            """
-            SELECT id, restaurant_id, mock_file
-            FROM competitors
-            WHERE id = %s AND restaurant_id = %s
-            """,
-            (competitor_id, restaurant_id),
-        )
-        competitor = competitor_cursor.fetchone()
+        dead_letters = fetch_dead_letters(connection, restaurant_id, include_resolved=include_resolved, limit=limit)
+        return jsonify(dead_letters), 200
+    except Error as error:
+        return jsonify({"error": f"Failed to fetch dead letters: {error}"}), 500
+    finally:
+        if connection and connection.is_connected():
+            connection.close()
 
-        if not competitor:
-            return jsonify({"error": "Unauthorized"}), 403
 
-        scrape_result = scrape_competitor_file(competitor.get("mock_file"))
-        scraped_data = scrape_result.get("data", []) if isinstance(scrape_result, dict) else []
+@app.route("/api/competitors/<int:competitor_id>/health/reset", methods=["POST"])
+@jwt_required()
+def reset_competitor_circuit(competitor_id):
+    current_user_id = get_jwt_identity()
+    current_user = get_user_by_id(current_user_id)
+
+    if not current_user:
+        return jsonify({"error": "User not found"}), 404
+
+    restaurant_id = current_user.get("restaurant_id") or current_user.get("id")
 
-        updated_dishes = apply_scraped_prices(connection, restaurant_id, scraped_data)
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        cursor.execute(
+            "SELECT id FROM competitors WHERE id = %s AND restaurant_id = %s",
+            (competitor_id, restaurant_id),
+        )
+        if not cursor.fetchone():
+            return jsonify({"error": "Competitor not found or unauthorized"}), 404
 
+        reset_competitor_health(connection, competitor_id, datetime.utcnow())
         connection.commit()
-
-        return jsonify({"message": "Scraping completed", "updated": updated_dishes}), 200
+        return jsonify({"message": "Competitor health reset; it will be scraped on the next pass"}), 200
     except Error as error:
-        return jsonify({"error": f"Failed to scrape competitor data: {error}"}), 500
+        return jsonify({"error": f"Failed to reset competitor health: {error}"}), 500
     finally:
-        if competitor_cursor:
-            competitor_cursor.close()
+        if cursor:
+            cursor.close()
         if connection and connection.is_connected():
             connection.close()
 
@@ -1535,6 +2967,10 @@ def update_restaurant_profile():
     owner_name = (payload.get("owner_name") or "").strip()
     email = (payload.get("email") or "").strip().lower()
     category_level = normalize_category_level(payload.get("category_level"), default=None)
+    if "market_area" in payload:
+        market_area = normalize_market_area(payload.get("market_area"))
+    else:
+        market_area = normalize_market_area(current_user.get("market_area"))
 
     if not restaurant_name or not owner_name or not email:
         return jsonify({"error": "restaurant_name, owner_name, and email are required"}), 400
@@ -1567,10 +3003,11 @@ def update_restaurant_profile():
             """
             UPDATE users
             SET restaurant_name = %s,
-                category_level = %s
+                category_level = %s,
+                market_area = %s
             WHERE restaurant_id = %s
             """,
-            (restaurant_name, category_level, restaurant_id),
+            (restaurant_name, category_level, market_area, restaurant_id),
         )
 
         write_cursor.execute(
@@ -1654,13 +3091,17 @@ def create_dish():
     our_price = payload.get("our_price")
     competitor_avg = payload.get("competitor_avg")
 
-    if dish_name is None or category is None or our_price is None or competitor_avg is None:
-        return jsonify({"error": "dish_name, category, our_price, and competitor_avg are required"}), 400
+    if dish_name is None or category is None or our_price is None:
+        return jsonify({"error": "dish_name, category, and our_price are required"}), 400
 
     connection = None
     cursor = None
     try:
         connection = get_db_connection()
+        if competitor_avg is None:
+            scraped_prices = fetch_scraped_competitor_prices(connection, current_restaurant_id, [dish_name])
+            competitor_avg = scraped_prices.get(dish_key(str(dish_name)))
+
         cursor = connection.cursor()
         cursor.execute(
             """
@@ -1686,6 +3127,7 @@ def create_dish():
             "competitor_avg",
             competitor_avg,
         )
+        bump_pricing_version(connection, current_restaurant_id)
         connection.commit()
         return jsonify({"message": "Dish created successfully", "id": created_dish_id}), 201
     except Error as error:
@@ -1697,6 +3139,209 @@ def create_dish():
             connection.close()
 
 
+@app.route("/api/dishes/import", methods=["POST"])
+@jwt_required()
+def import_dishes():
+    current_user_id = get_jwt_identity()
+    current_user = get_user_by_id(current_user_id)
+
+    if not current_user:
+        return jsonify({"error": "User not found"}), 404
+
+    if current_user.get("role") != "admin":
+        return jsonify({"error": "Unauthorized"}), 403
+
+    current_restaurant_id = current_user.get("restaurant_id") or current_user.get("id")
+
+    upload = request.files.get("file")
+    if upload:
+        binary_stream = upload.stream
+        bulk_format = detect_bulk_format(request.args.get("format"), upload.mimetype, upload.filename)
+    else:
+        binary_stream = request.stream
+        bulk_format = detect_bulk_format(request.args.get("format"), request.mimetype, None)
+
+    if not bulk_format:
+        return jsonify({"error": "format must be csv or ndjson"}), 400
+
+    inserted_count = 0
+    rejected_count = 0
+    errors = []
+
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor()
+
+        import_rows = iter_import_rows(iter_text_lines(binary_stream), bulk_format)
+        for batch in iter_batches(import_rows, BULK_CONFIG["import_batch_size"]):
+            valid_rows = []
+            for line_number, dish_row, error in batch:
+                if error:
+                    rejected_count += 1
+                    if len(errors) < BULK_CONFIG["max_reported_errors"]:
+                        errors.append({"line": line_number, "error": error})
+                    continue
+                valid_rows.append(dish_row)
+
+            if not valid_rows:
+                continue
+
+            # Rows that omit competitor_avg are seeded from scraped competitor prices.
+            unpriced_names = [dish_row[0] for dish_row in valid_rows if dish_row[3] is None]
+            if unpriced_names:
+                scraped_prices = fetch_scraped_competitor_prices(connection, current_restaurant_id, unpriced_names)
+                valid_rows = [
+                    (
+                        dish_name,
+                        category,
+                        our_price,
+                        scraped_prices.get(dish_key(dish_name)) if competitor_avg is None else competitor_avg,
+                    )
+                    for dish_name, category, our_price, competitor_avg in valid_rows
+                ]
+
+            # One insert per row so each history row gets its dish's own lastrowid; ids of a
+            # multi-row insert are not guaranteed consecutive and can interleave with other writers.
+            history_rows = []
+            for dish_name, category, our_price, competitor_avg in valid_rows:
+                cursor.execute(
+                    """
+                    INSERT INTO dishes (restaurant_id, dish_name, category, our_price, competitor_avg)
+                    VALUES (%s, %s, %s, %s, %s)
+                    """,
+                    (current_restaurant_id, dish_name, category, our_price, competitor_avg),
+                )
+                inserted_id = cursor.lastrowid
+                history_rows.append((current_restaurant_id, inserted_id, dish_name, "our_price", our_price))
+                history_rows.append((current_restaurant_id, inserted_id, dish_name, "competitor_avg", competitor_avg))
+            log_price_history_batch(connection, history_rows)
+            bump_pricing_version(connection, current_restaurant_id)
+            connection.commit()
+            inserted_count += len(valid_rows)
+
+        return (
+            jsonify(
+                {
+                    "message": "Dish import completed",
+                    "inserted": inserted_count,
+                    "rejected": rejected_count,
+                    "errors": errors,
+                }
+            ),
+            200,
+        )
+    except Error as error:
+        return (
+            jsonify(
+                {
+                    "error": f"Failed to import dishes: {error}",
+                    "inserted": inserted_count,
+                    "rejected": rejected_count,
+                    "errors": errors,
+                }
+            ),
+            500,
+        )
+    finally:
+        if cursor:
+            cursor.close()
+        if connection and connection.is_connected():
+            connection.close()
+
+
+@app.route("/api/dishes/export", methods=["GET"])
+@jwt_required()
+def export_dishes():
+    current_user_id = get_jwt_identity()
+    current_user = get_user_by_id(current_user_id)
+
+    if not current_user:
+        return jsonify({"error": "User not found"}), 404
+
+    current_restaurant_id = current_user.get("restaurant_id") or current_user.get("id")
+    bulk_format = detect_bulk_format(request.args.get("format") or "csv", None, None)
+
+    if not bulk_format:
+        return jsonify({"error": "format must be csv or ndjson"}), 400
+
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor(buffered=False)
+        cursor.execute(
+            """
+            SELECT id, dish_name, category, our_price, competitor_avg, created_at
+            FROM dishes
+            WHERE restaurant_id = %s
+            ORDER BY id ASC
+            """,
+            (current_restaurant_id,),
+        )
+    except Error as error:
+        if cursor:
+            cursor.close()
+        if connection and connection.is_connected():
+            connection.close()
+        return jsonify({"error": f"Failed to export dishes: {error}"}), 500
+
+    encode_rows = iter_csv_export if bulk_format == "csv" else iter_ndjson_export
+
+    def generate_export():
+        try:
+            yield from encode_rows(cursor)
+        finally:
+            cursor.close()
+            if connection.is_connected():
+                connection.close()
+
+    return Response(
+        stream_with_context(generate_export()),
+        mimetype="text/csv" if bulk_format == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f"attachment; filename=dishes.{bulk_format}"},
+    )
+
+
+@app.route("/api/dishes/reprice", methods=["POST"])
+@jwt_required()
+def reprice_dishes():
+    current_user_id = get_jwt_identity()
+    current_user = get_user_by_id(current_user_id)
+
+    if not current_user:
+        return jsonify({"error": "User not found"}), 404
+
+    if current_user.get("role") != "admin":
+        return jsonify({"error": "Unauthorized"}), 403
+
+    current_restaurant_id = current_user.get("restaurant_id") or current_user.get("id")
+
+    payload = request.get_json(silent=True) or {}
+    changes, rule, validation_error = parse_reprice_payload(payload, BULK_CONFIG["max_reprice_changes"])
+    if validation_error:
+        return jsonify({"error": validation_error}), 400
+
+    connection = None
+    try:
+        connection = get_db_connection()
+        connection.start_transaction()
+        applied = apply_reprice(connection, current_restaurant_id, changes=changes, rule=rule)
+        if applied:
+            bump_pricing_version(connection, current_restaurant_id)
+        connection.commit()
+
+        return jsonify({"message": "Dishes repriced successfully", "updated": len(applied), "changes": applied}), 200
+    except Error as error:
+        if connection and connection.is_connected():
+            connection.rollback()
+        return jsonify({"error": f"Failed to reprice dishes: {error}"}), 500
+    finally:
+        if connection and connection.is_connected():
+            connection.close()
+
+
 @app.route("/api/dishes/<int:dish_id>", methods=["PUT"])
 @jwt_required()
 def update_dish(dish_id: int):
@@ -1717,8 +3362,8 @@ def update_dish(dish_id: int):
     our_price = payload.get("our_price")
     competitor_avg = payload.get("competitor_avg")
 
-    if dish_name is None or category is None or our_price is None or competitor_avg is None:
-        return jsonify({"error": "dish_name, category, our_price, and competitor_avg are required"}), 400
+    if dish_name is None or category is None or our_price is None:
+        return jsonify({"error": "dish_name, category, and our_price are required"}), 400
 
     connection = None
     owner_cursor = None
@@ -1727,7 +3372,7 @@ def update_dish(dish_id: int):
         connection = get_db_connection()
         owner_cursor = connection.cursor(dictionary=True)
         owner_cursor.execute(
-            "SELECT id, restaurant_id FROM dishes WHERE id = %s",
+            "SELECT id, restaurant_id, dish_name, competitor_avg FROM dishes WHERE id = %s",
             (dish_id,),
         )
         dish = owner_cursor.fetchone()
@@ -1738,6 +3383,14 @@ def update_dish(dish_id: int):
         if str(dish["restaurant_id"]) != str(current_restaurant_id):
             return jsonify({"error": "Unauthorized"}), 403
 
+        # An omitted competitor_avg keeps the stored value, or is re-seeded from scraped
+        # competitor prices when the dish is renamed.
+        if competitor_avg is None:
+            competitor_avg = dish["competitor_avg"]
+            if dish_key(str(dish_name)) != dish_key(str(dish["dish_name"] or "")):
+                scraped_prices = fetch_scraped_competitor_prices(connection, current_restaurant_id, [dish_name])
+                competitor_avg = scraped_prices.get(dish_key(str(dish_name)), competitor_avg)
+
         update_cursor = connection.cursor()
         update_cursor.execute(
             """
@@ -1768,6 +3421,7 @@ def update_dish(dish_id: int):
             "competitor_avg",
             competitor_avg,
         )
+        bump_pricing_version(connection, current_restaurant_id)
 
         connection.commit()
 
@@ -1820,6 +3474,7 @@ def delete_dish(dish_id: int):
             "DELETE FROM dishes WHERE id = %s AND restaurant_id = %s",
             (dish_id, current_restaurant_id),
         )
+        bump_pricing_version(connection, current_restaurant_id)
         connection.commit()
 
         if delete_cursor.rowcount == 0:
@@ -1856,27 +3511,28 @@ def get_price_history():
     except (TypeError, ValueError):
         requested_days = 7
 
-    days = max(1, min(requested_days, 30))
+    days = max(1, min(requested_days, ARCHIVE_CONFIG["max_history_days"]))
 
     dish_id = request.args.get("dish_id", type=int)
     end_date = datetime.utcnow().date()
     start_date = end_date - timedelta(days=days - 1)
+    start_at = datetime.combine(start_date, datetime.min.time())
 
     connection = None
     history_cursor = None
     baseline_cursor = None
     try:
         connection = get_db_connection()
-        history_cursor = connection.cursor(dictionary=True)
+        history_cursor = connection.cursor()
 
         history_query = """
-            SELECT DATE(recorded_at) AS history_day, AVG(price_value) AS avg_price
+            SELECT DATE(recorded_at) AS history_day, SUM(price_value) AS price_sum, COUNT(price_value) AS price_count
             FROM dish_price_history
             WHERE restaurant_id = %s
               AND metric = %s
               AND recorded_at >= %s
         """
-        history_params = [restaurant_id, metric, datetime.combine(start_date, datetime.min.time())]
+        history_params = [restaurant_id, metric, start_at]
 
         if dish_id is not None:
             history_query += " AND dish_id = %s"
@@ -1887,13 +3543,23 @@ def get_price_history():
         history_cursor.execute(history_query, tuple(history_params))
         history_rows = history_cursor.fetchall()
 
-        day_to_price = {}
-        for row in history_rows:
-            history_day = row.get("history_day")
-            avg_price = row.get("avg_price")
-            if history_day is None or avg_price is None:
+        day_totals = {}
+        if start_at < hot_window_start(datetime.utcnow()):
+            day_totals = read_archived_daily_totals(
+                restaurant_id,
+                metric,
+                start_at,
+                datetime.combine(end_date + timedelta(days=1), datetime.min.time()),
+                dish_id=dish_id,
+            )
+
+        for history_day, price_sum, price_count in history_rows:
+            if history_day is None or not price_count:
                 continue
-            day_to_price[history_day] = float(avg_price)
+            archived_sum, archived_count = day_totals.get(str(history_day), (0.0, 0))
+            day_totals[str(history_day)] = (archived_sum + float(price_sum), archived_count + int(price_count))
+
+        day_to_price = {day: price_sum / price_count for day, (price_sum, price_count) in day_totals.items()}
 
         baseline_cursor = connection.cursor(dictionary=True)
         baseline_query = f"SELECT AVG({metric}) AS baseline_price FROM dishes WHERE restaurant_id = %s"
@@ -1911,7 +3577,7 @@ def get_price_history():
         last_known_value = None
         for offset in range(days):
             current_day = start_date + timedelta(days=offset)
-            value = day_to_price.get(current_day)
+            value = day_to_price.get(current_day.isoformat())
 
             if value is None:
                 value = last_known_value
@@ -1930,7 +3596,7 @@ def get_price_history():
             )
 
         return jsonify({"metric": metric, "dish_id": dish_id, "days": days, "points": points}), 200
-    except Error as error:
+    except (Error, OSError) as error:
         return jsonify({"error": f"Failed to fetch price history: {error}"}), 500
     finally:
         if history_cursor:
@@ -1953,81 +3619,162 @@ def get_analysis_summary():
     restaurant_id = current_user.get("restaurant_id") or current_user.get("id")
 
     connection = None
-    competitor_cursor = None
-    status_cursor = None
     try:
         connection = get_db_connection()
+        summary = fetch_restaurant_summary(connection, restaurant_id)
 
-        competitor_cursor = connection.cursor(dictionary=True)
-        competitor_cursor.execute(
-            """
-            SELECT id, restaurant_name, platform, website_url, status, mock_file,
-                   dishes_tracked, scraped_title, last_updated, created_at
-            FROM competitors
-            WHERE restaurant_id = %s
-            ORDER BY id ASC
-            """,
-            (restaurant_id,),
-        )
-        competitors = competitor_cursor.fetchall()
+        if summary is None:
+            refresh_restaurant_summary(connection, restaurant_id)
+            connection.commit()
+            summary = fetch_restaurant_summary(connection, restaurant_id)
 
-        status_cursor = connection.cursor(dictionary=True)
-        status_cursor.execute(
-            """
-            SELECT LOWER(status) AS status, COUNT(*) AS competitor_count,
-                   COALESCE(SUM(dishes_tracked), 0) AS dishes_tracked_total
-            FROM competitors
-            WHERE restaurant_id = %s
-            GROUP BY LOWER(status)
-            """,
-            (restaurant_id,),
-        )
-        rows = status_cursor.fetchall()
+        return jsonify(summary), 200
+    except Error as error:
+        return jsonify({"error": f"Failed to fetch analysis summary: {error}"}), 500
+    finally:
+        if connection and connection.is_connected():
+            connection.close()
 
-        status_bands = {
-            "low": {"competitor_count": 0, "dishes_tracked_total": 0},
-            "medium": {"competitor_count": 0, "dishes_tracked_total": 0},
-            "premium": {"competitor_count": 0, "dishes_tracked_total": 0},
-        }
 
-        for row in rows:
-            status_key = row.get("status")
-            if status_key in status_bands:
-                status_bands[status_key] = {
-                    "competitor_count": int(row.get("competitor_count") or 0),
-                    "dishes_tracked_total": int(row.get("dishes_tracked_total") or 0),
-                }
+@app.route("/api/recommendations", methods=["GET"])
+@jwt_required()
+def get_pricing_recommendations():
+    current_user_id = get_jwt_identity()
+    current_user = get_user_by_id(current_user_id)
+
+    if not current_user:
+        return jsonify({"error": "User not found"}), 404
+
+    restaurant_id = current_user.get("restaurant_id") or current_user.get("id")
+    category_level = normalize_category_level(current_user.get("category_level"))
+    limit = request.args.get("limit", type=int)
+
+    connection = None
+    try:
+        connection = get_db_connection()
+        result = get_recommendations(connection, restaurant_id, category_level)
+
+        recommendations = result["recommendations"]
+        if limit is not None and limit >= 0:
+            recommendations = recommendations[:limit]
 
         return (
             jsonify(
                 {
                     "restaurant_id": restaurant_id,
-                    "total_competitors": len(competitors),
-                    "status_bands": status_bands,
-                    "competitors": competitors,
+                    "category_level": result["category_level"],
+                    "pricing_version": result["pricing_version"],
+                    "summary": result["summary"],
+                    "recommendations": recommendations,
                 }
             ),
             200,
         )
     except Error as error:
-        return jsonify({"error": f"Failed to fetch analysis summary: {error}"}), 500
+        return jsonify({"error": f"Failed to fetch recommendations: {error}"}), 500
+    finally:
+        if connection and connection.is_connected():
+            connection.close()
+
+
+@app.route("/api/admin/profiling/passes", methods=["GET"])
+@jwt_required()
+@role_required("admin")
+def get_pass_profiling():
+    return jsonify({"pending_passes": pending_pass_profiles()}), 200
+
+
+@app.route("/api/admin/profiling/passes", methods=["POST"])
+@jwt_required()
+@role_required("admin")
+def schedule_pass_profiling():
+    payload = request.get_json(silent=True) or {}
+
+    try:
+        requested_passes = int(payload.get("count", 1))
+    except (TypeError, ValueError):
+        return jsonify({"error": "count must be an integer"}), 400
+
+    if requested_passes < 0 or requested_passes > 100:
+        return jsonify({"error": "count must be between 0 and 100"}), 400
+
+    pending_passes = request_pass_profiles(requested_passes)
+    return jsonify({"message": "Pass profiling scheduled", "pending_passes": pending_passes}), 200
+
+
+@app.route("/api/admin/scheduler/passes", methods=["GET"])
+@jwt_required()
+@role_required("admin")
+def get_scheduler_passes():
+    limit = max(1, min(request.args.get("limit", 100, type=int) or 100, 1000))
+
+    connection = None
+    try:
+        connection = get_db_connection()
+        return jsonify(fetch_pass_metrics(connection, limit=limit)), 200
+    except Error as error:
+        return jsonify({"error": f"Failed to fetch scheduler passes: {error}"}), 500
+    finally:
+        if connection and connection.is_connected():
+            connection.close()
+
+
+@app.route("/api/admin/profiles", methods=["GET"])
+@jwt_required()
+@role_required("admin")
+def get_profiles():
+    try:
+        return jsonify(list_profiles()), 200
+    except OSError as error:
+        return jsonify({"error": f"Failed to list profiles: {error}"}), 500
+
+
+@app.route("/api/admin/profiles/<path:profile_name>", methods=["GET"])
+@jwt_required()
+@role_required("admin")
+def download_profile(profile_name: str):
+    profile_path = resolve_profile_path(profile_name)
+    if not profile_path:
+        return jsonify({"error": "Profile not found"}), 404
+
+    return send_file(profile_path, as_attachment=True, download_name=os.path.basename(profile_path))
+
+
+def ensure_embedded_database() -> None:
+    connection = None
+    try:
+        connection = get_db_connection()
+        ensure_embedded_schema(connection)
+    except Error as error:
+        print(f"Failed to ensure embedded database: {error}")
     finally:
-        if competitor_cursor:
-            competitor_cursor.close()
-        if status_cursor:
-            status_cursor.close()
         if connection and connection.is_connected():
             connection.close()
 
 
 if __name__ == "__main__":
-    ensure_database()
-    if check_mysql_connection():
+    if is_embedded_storage():
+        ensure_embedded_database()
+    else:
+        ensure_database()
+    if not is_embedded_storage() and check_mysql_connection():
         ensure_users_table()
         ensure_dishes_table()
         ensure_competitors_table()
         ensure_alerts_table()
         ensure_price_history_table()
+        ensure_scheduler_tables()
+        ensure_restaurant_summaries_table()
+        ensure_pricing_versions_table()
+        ensure_snapshot_table()
+        ensure_menu_tables()
+        ensure_health_tables()
+        ensure_market_index_tables()
+        ensure_forecast_table()
     if not app.debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
-        scheduler.start()
+        if SCRAPER_CONFIG["parse_backend"] == "process":
+            get_parse_pool()
+            atexit.register(shutdown_parse_pool)
+        start_scheduler()
+    atexit.register(shutdown_password_pool)
     app.run()
@@ -0,0 +1,60 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from config import AUTH_CONFIG
+
+_executor = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(AUTH_CONFIG["hash_workers"] + AUTH_CONFIG["hash_queue_size"])
+
+
+class PasswordPoolBusy(Exception):
+    pass
+
+
+def get_password_pool():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=AUTH_CONFIG["hash_workers"],
+                thread_name_prefix="password-hash",
+            )
+        return _executor
+
+
+def _run_bounded(function, *args):
+    if not _slots.acquire(blocking=False):
+        raise PasswordPoolBusy("Password hashing queue is full")
+
+    try:
+        future = get_password_pool().submit(function, *args)
+    except BaseException:
+        _slots.release()
+        raise
+
+    future.add_done_callback(lambda _: _slots.release())
+    try:
+        return future.result(timeout=AUTH_CONFIG["hash_wait_seconds"])
+    except FutureTimeoutError as error:
+        future.cancel()
+        raise PasswordPoolBusy("Password hashing timed out") from error
+
+
+def hash_password(password: str) -> str:
+    return _run_bounded(generate_password_hash, password)
+
+
+def verify_password(stored_password: str, password: str) -> bool:
+    return _run_bounded(check_password_hash, stored_password, password)
+
+
+def shutdown_password_pool() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
@@ -0,0 +1,64 @@
+import math
+import threading
+import time
+
+
+class FixedWindowLimiter:
+    def __init__(self, limit: int, window_seconds: int, max_keys: int):
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def _current(self, key, now):
+        window = self._windows.get(key)
+        if window and now - window[0] >= self.window_seconds:
+            del self._windows[key]
+            return None
+        return window
+
+    def _make_room(self, now) -> bool:
+        # Capacity pressure only affects recording: expired windows go first, then a batch of the
+        # live windows with the fewest hits. Windows at the limit are never shed, so spraying new
+        # keys cannot flush a blocked key; if only those remain, the new key is not tracked.
+        if len(self._windows) < self.max_keys:
+            return True
+        expired = [key for key, window in self._windows.items() if now - window[0] >= self.window_seconds]
+        for key in expired:
+            del self._windows[key]
+        if len(self._windows) < self.max_keys:
+            return True
+
+        sheddable = sorted(
+            (window[1], key) for key, window in self._windows.items() if window[1] < self.limit
+        )
+        for _, key in sheddable[: max(1, self.max_keys // 10)]:
+            del self._windows[key]
+        return len(self._windows) < self.max_keys
+
+    def retry_after(self, key) -> int:
+        now = time.monotonic()
+        with self._lock:
+            window = self._current(key, now)
+            if window is None or window[1] < self.limit:
+                return 0
+            return max(1, math.ceil(self.window_seconds - (now - window[0])))
+
+    def hit(self, key) -> int:
+        now = time.monotonic()
+        with self._lock:
+            window = self._current(key, now)
+            if window is None:
+                if not self._make_room(now):
+                    return 0
+                window = [now, 0]
+                self._windows[key] = window
+            window[1] += 1
+            if window[1] <= self.limit:
+                return 0
+            return max(1, math.ceil(self.window_seconds - (now - window[0])))
+
+    def reset(self, key) -> None:
+        with self._lock:
+            self._windows.pop(key, None)
@@ -1,6 +1,155 @@
+import os
+
 DB_CONFIG = {
     "host": "localhost",
     "user": "root",
     "password": "navaroj@1923132",
     "database": "restaurant_price_watcher",
 }
+
+PROFILER_CONFIG = {
+    "output_dir": os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles"),
+    "request_header": "X-Profile-Request",
+    "default_mode": "cprofile",
+    "sample_interval_ms": 5,
+    "max_files": 50,
+}
+
+SCHEDULER_CONFIG = {
+    "mode": os.environ.get("SCHEDULER_MODE", "local"),
+    "node_id": os.environ.get("SCHEDULER_NODE_ID", ""),
+    "interval_minutes": int(os.environ.get("SCHEDULER_INTERVAL_MINUTES", "5")),
+    "heartbeat_seconds": 30,
+    "heartbeat_ttl_seconds": 90,
+    "pass_budget_seconds": int(os.environ.get("SCHEDULER_PASS_BUDGET_SECONDS", "40")),
+    "fetch_workers": int(os.environ.get("SCHEDULER_FETCH_WORKERS", "4")),
+    "max_pending_writes": 8,
+    "pass_metrics_retention_days": 30,
+}
+
+CADENCE_CONFIG = {
+    "tick_seconds": 60,
+    "min_interval_seconds": SCHEDULER_CONFIG["interval_minutes"] * 60,
+    "max_interval_seconds": 24 * 60 * 60,
+    "backoff_factor": 2,
+    "tighten_factor": 4,
+}
+
+SCRAPER_CONFIG = {
+    "parse_backend": os.environ.get("SCRAPER_PARSE_BACKEND", "inline"),
+    "parse_workers": int(os.environ.get("SCRAPER_PARSE_WORKERS", "0")),
+    "parse_start_method": "spawn",
+    "parse_timeout_seconds": 30,
+    "max_script_chars": 1024 * 1024,
+}
+
+STREAM_CONFIG = {
+    "write_batch_size": 200,
+}
+
+BULK_CONFIG = {
+    "import_batch_size": 500,
+    "max_reported_errors": 100,
+    "max_reprice_changes": 1000,
+}
+
+AUTH_CONFIG = {
+    "hash_workers": int(os.environ.get("AUTH_HASH_WORKERS", str(min(4, os.cpu_count() or 1)))),
+    "hash_queue_size": 32,
+    "hash_wait_seconds": 10,
+    "ip_max_failures": 30,
+    "ip_window_seconds": 60,
+    "account_max_failures": 5,
+    "account_window_seconds": 300,
+    "max_tracked_keys": 10000,
+}
+
+STORAGE_CONFIG = {
+    "backend": os.environ.get("STORAGE_BACKEND", "mysql"),
+    "sqlite_path": os.environ.get(
+        "STORAGE_SQLITE_PATH",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "pricewatcher.sqlite3"),
+    ),
+    "sqlite_busy_timeout_seconds": 30,
+}
+
+ARCHIVE_CONFIG = {
+    "root_dir": os.environ.get(
+        "ARCHIVE_ROOT_DIR",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "archive", "price_history"),
+    ),
+    "hot_days": int(os.environ.get("ARCHIVE_HOT_DAYS", "90")),
+    "compression": "zstd",
+    "row_group_rows": 64 * 1024,
+    "run_hour_utc": 3,
+    "max_history_days": 730,
+}
+
+PARTITION_CONFIG = {
+    "enabled": os.environ.get("PARTITIONING_ENABLED", "1") != "0",
+    "months_ahead": 3,
+    "alerts_retention_days": 365,
+    "maintenance_hour_utc": 2,
+}
+
+SNAPSHOT_CONFIG = {
+    "enabled": os.environ.get("SNAPSHOTS_ENABLED", "1") != "0",
+    "root_dir": os.environ.get(
+        "SNAPSHOT_ROOT_DIR",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "snapshots"),
+    ),
+    "spool_bytes": 1024 * 1024,
+    "compression_level": 3,
+    "replay_workers": int(os.environ.get("SNAPSHOT_REPLAY_WORKERS", "0")),
+    "replay_batch_size": 1000,
+}
+
+FILE_SOURCE_CONFIG = {
+    "mmap_min_bytes": 256 * 1024,
+    "max_cached_bytes": int(os.environ.get("FILE_SOURCE_CACHE_BYTES", str(256 * 1024 * 1024))),
+}
+
+EXTRACTOR_CONFIG = {
+    "source_adapters": {
+        "file": "menu_dom",
+        "website": "structured",
+    },
+    "platform_adapters": {
+        "zomato": "json_ld",
+        "swiggy": "embedded_json",
+    },
+    "domain_adapters": {
+        "zomato.com": "json_ld",
+        "swiggy.com": "embedded_json",
+    },
+}
+
+HEALTH_CONFIG = {
+    "failure_threshold": 3,
+    "open_seconds": 30 * 60,
+    "max_open_seconds": 24 * 60 * 60,
+    "backoff_factor": 2,
+    "max_reason_length": 1000,
+}
+
+ANOMALY_CONFIG = {
+    "enabled": os.environ.get("ANOMALY_DETECTION_ENABLED", "1") != "0",
+    "mode": os.environ.get("ANOMALY_MODE", "quarantine"),
+    "ewma_alpha": 0.3,
+    "z_threshold": 4.0,
+    "min_relative_deviation": 0.5,
+    "confirm_after": 3,
+}
+
+FORECAST_CONFIG = {
+    "history_days": 90,
+    "horizon_days": 14,
+    "alpha_grid": (0.1, 0.3, 0.5, 0.8),
+    "beta_grid": (0.05, 0.2, 0.4),
+    "damping": 0.9,
+    "min_points": 3,
+    "fallback_relative_sigma": 0.05,
+    "refit_hours": int(os.environ.get("FORECAST_REFIT_HOURS", "6")),
+    "read_batch_rows": 50000,
+    "write_batch_rows": 1000,
+}
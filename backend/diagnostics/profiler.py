@@ -0,0 +1,173 @@
+import cProfile
+import os
+import re
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+
+from config import PROFILER_CONFIG
+
+PROFILE_MODES = {"cprofile", "sample"}
+PROFILE_EXTENSIONS = {"cprofile": ".pstats", "sample": ".collapsed"}
+
+_pending_passes = 0
+_pending_lock = threading.Lock()
+
+
+def normalize_profile_mode(raw_value, default=None):
+    value = (raw_value or "").strip().lower()
+    if value in PROFILE_MODES:
+        return value
+    return default or PROFILER_CONFIG["default_mode"]
+
+
+def request_pass_profiles(count) -> int:
+    global _pending_passes
+    with _pending_lock:
+        _pending_passes = max(0, int(count))
+        return _pending_passes
+
+
+def pending_pass_profiles() -> int:
+    with _pending_lock:
+        return _pending_passes
+
+
+def claim_pass_profile() -> bool:
+    global _pending_passes
+    with _pending_lock:
+        if _pending_passes <= 0:
+            return False
+        _pending_passes -= 1
+        return True
+
+
+def _profile_dir():
+    directory = PROFILER_CONFIG["output_dir"]
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+class StackSampler:
+    def __init__(self, thread_id, interval_seconds):
+        self.thread_id = thread_id
+        self.interval_seconds = interval_seconds
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval_seconds):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfileSession:
+    def __init__(self, label, mode=None):
+        self.label = re.sub(r"[^A-Za-z0-9_.-]+", "_", label or "profile").strip("_") or "profile"
+        self.mode = normalize_profile_mode(mode)
+        self.file_name = None
+        self._profiler = None
+        self._sampler = None
+
+    def start(self):
+        if self.mode == "sample":
+            interval_seconds = PROFILER_CONFIG["sample_interval_ms"] / 1000.0
+            self._sampler = StackSampler(threading.get_ident(), interval_seconds)
+            self._sampler.start()
+        else:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        return self
+
+    def stop(self):
+        if self._profiler is None and self._sampler is None:
+            return self.file_name
+
+        timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        self.file_name = f"{timestamp}_{self.label}{PROFILE_EXTENSIONS[self.mode]}"
+        file_path = os.path.join(_profile_dir(), self.file_name)
+
+        try:
+            if self._profiler is not None:
+                self._profiler.disable()
+                self._profiler.dump_stats(file_path)
+            else:
+                self._sampler.stop()
+                with open(file_path, "w", encoding="utf-8") as profile_file:
+                    profile_file.write(self._sampler.collapsed())
+        except OSError as error:
+            print(f"Failed to write profile {self.file_name}: {error}")
+            self.file_name = None
+        finally:
+            self._profiler = None
+            self._sampler = None
+
+        prune_profiles()
+        return self.file_name
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+
+def list_profiles():
+    directory = _profile_dir()
+    profiles = []
+    for entry in os.scandir(directory):
+        if not entry.is_file() or os.path.splitext(entry.name)[1] not in PROFILE_EXTENSIONS.values():
+            continue
+        stat_result = entry.stat()
+        profiles.append(
+            {
+                "name": entry.name,
+                "size_bytes": stat_result.st_size,
+                "created_at": datetime.utcfromtimestamp(stat_result.st_mtime).isoformat(),
+            }
+        )
+
+    profiles.sort(key=lambda profile: profile["name"], reverse=True)
+    return profiles
+
+
+def prune_profiles() -> None:
+    max_files = PROFILER_CONFIG["max_files"]
+    for profile in list_profiles()[max_files:]:
+        try:
+            os.remove(os.path.join(_profile_dir(), profile["name"]))
+        except OSError:
+            continue
+
+
+def resolve_profile_path(profile_name):
+    normalized_name = os.path.basename((profile_name or "").strip())
+    if not normalized_name or os.path.splitext(normalized_name)[1] not in PROFILE_EXTENSIONS.values():
+        return None
+
+    file_path = os.path.join(_profile_dir(), normalized_name)
+    if not os.path.isfile(file_path):
+        return None
+    return file_path
@@ -0,0 +1,161 @@
+import numpy as np
+
+from config import ANOMALY_CONFIG
+from pricing.menu_diff import PRICE_DOWN, PRICE_UP
+
+SCREENED_CHANGES = (PRICE_UP, PRICE_DOWN)
+QUARANTINED = "quarantined"
+FLAGGED = "flagged"
+CONFIRMED = "confirmed"
+
+
+def _column(values, default):
+    return np.array([default if value is None else float(value) for value in values], dtype=np.float64)
+
+
+def fetch_series_state(connection, competitor_id):
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            """
+            SELECT dish_key, ewma_mean, ewma_var, sample_count, pending_price, pending_count
+            FROM competitor_menu_items
+            WHERE competitor_id = %s
+            """,
+            (competitor_id,),
+        )
+        return {row[0]: row[1:] for row in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+
+def screen_menu_changes(connection, competitor, changes):
+    screened = [change for change in changes if change.change_type in SCREENED_CHANGES]
+    if not ANOMALY_CONFIG["enabled"] or not screened:
+        return changes, [], []
+
+    state = fetch_series_state(connection, competitor["id"])
+    rows = [state.get(change.dish_key) or (None, None, None, None, None) for change in screened]
+
+    prices = _column((change.new_price for change in screened), np.nan)
+    old_prices = _column((change.old_price for change in screened), np.nan)
+    means = _column((row[0] for row in rows), np.nan)
+    means = np.where(np.isfinite(means), means, old_prices)
+    variances = _column((row[1] for row in rows), 0.0)
+    counts = _column((row[2] for row in rows), 1.0)
+    pending_prices = _column((row[3] for row in rows), np.nan)
+    pending_counts = _column((row[4] for row in rows), 0.0)
+
+    deviations = np.abs(prices - means)
+    tolerances = np.maximum(
+        ANOMALY_CONFIG["z_threshold"] * np.sqrt(variances),
+        ANOMALY_CONFIG["min_relative_deviation"] * np.abs(means),
+    )
+    flagged = deviations > tolerances
+    scores = deviations / np.where(tolerances > 0, tolerances, 1.0)
+
+    quarantine = ANOMALY_CONFIG["mode"] == "quarantine"
+    repeats = np.where(np.isclose(pending_prices, prices), pending_counts + 1, 1.0)
+    confirmed = flagged & (repeats >= ANOMALY_CONFIG["confirm_after"]) if quarantine else np.zeros_like(flagged)
+    held = flagged & ~confirmed if quarantine else np.zeros_like(flagged)
+
+    alpha = ANOMALY_CONFIG["ewma_alpha"]
+    deltas = prices - means
+    next_means = np.where(confirmed, prices, np.where(held, means, means + alpha * deltas))
+    next_variances = np.where(
+        confirmed, 0.0, np.where(held, variances, (1 - alpha) * (variances + alpha * deltas * deltas))
+    )
+    next_counts = np.where(confirmed, 1.0, np.where(held, counts, counts + 1))
+
+    series_rows = []
+    anomalies = []
+    held_ids = set()
+    for index, change in enumerate(screened):
+        if held[index]:
+            held_ids.add(id(change))
+            series_rows.append(
+                (
+                    float(next_means[index]),
+                    float(next_variances[index]),
+                    int(next_counts[index]),
+                    change.new_price,
+                    int(repeats[index]),
+                    competitor["id"],
+                    change.dish_key,
+                )
+            )
+        else:
+            series_rows.append(
+                (
+                    float(next_means[index]),
+                    float(next_variances[index]),
+                    int(next_counts[index]),
+                    None,
+                    0,
+                    competitor["id"],
+                    change.dish_key,
+                )
+            )
+
+        if flagged[index]:
+            if held[index]:
+                status = QUARANTINED
+            elif confirmed[index]:
+                status = CONFIRMED
+            else:
+                status = FLAGGED
+            anomalies.append(
+                (change, round(float(means[index]), 2), round(float(scores[index]), 2), status)
+            )
+
+    accepted = [change for change in changes if id(change) not in held_ids]
+    return accepted, anomalies, series_rows
+
+
+def store_series_state(connection, series_rows) -> None:
+    if not series_rows:
+        return
+
+    cursor = connection.cursor()
+    try:
+        cursor.executemany(
+            """
+            UPDATE competitor_menu_items
+            SET ewma_mean = %s, ewma_var = %s, sample_count = %s, pending_price = %s, pending_count = %s
+            WHERE competitor_id = %s AND dish_key = %s
+            """,
+            series_rows,
+        )
+    finally:
+        cursor.close()
+
+
+def store_anomalies(connection, competitor, anomalies, detected_at) -> None:
+    if not anomalies:
+        return
+
+    cursor = connection.cursor()
+    try:
+        cursor.executemany(
+            """
+            INSERT INTO price_anomalies (
+                competitor_id, restaurant_id, dish_name, observed_price, expected_price, score, status, detected_at
+            )
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            """,
+            [
+                (
+                    competitor["id"],
+                    competitor.get("restaurant_id"),
+                    change.dish_name,
+                    change.new_price,
+                    expected_price,
+                    score,
+                    status,
+                    detected_at,
+                )
+                for change, expected_price, score, status in anomalies
+            ],
+        )
+    finally:
+        cursor.close()
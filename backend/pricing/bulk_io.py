@@ -0,0 +1,112 @@
+import codecs
+import csv
+import io
+import json
+import math
+
+DISH_EXPORT_FIELDS = ("id", "dish_name", "category", "our_price", "competitor_avg", "created_at")
+BULK_FORMATS = {"csv", "ndjson"}
+
+
+def iter_text_lines(binary_stream, chunk_size=64 * 1024):
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    while True:
+        chunk = binary_stream.read(chunk_size)
+        text = decoder.decode(chunk or b"", final=not chunk)
+        if text:
+            lines = (pending + text).splitlines(keepends=True)
+            pending = lines.pop() if lines and not lines[-1].endswith(("\n", "\r")) else ""
+            yield from lines
+        if not chunk:
+            break
+    if pending:
+        yield pending
+
+
+def detect_bulk_format(requested_format, content_type, file_name):
+    value = (requested_format or "").strip().lower()
+    if value in BULK_FORMATS:
+        return value
+
+    normalized_type = (content_type or "").lower()
+    normalized_name = (file_name or "").lower()
+    if "ndjson" in normalized_type or "jsonl" in normalized_type or normalized_name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    if "csv" in normalized_type or normalized_name.endswith(".csv"):
+        return "csv"
+    return None
+
+
+def validate_dish_row(raw_row):
+    if not isinstance(raw_row, dict):
+        return None, "row must be an object"
+
+    dish_name = str(raw_row.get("dish_name") or "").strip()
+    category = str(raw_row.get("category") or "").strip()
+    if not dish_name or not category:
+        return None, "dish_name and category are required"
+
+    prices = []
+    for field in ("our_price", "competitor_avg"):
+        raw_value = raw_row.get(field)
+        if raw_value is None or str(raw_value).strip() == "":
+            if field == "competitor_avg":
+                # Optional: the import seeds it from scraped competitor prices when omitted.
+                prices.append(None)
+                continue
+            return None, f"{field} is required"
+        try:
+            price = float(raw_value)
+        except (TypeError, ValueError):
+            return None, f"{field} must be a number"
+        if not math.isfinite(price):
+            return None, f"{field} must be a finite number"
+        if price < 0:
+            return None, f"{field} must not be negative"
+        prices.append(price)
+
+    return (dish_name[:255], category[:255], prices[0], prices[1]), None
+
+
+def iter_import_rows(text_stream, bulk_format):
+    if bulk_format == "csv":
+        reader = csv.DictReader(text_stream)
+        for raw_row in reader:
+            yield (reader.line_num, *validate_dish_row(raw_row))
+        return
+
+    for line_number, line in enumerate(text_stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            raw_row = json.loads(line)
+        except ValueError:
+            yield line_number, None, "invalid JSON"
+            continue
+        yield (line_number, *validate_dish_row(raw_row))
+
+
+def _export_value(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def iter_csv_export(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(DISH_EXPORT_FIELDS)
+    for row in rows:
+        writer.writerow([_export_value(value) for value in row])
+        if buffer.tell() >= 16 * 1024:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_ndjson_export(rows):
+    for row in rows:
+        record = {field: _export_value(value) for field, value in zip(DISH_EXPORT_FIELDS, row)}
+        yield json.dumps(record) + "\n"
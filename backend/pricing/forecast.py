@@ -0,0 +1,172 @@
+import time
+from datetime import timedelta
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+from config import FORECAST_CONFIG
+
+FORECAST_METRIC = "competitor_avg"
+INTERVAL_Z = 1.96
+
+
+def load_daily_series(connection, start_at, end_at):
+    cursor = connection.cursor(buffered=False)
+    try:
+        cursor.execute(
+            """
+            SELECT restaurant_id, dish_id, DATE(recorded_at) AS price_day, AVG(price_value) AS price_value
+            FROM dish_price_history
+            WHERE metric = %s
+              AND recorded_at >= %s
+              AND recorded_at < %s
+              AND restaurant_id IS NOT NULL
+              AND dish_id IS NOT NULL
+              AND price_value IS NOT NULL
+            GROUP BY restaurant_id, dish_id, DATE(recorded_at)
+            """,
+            (FORECAST_METRIC, start_at, end_at),
+        )
+        frames = []
+        while True:
+            rows = cursor.fetchmany(FORECAST_CONFIG["read_batch_rows"])
+            if not rows:
+                break
+            frames.append(pd.DataFrame(rows, columns=["restaurant_id", "dish_id", "price_day", "price_value"]))
+    finally:
+        cursor.close()
+
+    days = pd.date_range(pd.Timestamp(start_at).normalize(), pd.Timestamp(end_at).normalize(), freq="D")
+    if not frames:
+        return pd.MultiIndex.from_arrays([[], []], names=["restaurant_id", "dish_id"]), np.empty((0, len(days)))
+
+    daily = pd.concat(frames, ignore_index=True)
+    daily["price_day"] = pd.to_datetime(daily["price_day"])
+    daily["price_value"] = daily["price_value"].astype(np.float64)
+    matrix = daily.pivot_table(
+        index=["restaurant_id", "dish_id"], columns="price_day", values="price_value", aggfunc="mean"
+    ).reindex(columns=days)
+    # Days without a sample stay NaN: the fit carries the level across them instead of
+    # scoring forward-filled copies, which would inflate the sample count and shrink sigma.
+    return matrix.index, matrix.to_numpy(dtype=np.float64)
+
+
+def fit_damped_holt(values):
+    alphas = np.asarray(FORECAST_CONFIG["alpha_grid"], dtype=np.float64)
+    betas = np.asarray(FORECAST_CONFIG["beta_grid"], dtype=np.float64)
+    alpha = np.repeat(alphas, len(betas))[:, None]
+    beta = np.tile(betas, len(alphas))[:, None]
+    phi = FORECAST_CONFIG["damping"]
+
+    series_count, day_count = values.shape
+    observed = np.isfinite(values)
+    first_index = np.where(observed.any(axis=1), observed.argmax(axis=1), day_count)
+    first_value = values[np.arange(series_count), np.minimum(first_index, day_count - 1)]
+
+    level = np.broadcast_to(first_value, (len(alpha), series_count)).copy()
+    trend = np.zeros_like(level)
+    squared_error = np.zeros_like(level)
+    steps = np.zeros(series_count)
+
+    for day in range(day_count):
+        active = observed[:, day] & (first_index < day)
+        if not active.any():
+            continue
+        actual = np.where(active, values[:, day], 0.0)
+        expected = level + phi * trend
+        next_level = alpha * actual + (1 - alpha) * expected
+        next_trend = beta * (next_level - level) + (1 - beta) * phi * trend
+        level = np.where(active, next_level, level)
+        trend = np.where(active, next_trend, trend)
+        squared_error += np.where(active, (actual - expected) ** 2, 0.0)
+        steps += active
+
+    best = np.argmin(squared_error, axis=0)
+    columns = np.arange(series_count)
+    fitted_level = level[best, columns]
+    enough_points = steps >= FORECAST_CONFIG["min_points"]
+    fitted_trend = np.where(enough_points, trend[best, columns], 0.0)
+    sigma = np.sqrt(squared_error[best, columns] / np.maximum(steps, 1))
+
+    # Series too short to estimate their own error borrow the median relative error of the rest.
+    reliable = enough_points & (fitted_level > 0)
+    relative_sigma = (
+        float(np.median(sigma[reliable] / fitted_level[reliable]))
+        if reliable.any()
+        else FORECAST_CONFIG["fallback_relative_sigma"]
+    )
+    sigma = np.where(enough_points, sigma, relative_sigma * np.abs(fitted_level))
+    return fitted_level, fitted_trend, sigma, np.isfinite(first_value)
+
+
+def project(level, trend, sigma, horizon_days):
+    phi = FORECAST_CONFIG["damping"]
+    horizons = np.arange(1, horizon_days + 1, dtype=np.float64)
+    damped_steps = phi * (1 - phi ** horizons) / (1 - phi) if phi < 1 else horizons
+    predicted = np.maximum(level[:, None] + trend[:, None] * damped_steps[None, :], 0.0)
+    spread = INTERVAL_Z * sigma[:, None] * np.sqrt(horizons)[None, :]
+    return predicted, np.maximum(predicted - spread, 0.0), predicted + spread
+
+
+def _iter_forecast_rows(series_keys, predicted, lower, upper, first_day, generated_at):
+    forecast_days = [first_day + timedelta(days=offset) for offset in range(predicted.shape[1])]
+    for row_index, (restaurant_id, dish_id) in enumerate(series_keys):
+        for column, forecast_day in enumerate(forecast_days):
+            yield (
+                int(restaurant_id),
+                int(dish_id),
+                forecast_day,
+                round(float(predicted[row_index, column]), 2),
+                round(float(lower[row_index, column]), 2),
+                round(float(upper[row_index, column]), 2),
+                generated_at,
+            )
+
+
+def store_forecasts(connection, rows, generated_at) -> int:
+    written_rows = 0
+    cursor = connection.cursor()
+    try:
+        while True:
+            batch = list(islice(rows, FORECAST_CONFIG["write_batch_rows"]))
+            if not batch:
+                break
+            cursor.executemany(
+                """
+                INSERT INTO price_forecasts (
+                    restaurant_id, dish_id, forecast_date, predicted_price, lower_price, upper_price, generated_at
+                )
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    predicted_price = VALUES(predicted_price),
+                    lower_price = VALUES(lower_price),
+                    upper_price = VALUES(upper_price),
+                    generated_at = VALUES(generated_at)
+                """,
+                batch,
+            )
+            connection.commit()
+            written_rows += len(batch)
+        cursor.execute("DELETE FROM price_forecasts WHERE generated_at < %s", (generated_at,))
+        connection.commit()
+    finally:
+        cursor.close()
+    return written_rows
+
+
+def run_price_forecasts(read_connection, write_connection, now):
+    started = time.monotonic()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    series_keys, values = load_daily_series(
+        read_connection, today - timedelta(days=FORECAST_CONFIG["history_days"]), today + timedelta(days=1)
+    )
+
+    level, trend, sigma, has_history = fit_damped_holt(values)
+    predicted, lower, upper = project(
+        level[has_history], trend[has_history], sigma[has_history], FORECAST_CONFIG["horizon_days"]
+    )
+    fitted_keys = [key for key, keep in zip(series_keys, has_history) if keep]
+    rows = _iter_forecast_rows(fitted_keys, predicted, lower, upper, (today + timedelta(days=1)).date(), now)
+    written_rows = store_forecasts(write_connection, rows, now)
+    return len(fitted_keys), written_rows, time.monotonic() - started
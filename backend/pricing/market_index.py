@@ -0,0 +1,232 @@
+import hashlib
+
+import numpy as np
+
+from pricing.menu_diff import PRICED_CHANGES, REMOVED
+
+GLOBAL_AREA = ""
+INDEX_QUANTILES = (0.25, 0.5, 0.75)
+LOOKUP_BATCH_SIZE = 500
+
+
+def normalize_market_area(raw_value) -> str:
+    return " ".join(str(raw_value or "").split()).lower()[:100]
+
+
+def _source_key(competitor) -> str:
+    source = (competitor.get("mock_file") or competitor.get("website_url") or "").strip().lower().rstrip("/")
+    if not source:
+        source = f"competitor:{competitor.get('id')}"
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()
+
+
+def _iter_chunks(items):
+    for start in range(0, len(items), LOOKUP_BATCH_SIZE):
+        yield items[start:start + LOOKUP_BATCH_SIZE]
+
+
+def fetch_market_area(connection, restaurant_id) -> str:
+    if not restaurant_id:
+        return GLOBAL_AREA
+
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT market_area FROM users WHERE id = %s", (restaurant_id,))
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+    return normalize_market_area(row[0]) if row else GLOBAL_AREA
+
+
+def _lock_index_rows(cursor, areas, dish_keys) -> None:
+    area_placeholders = ", ".join(["%s"] * len(areas))
+    for chunk in _iter_chunks(dish_keys):
+        placeholders = ", ".join(["%s"] * len(chunk))
+        cursor.execute(
+            f"""
+            SELECT area, dish_key
+            FROM market_price_index
+            WHERE area IN ({area_placeholders}) AND dish_key IN ({placeholders})
+            FOR UPDATE
+            """,
+            (*areas, *chunk),
+        )
+        cursor.fetchall()
+
+
+def _source_prices(cursor, areas, dish_keys, source_key=None):
+    prices = {}
+    area_placeholders = ", ".join(["%s"] * len(areas))
+    source_filter = " AND source_key = %s" if source_key is not None else ""
+    for chunk in _iter_chunks(dish_keys):
+        placeholders = ", ".join(["%s"] * len(chunk))
+        cursor.execute(
+            f"""
+            SELECT area, dish_key, price
+            FROM market_index_sources
+            WHERE area IN ({area_placeholders}) AND dish_key IN ({placeholders}){source_filter}
+            FOR UPDATE
+            """,
+            (*areas, *chunk, *((source_key,) if source_key is not None else ())),
+        )
+        for area, key, price in cursor.fetchall():
+            prices.setdefault((area, key), []).append(float(price))
+    return prices
+
+
+def _index_row(area, change, prices, observed_at):
+    values = np.asarray(prices, dtype=np.float64)
+    p25, median, p75 = np.quantile(values, INDEX_QUANTILES).tolist()
+    return (
+        area,
+        change.dish_key,
+        change.dish_name[:255],
+        len(values),
+        float(values.sum()),
+        float(values.mean()),
+        float(values.min()),
+        float(values.max()),
+        p25,
+        median,
+        p75,
+        observed_at,
+    )
+
+
+def record_market_observations(connection, competitor, menu_changes, observed_at) -> int:
+    # The index holds one current price per source page and area. Every touched row is recomputed
+    # exactly from its sources, which are bounded by the number of distinct competitor pages.
+    latest_by_key = {}
+    for change in menu_changes:
+        if change.change_type == REMOVED or (change.change_type in PRICED_CHANGES and change.new_price is not None):
+            latest_by_key[change.dish_key] = change
+    if not latest_by_key:
+        return 0
+
+    source_key = _source_key(competitor)
+    area = fetch_market_area(connection, competitor.get("restaurant_id"))
+    areas = tuple(dict.fromkeys((area, GLOBAL_AREA)))
+    dish_keys = list(latest_by_key)
+
+    cursor = connection.cursor()
+    try:
+        # Lock the index rows first so concurrent scrapes of the same dishes recompute them in turn.
+        _lock_index_rows(cursor, areas, dish_keys)
+        known_prices = _source_prices(cursor, areas, dish_keys, source_key)
+
+        source_rows = []
+        removed_rows = []
+        touched = {}
+        for index_area in areas:
+            for key, change in latest_by_key.items():
+                previous = known_prices.get((index_area, key))
+                if change.change_type == REMOVED:
+                    if previous:
+                        removed_rows.append((index_area, key, source_key))
+                        touched[(index_area, key)] = change
+                    continue
+
+                price = float(change.new_price)
+                if previous and round(previous[0], 2) == round(price, 2):
+                    continue
+                source_rows.append((index_area, source_key, key, price, observed_at))
+                touched[(index_area, key)] = change
+
+        if not source_rows and not removed_rows:
+            return 0
+
+        if source_rows:
+            cursor.executemany(
+                """
+                INSERT INTO market_index_sources (area, source_key, dish_key, price, observed_at)
+                VALUES (%s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE price = VALUES(price), observed_at = VALUES(observed_at)
+                """,
+                source_rows,
+            )
+        if removed_rows:
+            cursor.executemany(
+                "DELETE FROM market_index_sources WHERE area = %s AND dish_key = %s AND source_key = %s",
+                removed_rows,
+            )
+
+        index_rows = []
+        empty_rows = []
+        current_prices = _source_prices(cursor, areas, list({key for _, key in touched}))
+        for (index_area, key), change in touched.items():
+            prices = current_prices.get((index_area, key))
+            if prices:
+                index_rows.append(_index_row(index_area, change, prices, observed_at))
+            else:
+                empty_rows.append((index_area, key))
+
+        if index_rows:
+            cursor.executemany(
+                """
+                INSERT INTO market_price_index (
+                    area, dish_key, dish_name, observation_count, price_sum, mean_price, min_price, max_price,
+                    p25_price, median_price, p75_price, updated_at
+                )
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    dish_name = VALUES(dish_name),
+                    observation_count = VALUES(observation_count),
+                    price_sum = VALUES(price_sum),
+                    mean_price = VALUES(mean_price),
+                    min_price = VALUES(min_price),
+                    max_price = VALUES(max_price),
+                    p25_price = VALUES(p25_price),
+                    median_price = VALUES(median_price),
+                    p75_price = VALUES(p75_price),
+                    updated_at = VALUES(updated_at)
+                """,
+                index_rows,
+            )
+        if empty_rows:
+            cursor.executemany("DELETE FROM market_price_index WHERE area = %s AND dish_key = %s", empty_rows)
+    finally:
+        cursor.close()
+
+    return len(source_rows) + len(removed_rows)
+
+
+def _market_entry(row):
+    return {
+        "area": row["area"] or None,
+        "observation_count": int(row["observation_count"]),
+        "mean_price": round(float(row["mean_price"]), 2),
+        "min_price": float(row["min_price"]),
+        "max_price": float(row["max_price"]),
+        "p25_price": float(row["p25_price"]),
+        "median_price": float(row["median_price"]),
+        "p75_price": float(row["p75_price"]),
+        "updated_at": row["updated_at"],
+    }
+
+
+def fetch_market_index(connection, area, dish_keys):
+    areas = tuple(dict.fromkeys((normalize_market_area(area), GLOBAL_AREA)))
+    unique_keys = list(dict.fromkeys(key for key in dish_keys if key))
+    entries = {}
+
+    cursor = connection.cursor(dictionary=True)
+    try:
+        area_placeholders = ", ".join(["%s"] * len(areas))
+        for chunk in _iter_chunks(unique_keys):
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(
+                f"""
+                SELECT area, dish_key, observation_count, mean_price, min_price, max_price,
+                       p25_price, median_price, p75_price, updated_at
+                FROM market_price_index
+                WHERE area IN ({area_placeholders}) AND dish_key IN ({placeholders})
+                """,
+                (*areas, *chunk),
+            )
+            for row in cursor.fetchall():
+                if row["dish_key"] not in entries or row["area"] != GLOBAL_AREA:
+                    entries[row["dish_key"]] = _market_entry(row)
+    finally:
+        cursor.close()
+
+    return entries
@@ -0,0 +1,130 @@
+ADDED = "added"
+REMOVED = "removed"
+PRICE_UP = "price_up"
+PRICE_DOWN = "price_down"
+PRICED_CHANGES = (ADDED, PRICE_UP, PRICE_DOWN)
+
+
+def dish_key(dish_name: str) -> str:
+    return dish_name.strip().lower()[:255]
+
+
+class MenuChange:
+    __slots__ = ("change_type", "dish_key", "dish_name", "old_price", "new_price")
+
+    def __init__(self, change_type, key, dish_name, old_price, new_price):
+        self.change_type = change_type
+        self.dish_key = key
+        self.dish_name = dish_name
+        self.old_price = old_price
+        self.new_price = new_price
+
+    @property
+    def change_percent(self):
+        if self.old_price is None or self.new_price is None or not self.old_price:
+            return None
+        return round((self.new_price - self.old_price) / self.old_price * 100.0, 2)
+
+    def __repr__(self):
+        return f"MenuChange({self.change_type!r}, {self.dish_name!r}, {self.old_price!r}, {self.new_price!r})"
+
+    def to_dict(self):
+        return {
+            "change_type": self.change_type,
+            "dish_name": self.dish_name,
+            "old_price": self.old_price,
+            "new_price": self.new_price,
+            "change_percent": self.change_percent,
+        }
+
+
+def diff_menu(previous_menu, observations):
+    changes = []
+    seen_keys = set()
+    for observation in observations:
+        key = dish_key(observation.dish_name)
+        if not key or key in seen_keys:
+            continue
+        seen_keys.add(key)
+
+        previous = previous_menu.get(key)
+        if previous is None:
+            changes.append(MenuChange(ADDED, key, observation.dish_name, None, observation.price))
+            continue
+
+        old_price = previous[1]
+        if observation.price > old_price:
+            changes.append(MenuChange(PRICE_UP, key, observation.dish_name, old_price, observation.price))
+        elif observation.price < old_price:
+            changes.append(MenuChange(PRICE_DOWN, key, observation.dish_name, old_price, observation.price))
+
+    for key, (dish_name, old_price) in previous_menu.items():
+        if key not in seen_keys:
+            changes.append(MenuChange(REMOVED, key, dish_name, old_price, None))
+    return changes
+
+
+def fetch_menu_baseline(connection, competitor_id):
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            "SELECT dish_key, dish_name, price FROM competitor_menu_items WHERE competitor_id = %s",
+            (competitor_id,),
+        )
+        return {key: (dish_name, float(price)) for key, dish_name, price in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+
+def store_menu_changes(connection, competitor, changes, detected_at) -> None:
+    if not changes:
+        return
+
+    competitor_id = competitor["id"]
+    upsert_rows = [
+        (competitor_id, change.dish_key, change.dish_name, change.new_price)
+        for change in changes
+        if change.change_type != REMOVED
+    ]
+    removed_rows = [(competitor_id, change.dish_key) for change in changes if change.change_type == REMOVED]
+    event_rows = [
+        (
+            competitor_id,
+            competitor.get("restaurant_id"),
+            change.dish_name,
+            change.change_type,
+            change.old_price,
+            change.new_price,
+            change.change_percent,
+            detected_at,
+        )
+        for change in changes
+    ]
+
+    cursor = connection.cursor()
+    try:
+        if upsert_rows:
+            cursor.executemany(
+                """
+                INSERT INTO competitor_menu_items (competitor_id, dish_key, dish_name, price)
+                VALUES (%s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE dish_name = VALUES(dish_name), price = VALUES(price)
+                """,
+                upsert_rows,
+            )
+        if removed_rows:
+            cursor.executemany(
+                "DELETE FROM competitor_menu_items WHERE competitor_id = %s AND dish_key = %s",
+                removed_rows,
+            )
+        cursor.executemany(
+            """
+            INSERT INTO competitor_menu_changes (
+                competitor_id, restaurant_id, dish_name, change_type, old_price, new_price, change_percent, detected_at
+            )
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            """,
+            event_rows,
+        )
+    finally:
+        cursor.close()
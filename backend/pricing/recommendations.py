@@ -0,0 +1,233 @@
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+
+CATEGORY_PRICE_BANDS = {
+    "low": (0.90, 0.98),
+    "medium": (0.97, 1.03),
+    "high": (1.02, 1.10),
+    "premium": (1.08, 1.20),
+}
+POSITION_THRESHOLD_PERCENT = 5.0
+HISTORY_WINDOW_DAYS = 30
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def bump_pricing_version(connection, restaurant_id) -> None:
+    if not restaurant_id:
+        return
+
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            """
+            INSERT INTO restaurant_pricing_versions (restaurant_id, version)
+            VALUES (%s, 1)
+            ON DUPLICATE KEY UPDATE version = version + 1
+            """,
+            (restaurant_id,),
+        )
+    finally:
+        cursor.close()
+
+
+def fetch_pricing_version(connection, restaurant_id) -> int:
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            "SELECT version FROM restaurant_pricing_versions WHERE restaurant_id = %s",
+            (restaurant_id,),
+        )
+        row = cursor.fetchone()
+        return int(row[0]) if row else 0
+    finally:
+        cursor.close()
+
+
+def _fetch_dishes(connection, restaurant_id):
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            """
+            SELECT id, dish_name, category, our_price, competitor_avg
+            FROM dishes
+            WHERE restaurant_id = %s
+            ORDER BY id ASC
+            """,
+            (restaurant_id,),
+        )
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def _fetch_competitor_samples(connection, restaurant_id):
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            """
+            SELECT dish_id, price_value
+            FROM dish_price_history
+            WHERE restaurant_id = %s
+              AND metric = 'competitor_avg'
+              AND recorded_at >= %s
+              AND dish_id IS NOT NULL
+              AND price_value IS NOT NULL
+            """,
+            (restaurant_id, datetime.utcnow() - timedelta(days=HISTORY_WINDOW_DAYS)),
+        )
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def _as_float_array(values):
+    return np.array([np.nan if value is None else float(value) for value in values], dtype=np.float64)
+
+
+def _percentile_positions(dish_ids, our_prices, samples):
+    percentiles = np.full(len(dish_ids), np.nan)
+    if not samples or not len(dish_ids):
+        return percentiles
+
+    index_by_dish_id = {dish_id: index for index, dish_id in enumerate(dish_ids)}
+    sample_index = np.fromiter(
+        (index_by_dish_id.get(dish_id, -1) for dish_id, _ in samples), dtype=np.int64, count=len(samples)
+    )
+    sample_values = np.fromiter((float(value) for _, value in samples), dtype=np.float64, count=len(samples))
+    known = sample_index >= 0
+    sample_index = sample_index[known]
+    sample_values = sample_values[known]
+    if not len(sample_values):
+        return percentiles
+
+    finite_prices = np.where(np.isfinite(our_prices), our_prices, 0.0)
+    scale = max(float(sample_values.max()), float(finite_prices.max()), 0.0) + 1.0
+    sorted_keys = np.sort(sample_index * scale + sample_values)
+
+    dish_index = np.arange(len(dish_ids))
+    totals = np.bincount(sample_index, minlength=len(dish_ids))
+    at_or_below = np.searchsorted(sorted_keys, dish_index * scale + finite_prices, side="right") - np.searchsorted(
+        sorted_keys, dish_index * scale, side="left"
+    )
+
+    has_samples = (totals > 0) & np.isfinite(our_prices)
+    percentiles[has_samples] = at_or_below[has_samples] / totals[has_samples] * 100.0
+    return percentiles
+
+
+def _rounded(value, digits=2):
+    return None if value is None or not np.isfinite(value) else round(float(value), digits)
+
+
+def _dish_reference(dishes, our_prices, index):
+    if index is None:
+        return None
+    return {"dish_id": dishes[index][0], "dish_name": dishes[index][1], "our_price": _rounded(our_prices[index])}
+
+
+def compute_recommendations(dishes, samples, category_level):
+    band_low_ratio, band_high_ratio = CATEGORY_PRICE_BANDS.get(category_level, CATEGORY_PRICE_BANDS["medium"])
+
+    dish_ids = [row[0] for row in dishes]
+    our_prices = _as_float_array(row[3] for row in dishes)
+    competitor_avgs = _as_float_array(row[4] for row in dishes)
+
+    valid = np.isfinite(our_prices) & np.isfinite(competitor_avgs) & (competitor_avgs > 0)
+    safe_avgs = np.where(valid, competitor_avgs, 1.0)
+    gap_percent = np.where(valid, (our_prices - safe_avgs) / safe_avgs * 100.0, np.nan)
+    band_low = competitor_avgs * band_low_ratio
+    band_high = competitor_avgs * band_high_ratio
+    suggested_prices = np.where(valid, np.clip(our_prices, band_low, band_high), np.nan)
+
+    actions = np.select(
+        [valid & (our_prices > band_high), valid & (our_prices < band_low)], ["reduce", "increase"], "keep"
+    )
+    positions = np.select(
+        [gap_percent > POSITION_THRESHOLD_PERCENT, gap_percent < -POSITION_THRESHOLD_PERCENT],
+        ["higher", "lower"],
+        "competitive",
+    )
+    safe_prices = np.where(valid & (our_prices > 0), our_prices, 1.0)
+    change_percent = np.where(valid, (suggested_prices - our_prices) / safe_prices * 100.0, 0.0)
+    percentiles = _percentile_positions(dish_ids, our_prices, samples)
+
+    recommendations = []
+    for index, row in enumerate(dishes):
+        action = str(actions[index])
+        rounded_gap = int(round(abs(gap_percent[index]))) if valid[index] else 0
+        rounded_change = int(round(abs(change_percent[index])))
+
+        if action == "reduce":
+            suggestion = f"Reduce price by {rounded_change}%"
+            reason = f"Price is {rounded_gap}% higher than competitor average"
+        elif action == "increase":
+            suggestion = f"Increase price by {rounded_change}%"
+            reason = f"Currently priced {rounded_gap}% below competitor average"
+        else:
+            suggestion = "Keep price unchanged"
+            reason = "Price is competitive in the market"
+
+        recommendations.append(
+            {
+                "dish_id": row[0],
+                "dish_name": row[1],
+                "category": row[2],
+                "our_price": _rounded(our_prices[index]),
+                "competitor_avg": _rounded(competitor_avgs[index]),
+                "gap_percent": _rounded(gap_percent[index]),
+                "percentile": _rounded(percentiles[index], 1),
+                "position": str(positions[index]),
+                "action": action,
+                "band_low": _rounded(band_low[index]),
+                "band_high": _rounded(band_high[index]),
+                "suggested_price": _rounded(suggested_prices[index]),
+                "suggestion": suggestion,
+                "reason": reason,
+                "score": _rounded(abs(gap_percent[index])) if action != "keep" else 0,
+            }
+        )
+
+    recommendations.sort(key=lambda item: item["score"], reverse=True)
+
+    dish_count = len(dishes)
+    highest_index = int(np.nanargmax(our_prices)) if np.isfinite(our_prices).any() else None
+    lowest_index = int(np.nanargmin(our_prices)) if np.isfinite(our_prices).any() else None
+    summary = {
+        "dish_count": dish_count,
+        "average_gap_percent": _rounded(np.nanmean(gap_percent)) if valid.any() else 0.0,
+        "undercut_percent": _rounded((competitor_avgs < our_prices).sum() / dish_count * 100.0) if dish_count else 0.0,
+        "highest_priced_dish": _dish_reference(dishes, our_prices, highest_index),
+        "lowest_priced_dish": _dish_reference(dishes, our_prices, lowest_index),
+        "position_counts": {
+            "higher": int((positions == "higher").sum()),
+            "lower": int((positions == "lower").sum()),
+            "competitive": int((positions == "competitive").sum()),
+        },
+    }
+
+    return {"category_level": category_level, "summary": summary, "recommendations": recommendations}
+
+
+def get_recommendations(connection, restaurant_id, category_level):
+    version = fetch_pricing_version(connection, restaurant_id)
+    cache_key = (version, category_level)
+
+    with _cache_lock:
+        cached = _cache.get(restaurant_id)
+    if cached and cached[0] == cache_key:
+        return cached[1]
+
+    result = compute_recommendations(
+        _fetch_dishes(connection, restaurant_id),
+        _fetch_competitor_samples(connection, restaurant_id),
+        category_level,
+    )
+    result["pricing_version"] = version
+
+    with _cache_lock:
+        _cache[restaurant_id] = (cache_key, result)
+    return result
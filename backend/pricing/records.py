@@ -0,0 +1,57 @@
+import sys
+from array import array
+
+
+class PriceObservation:
+    __slots__ = ("dish_name", "price")
+
+    def __init__(self, dish_name, price):
+        self.dish_name = sys.intern(dish_name)
+        self.price = float(price)
+
+    def __eq__(self, other):
+        if not isinstance(other, PriceObservation):
+            return NotImplemented
+        return self.dish_name == other.dish_name and self.price == other.price
+
+    def __repr__(self):
+        return f"PriceObservation({self.dish_name!r}, {self.price!r})"
+
+    def to_dict(self):
+        return {"dish_name": self.dish_name, "price": self.price}
+
+
+class PriceColumns:
+    __slots__ = ("dish_names", "prices")
+
+    def __init__(self, observations=()):
+        self.dish_names = []
+        self.prices = array("d")
+        self.extend(observations)
+
+    def __len__(self):
+        return len(self.prices)
+
+    def __iter__(self):
+        for dish_name, price in zip(self.dish_names, self.prices):
+            yield PriceObservation(dish_name, price)
+
+    def __getstate__(self):
+        return self.dish_names, self.prices.tobytes()
+
+    def __setstate__(self, state):
+        dish_names, price_bytes = state
+        self.dish_names = [sys.intern(dish_name) for dish_name in dish_names]
+        self.prices = array("d")
+        self.prices.frombytes(price_bytes)
+
+    def append(self, dish_name, price):
+        self.dish_names.append(sys.intern(dish_name))
+        self.prices.append(float(price))
+
+    def extend(self, observations):
+        for observation in observations:
+            self.append(observation.dish_name, observation.price)
+
+    def to_dicts(self):
+        return [{"dish_name": dish_name, "price": price} for dish_name, price in zip(self.dish_names, self.prices)]
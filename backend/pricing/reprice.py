@@ -0,0 +1,151 @@
+import math
+
+from config import STREAM_CONFIG
+
+
+def _parse_price(raw_value):
+    try:
+        price = round(float(raw_value), 2)
+    except (TypeError, ValueError):
+        return None
+    return price if math.isfinite(price) and price >= 0 else None
+
+
+def parse_reprice_payload(payload, max_changes):
+    raw_changes = payload.get("changes")
+    raw_rule = payload.get("rule")
+
+    if (raw_changes is None) == (raw_rule is None):
+        return None, None, "Provide either changes or rule"
+
+    if raw_changes is not None:
+        if not isinstance(raw_changes, list) or not raw_changes:
+            return None, None, "changes must be a non-empty list"
+        if len(raw_changes) > max_changes:
+            return None, None, f"changes must contain at most {max_changes} items"
+
+        changes = {}
+        for index, raw_change in enumerate(raw_changes):
+            if not isinstance(raw_change, dict):
+                return None, None, f"changes[{index}] must be an object"
+            try:
+                dish_id = int(raw_change.get("dish_id"))
+            except (TypeError, ValueError):
+                return None, None, f"changes[{index}].dish_id must be an integer"
+            our_price = _parse_price(raw_change.get("our_price"))
+            if our_price is None:
+                return None, None, f"changes[{index}].our_price must be a finite, non-negative number"
+            changes[dish_id] = our_price
+        return changes, None, None
+
+    if not isinstance(raw_rule, dict):
+        return None, None, "rule must be an object"
+
+    category = str(raw_rule.get("category") or "").strip()
+    if not category:
+        return None, None, "rule.category is required"
+
+    has_percent = raw_rule.get("percent") is not None
+    has_amount = raw_rule.get("amount") is not None
+    if has_percent == has_amount:
+        return None, None, "rule must set exactly one of percent or amount"
+
+    try:
+        adjustment = float(raw_rule.get("percent") if has_percent else raw_rule.get("amount"))
+    except (TypeError, ValueError):
+        return None, None, "rule adjustment must be a number"
+    if not math.isfinite(adjustment):
+        return None, None, "rule adjustment must be a finite number"
+
+    rule = {
+        "category": category,
+        "percent": adjustment if has_percent else None,
+        "amount": None if has_percent else adjustment,
+    }
+    return None, rule, None
+
+
+def _rule_price(current_price, rule):
+    if rule["percent"] is not None:
+        new_price = current_price * (1 + rule["percent"] / 100.0)
+    else:
+        new_price = current_price + rule["amount"]
+    return round(max(new_price, 0.0), 2)
+
+
+def _select_targets(cursor, restaurant_id, changes, rule):
+    if changes is not None:
+        placeholders = ", ".join(["%s"] * len(changes))
+        cursor.execute(
+            f"""
+            SELECT id, dish_name, our_price
+            FROM dishes
+            WHERE restaurant_id = %s AND id IN ({placeholders})
+            FOR UPDATE
+            """,
+            (restaurant_id, *changes.keys()),
+        )
+    else:
+        cursor.execute(
+            """
+            SELECT id, dish_name, our_price
+            FROM dishes
+            WHERE restaurant_id = %s AND LOWER(category) = LOWER(%s)
+            FOR UPDATE
+            """,
+            (restaurant_id, rule["category"]),
+        )
+    return cursor.fetchall()
+
+
+def apply_reprice(connection, restaurant_id, changes=None, rule=None):
+    cursor = connection.cursor()
+    try:
+        applied = []
+        for dish_id, dish_name, current_price in _select_targets(cursor, restaurant_id, changes, rule):
+            old_price = round(float(current_price), 2) if current_price is not None else None
+            new_price = changes[dish_id] if changes is not None else _rule_price(old_price or 0.0, rule)
+            if old_price is not None and new_price == old_price:
+                continue
+            applied.append((dish_id, dish_name, old_price, new_price))
+
+        if not applied:
+            return []
+
+        # A whole category can be large: batch the CASE update and history insert so neither
+        # exceeds the driver's bound-parameter limit or max_allowed_packet.
+        batch_size = STREAM_CONFIG["write_batch_size"]
+        for start in range(0, len(applied), batch_size):
+            batch = applied[start:start + batch_size]
+            case_clauses = " ".join(["WHEN %s THEN %s"] * len(batch))
+            id_placeholders = ", ".join(["%s"] * len(batch))
+            case_params = [value for dish_id, _, _, new_price in batch for value in (dish_id, new_price)]
+            cursor.execute(
+                f"""
+                UPDATE dishes
+                SET our_price = CASE id {case_clauses} END
+                WHERE restaurant_id = %s AND id IN ({id_placeholders})
+                """,
+                (*case_params, restaurant_id, *(dish_id for dish_id, _, _, _ in batch)),
+            )
+
+            history_placeholders = ", ".join(["(%s, %s, %s, 'our_price', %s)"] * len(batch))
+            history_params = [
+                value
+                for dish_id, dish_name, _, new_price in batch
+                for value in (restaurant_id, dish_id, dish_name, new_price)
+            ]
+            cursor.execute(
+                f"""
+                INSERT INTO dish_price_history (restaurant_id, dish_id, dish_name, metric, price_value)
+                VALUES {history_placeholders}
+                """,
+                tuple(history_params),
+            )
+
+        return [
+            {"dish_id": dish_id, "dish_name": dish_name, "old_price": old_price, "new_price": new_price}
+            for dish_id, dish_name, old_price, new_price in applied
+        ]
+    finally:
+        cursor.close()
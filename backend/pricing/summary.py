@@ -0,0 +1,84 @@
+STATUS_BANDS = ("low", "medium", "premium")
+
+
+def refresh_restaurant_summary(connection, restaurant_id) -> None:
+    if not restaurant_id:
+        return
+
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            """
+            INSERT INTO restaurant_summaries (
+                restaurant_id, total_competitors, dishes_tracked_total,
+                low_count, low_dishes_tracked, medium_count, medium_dishes_tracked,
+                premium_count, premium_dishes_tracked, last_scraped_at, last_updated, refreshed_at
+            )
+            SELECT %s,
+                   COUNT(*),
+                   COALESCE(SUM(dishes_tracked), 0),
+                   COALESCE(SUM(LOWER(status) = 'low'), 0),
+                   COALESCE(SUM(IF(LOWER(status) = 'low', dishes_tracked, 0)), 0),
+                   COALESCE(SUM(LOWER(status) = 'medium'), 0),
+                   COALESCE(SUM(IF(LOWER(status) = 'medium', dishes_tracked, 0)), 0),
+                   COALESCE(SUM(LOWER(status) = 'premium'), 0),
+                   COALESCE(SUM(IF(LOWER(status) = 'premium', dishes_tracked, 0)), 0),
+                   MAX(last_scraped_at),
+                   MAX(last_updated),
+                   UTC_TIMESTAMP()
+            FROM competitors
+            WHERE restaurant_id = %s
+            ON DUPLICATE KEY UPDATE
+                total_competitors = VALUES(total_competitors),
+                dishes_tracked_total = VALUES(dishes_tracked_total),
+                low_count = VALUES(low_count),
+                low_dishes_tracked = VALUES(low_dishes_tracked),
+                medium_count = VALUES(medium_count),
+                medium_dishes_tracked = VALUES(medium_dishes_tracked),
+                premium_count = VALUES(premium_count),
+                premium_dishes_tracked = VALUES(premium_dishes_tracked),
+                last_scraped_at = VALUES(last_scraped_at),
+                last_updated = VALUES(last_updated),
+                refreshed_at = VALUES(refreshed_at)
+            """,
+            (restaurant_id, restaurant_id),
+        )
+    finally:
+        cursor.close()
+
+
+def fetch_restaurant_summary(connection, restaurant_id):
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute(
+            """
+            SELECT restaurant_id, total_competitors, dishes_tracked_total,
+                   low_count, low_dishes_tracked, medium_count, medium_dishes_tracked,
+                   premium_count, premium_dishes_tracked, last_scraped_at, last_updated, refreshed_at
+            FROM restaurant_summaries
+            WHERE restaurant_id = %s
+            """,
+            (restaurant_id,),
+        )
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+
+    if not row:
+        return None
+
+    return {
+        "restaurant_id": row["restaurant_id"],
+        "total_competitors": int(row["total_competitors"] or 0),
+        "dishes_tracked_total": int(row["dishes_tracked_total"] or 0),
+        "status_bands": {
+            band: {
+                "competitor_count": int(row[f"{band}_count"] or 0),
+                "dishes_tracked_total": int(row[f"{band}_dishes_tracked"] or 0),
+            }
+            for band in STATUS_BANDS
+        },
+        "last_scraped_at": row["last_scraped_at"],
+        "last_updated": row["last_updated"],
+        "refreshed_at": row["refreshed_at"],
+    }
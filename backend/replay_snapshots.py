@@ -0,0 +1,181 @@
+import argparse
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+
+from config import SNAPSHOT_CONFIG
+from pricing.records import PriceColumns
+from scraper.adapters import resolve_adapter
+from storage.backends import get_connection
+from storage.history_archive import hot_window_start
+from storage.snapshot_store import fetch_snapshot_index, read_snapshot
+
+
+def _extract_snapshot(page_key):
+    from scraper.adapters import get_adapter
+
+    content_hash, adapter_name = page_key
+    try:
+        raw_html = read_snapshot(content_hash)
+    except OSError as error:
+        print(f"Skipping snapshot {content_hash}: {error}")
+        return page_key, None
+    _, dishes = get_adapter(adapter_name).extract(raw_html.decode("utf-8", errors="replace"))
+    return page_key, PriceColumns(dishes)
+
+
+def _page_key(snapshot):
+    _, _, content_hash, _, source, platform, website_url = snapshot
+    return content_hash, resolve_adapter(platform, website_url, source).name
+
+
+def _parse_date(raw_value):
+    return datetime.fromisoformat(raw_value) if raw_value else None
+
+
+def _fetch_dish_ids(connection, restaurant_id):
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT id, dish_name FROM dishes WHERE restaurant_id = %s", (restaurant_id,))
+        return {str(dish_name).strip().lower(): dish_id for dish_id, dish_name in cursor.fetchall() if dish_name}
+    finally:
+        cursor.close()
+
+
+def _replay_windows(history_rows):
+    windows = {}
+    for restaurant_id, dish_id, _, _, competitor_id, captured_at in history_rows:
+        key = (restaurant_id, dish_id, competitor_id)
+        if key not in windows or captured_at < windows[key]:
+            windows[key] = captured_at
+    return windows
+
+
+def _clear_replayed_window(connection, windows, until) -> int:
+    query = """
+        DELETE FROM dish_price_history
+        WHERE restaurant_id = %s AND dish_id = %s AND competitor_id = %s
+          AND metric = 'competitor_avg' AND recorded_at >= %s
+    """
+    if until is not None:
+        query += " AND recorded_at < %s"
+
+    cleared_rows = 0
+    cursor = connection.cursor()
+    try:
+        for (restaurant_id, dish_id, competitor_id), window_start in windows.items():
+            params = (restaurant_id, dish_id, competitor_id, window_start) + ((until,) if until is not None else ())
+            cursor.execute(query, params)
+            cleared_rows += max(cursor.rowcount, 0)
+    finally:
+        cursor.close()
+    return cleared_rows
+
+
+def _insert_history(connection, history_rows) -> None:
+    cursor = connection.cursor()
+    try:
+        cursor.executemany(
+            """
+            INSERT INTO dish_price_history (
+                restaurant_id, dish_id, dish_name, metric, price_value, competitor_id, recorded_at
+            )
+            VALUES (%s, %s, %s, 'competitor_avg', %s, %s, %s)
+            """,
+            history_rows,
+        )
+    finally:
+        cursor.close()
+
+
+def _iter_history_rows(connection, snapshots, dishes_by_page):
+    dish_ids_by_restaurant = {}
+    for snapshot in snapshots:
+        competitor_id, restaurant_id, captured_at = snapshot[0], snapshot[1], snapshot[3]
+        observations = dishes_by_page.get(_page_key(snapshot))
+        if not observations or not restaurant_id:
+            continue
+
+        if restaurant_id not in dish_ids_by_restaurant:
+            dish_ids_by_restaurant[restaurant_id] = _fetch_dish_ids(connection, restaurant_id)
+        dish_ids = dish_ids_by_restaurant[restaurant_id]
+
+        for observation in observations:
+            dish_id = dish_ids.get(observation.dish_name.strip().lower())
+            if dish_id is not None:
+                yield restaurant_id, dish_id, observation.dish_name, observation.price, competitor_id, captured_at
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-run extraction over stored snapshots and backfill price history.")
+    parser.add_argument("--competitor-id", type=int, help="Only replay snapshots of this competitor")
+    parser.add_argument("--restaurant-id", type=int, help="Only replay snapshots of this restaurant")
+    parser.add_argument("--since", help="Only replay snapshots captured at or after this ISO date")
+    parser.add_argument("--until", help="Only replay snapshots captured before this ISO date")
+    parser.add_argument("--workers", type=int, default=SNAPSHOT_CONFIG["replay_workers"], help="Extraction processes")
+    parser.add_argument("--dry-run", action="store_true", help="Extract and count rows without writing them")
+    args = parser.parse_args()
+
+    until = _parse_date(args.until)
+    since = _parse_date(args.since)
+    # History older than the hot window is (or is about to be) in the Parquet archive, which
+    # replay cannot rewrite, so replaying it would only duplicate archived rows.
+    hot_start = hot_window_start(datetime.utcnow())
+    if since is None or since < hot_start:
+        print(f"Replaying only snapshots captured at or after the archive cutoff {hot_start:%Y-%m-%d %H:%M}")
+        since = hot_start
+    if until is not None and until <= since:
+        print("Nothing to replay: the requested window is entirely archived")
+        return
+
+    connection = get_connection()
+    try:
+        snapshots = fetch_snapshot_index(
+            connection,
+            competitor_id=args.competitor_id,
+            restaurant_id=args.restaurant_id,
+            since=since,
+            until=until,
+        )
+        unique_pages = list(dict.fromkeys(_page_key(snapshot) for snapshot in snapshots))
+        print(f"Replaying {len(snapshots)} snapshots ({len(unique_pages)} unique pages)")
+
+        worker_count = args.workers or os.cpu_count() or 1
+        dishes_by_page = {}
+        with ProcessPoolExecutor(max_workers=worker_count, mp_context=multiprocessing.get_context("spawn")) as executor:
+            chunk_size = max(1, len(unique_pages) // (worker_count * 4))
+            for page_key, dishes in executor.map(_extract_snapshot, unique_pages, chunksize=chunk_size):
+                dishes_by_page[page_key] = dishes
+
+        # Replay rebuilds each replayed competitor's competitor_avg history for the window it covers:
+        # rows that competitor's live scrapes or an earlier replay wrote there are replaced, so reruns
+        # are idempotent. Other competitors' rows and manual edits (no competitor_id) are kept.
+        windows = _replay_windows(_iter_history_rows(connection, snapshots, dishes_by_page))
+        cleared_rows = 0 if args.dry_run else _clear_replayed_window(connection, windows, until)
+
+        history_rows = _iter_history_rows(connection, snapshots, dishes_by_page)
+        written_rows = 0
+        while True:
+            batch = list(islice(history_rows, SNAPSHOT_CONFIG["replay_batch_size"]))
+            if not batch:
+                break
+            if not args.dry_run:
+                _insert_history(connection, batch)
+            written_rows += len(batch)
+        if not args.dry_run:
+            connection.commit()
+
+        action = "Would write" if args.dry_run else "Wrote"
+        print(f"{action} {written_rows} competitor_avg history rows (replaced {cleared_rows} existing rows)")
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        if connection.is_connected():
+            connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import argparse
+import os
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a standalone distributed scrape scheduler node.")
+    parser.add_argument("--node-id", help="Unique node id (defaults to hostname:pid)")
+    parser.add_argument("--once", action="store_true", help="Run a single pass and exit")
+    args = parser.parse_args()
+
+    os.environ["SCHEDULER_MODE"] = "distributed"
+    if args.node_id:
+        os.environ["SCHEDULER_NODE_ID"] = args.node_id
+
+    import app
+
+    app.ensure_scheduler_tables()
+    app.scheduler_heartbeat_job()
+
+    try:
+        if args.once:
+            app.auto_scrape_all_job()
+            return
+
+        app.start_scheduler()
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if app.scheduler.running:
+            app.scheduler.shutdown(wait=False)
+        app.leave_scheduler_cluster()
+
+
+if __name__ == "__main__":
+    main()
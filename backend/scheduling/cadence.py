@@ -0,0 +1,71 @@
+import hashlib
+from datetime import timedelta
+
+from config import CADENCE_CONFIG
+
+FINGERPRINT_MODULUS = 1 << 160
+
+
+class MenuFingerprint:
+    def __init__(self):
+        self._accumulator = 0
+        self._count = 0
+
+    def update(self, scraped_data):
+        for observation in scraped_data:
+            entry = f"{observation.dish_name.strip().lower()}\x1f{observation.price:.2f}"
+            digest = hashlib.sha1(entry.encode("utf-8")).digest()
+            self._accumulator = (self._accumulator + int.from_bytes(digest, "big")) % FINGERPRINT_MODULUS
+            self._count += 1
+
+    def hexdigest(self):
+        if not self._count:
+            return None
+        return f"{self._accumulator:040x}"
+
+
+def next_interval(current_seconds, changed) -> int:
+    min_seconds = CADENCE_CONFIG["min_interval_seconds"]
+    max_seconds = CADENCE_CONFIG["max_interval_seconds"]
+
+    if not current_seconds:
+        return min_seconds
+    if changed:
+        return max(min_seconds, int(current_seconds) // CADENCE_CONFIG["tighten_factor"])
+    return min(max_seconds, int(current_seconds) * CADENCE_CONFIG["backoff_factor"])
+
+
+def record_scrape_outcome(connection, competitor, fingerprint, now, hold_fingerprint=False) -> bool:
+    previous_fingerprint = competitor.get("menu_fingerprint")
+    changed = fingerprint is not None and previous_fingerprint is not None and fingerprint != previous_fingerprint
+    # A held fingerprint still counts as a change for cadence, but the stored one is kept so
+    # the next pass re-diffs the menu (e.g. while price changes wait in quarantine).
+    stored_fingerprint = None if hold_fingerprint else fingerprint
+
+    interval_seconds = next_interval(competitor.get("scrape_interval_seconds"), changed)
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            """
+            UPDATE competitors
+            SET menu_fingerprint = COALESCE(%s, menu_fingerprint),
+                scrape_interval_seconds = %s,
+                next_scrape_at = %s,
+                last_scraped_at = %s,
+                last_changed_at = IF(%s, %s, last_changed_at)
+            WHERE id = %s
+            """,
+            (
+                stored_fingerprint,
+                interval_seconds,
+                now + timedelta(seconds=interval_seconds),
+                now,
+                changed,
+                now,
+                competitor.get("id"),
+            ),
+        )
+    finally:
+        cursor.close()
+
+    return changed
@@ -0,0 +1,186 @@
+from datetime import timedelta
+
+import requests
+
+from config import CADENCE_CONFIG, HEALTH_CONFIG
+from storage.backends import DatabaseError
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class EmptyMenuError(Exception):
+    pass
+
+
+def classify_failure(error) -> str:
+    if isinstance(error, requests.Timeout):
+        return "timeout"
+    if isinstance(error, requests.HTTPError):
+        status_code = getattr(error.response, "status_code", None)
+        return f"http_{status_code}" if status_code else "http_error"
+    if isinstance(error, requests.ConnectionError):
+        return "connection"
+    if isinstance(error, requests.RequestException):
+        return "request"
+    if isinstance(error, EmptyMenuError):
+        return "empty_menu"
+    if isinstance(error, OSError):
+        return "file"
+    return "extract"
+
+
+def counts_against_source(error) -> bool:
+    return not isinstance(error, DatabaseError)
+
+
+def cooldown_seconds(failure_count) -> int:
+    excess_failures = min(32, max(0, failure_count - HEALTH_CONFIG["failure_threshold"]))
+    return min(
+        HEALTH_CONFIG["max_open_seconds"],
+        HEALTH_CONFIG["open_seconds"] * HEALTH_CONFIG["backoff_factor"] ** excess_failures,
+    )
+
+
+def begin_probe(connection, competitor, now) -> bool:
+    if competitor.get("health_state") != CIRCUIT_OPEN:
+        return False
+
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            """
+            UPDATE competitor_health
+            SET state = %s, probe_started_at = %s
+            WHERE competitor_id = %s AND state = %s
+            """,
+            (CIRCUIT_HALF_OPEN, now, competitor.get("id"), CIRCUIT_OPEN),
+        )
+    finally:
+        cursor.close()
+    return True
+
+
+def record_scrape_failure(connection, competitor, error, now) -> str:
+    failure_count = int(competitor.get("consecutive_failures") or 0) + 1
+    failure_kind = classify_failure(error)
+    failure_reason = (str(error) or failure_kind)[: HEALTH_CONFIG["max_reason_length"]]
+    was_tripped = competitor.get("health_state") in (CIRCUIT_OPEN, CIRCUIT_HALF_OPEN)
+
+    if was_tripped or failure_count >= HEALTH_CONFIG["failure_threshold"]:
+        state = CIRCUIT_OPEN
+        retry_at = now + timedelta(seconds=cooldown_seconds(failure_count))
+        opened_at = competitor.get("circuit_opened_at") or now
+    else:
+        state = CIRCUIT_CLOSED
+        retry_at = now + timedelta(seconds=CADENCE_CONFIG["min_interval_seconds"])
+        opened_at = None
+
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            """
+            INSERT INTO competitor_health (
+                competitor_id, state, consecutive_failures, opened_at,
+                last_failure_kind, last_failure_reason, last_failure_at
+            )
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                state = VALUES(state),
+                consecutive_failures = VALUES(consecutive_failures),
+                opened_at = VALUES(opened_at),
+                last_failure_kind = VALUES(last_failure_kind),
+                last_failure_reason = VALUES(last_failure_reason),
+                last_failure_at = VALUES(last_failure_at)
+            """,
+            (competitor.get("id"), state, failure_count, opened_at, failure_kind, failure_reason, now),
+        )
+        cursor.execute(
+            "UPDATE competitors SET next_scrape_at = %s WHERE id = %s",
+            (retry_at, competitor.get("id")),
+        )
+        if state == CIRCUIT_OPEN:
+            cursor.execute(
+                """
+                INSERT INTO competitor_dead_letters (
+                    competitor_id, restaurant_id, failure_kind, failure_reason, failure_count, retry_at, created_at
+                )
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                """,
+                (
+                    competitor.get("id"),
+                    competitor.get("restaurant_id"),
+                    failure_kind,
+                    failure_reason,
+                    failure_count,
+                    retry_at,
+                    now,
+                ),
+            )
+    finally:
+        cursor.close()
+
+    return state
+
+
+def _close_circuit(cursor, competitor_id, now) -> None:
+    cursor.execute(
+        """
+        UPDATE competitor_health
+        SET state = %s, consecutive_failures = 0, opened_at = NULL, probe_started_at = NULL
+        WHERE competitor_id = %s
+        """,
+        (CIRCUIT_CLOSED, competitor_id),
+    )
+    cursor.execute(
+        """
+        UPDATE competitor_dead_letters
+        SET resolved_at = %s
+        WHERE competitor_id = %s AND resolved_at IS NULL
+        """,
+        (now, competitor_id),
+    )
+
+
+def record_scrape_success(connection, competitor, now) -> bool:
+    if not competitor.get("consecutive_failures") and competitor.get("health_state") in (None, CIRCUIT_CLOSED):
+        return False
+
+    cursor = connection.cursor()
+    try:
+        _close_circuit(cursor, competitor.get("id"), now)
+    finally:
+        cursor.close()
+    return True
+
+
+def reset_competitor_health(connection, competitor_id, now) -> None:
+    cursor = connection.cursor()
+    try:
+        _close_circuit(cursor, competitor_id, now)
+        cursor.execute("UPDATE competitors SET next_scrape_at = NULL WHERE id = %s", (competitor_id,))
+    finally:
+        cursor.close()
+
+
+def fetch_dead_letters(connection, restaurant_id, include_resolved=False, limit=100):
+    query = """
+        SELECT d.id, d.competitor_id, c.restaurant_name, c.website_url, c.mock_file,
+               d.failure_kind, d.failure_reason, d.failure_count, d.retry_at, d.created_at, d.resolved_at,
+               h.state AS health_state
+        FROM competitor_dead_letters d
+        LEFT JOIN competitors c ON c.id = d.competitor_id
+        LEFT JOIN competitor_health h ON h.competitor_id = d.competitor_id
+        WHERE d.restaurant_id = %s
+    """
+    if not include_resolved:
+        query += " AND d.resolved_at IS NULL"
+    query += " ORDER BY d.created_at DESC, d.id DESC LIMIT %s"
+
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute(query, (restaurant_id, limit))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
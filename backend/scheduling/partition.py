@@ -0,0 +1,95 @@
+import hashlib
+import os
+import socket
+import uuid
+
+from config import SCHEDULER_CONFIG
+
+_node_ids = {}
+
+
+def current_node_id() -> str:
+    process_id = os.getpid()
+    if process_id not in _node_ids:
+        _node_ids[process_id] = SCHEDULER_CONFIG["node_id"] or f"{socket.gethostname()}:{process_id}"
+    return _node_ids[process_id]
+
+
+def is_distributed_mode() -> bool:
+    return SCHEDULER_CONFIG["mode"] == "distributed"
+
+
+def _rendezvous_score(node_id, competitor_id) -> int:
+    digest = hashlib.sha1(f"{node_id}:{competitor_id}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def owner_for(competitor_id, live_nodes):
+    if not live_nodes:
+        return None
+    return max(live_nodes, key=lambda node_id: (_rendezvous_score(node_id, competitor_id), node_id))
+
+
+def register_heartbeat(connection, node_id) -> None:
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            """
+            INSERT INTO scheduler_nodes (node_id, heartbeat_at)
+            VALUES (%s, UTC_TIMESTAMP(6))
+            ON DUPLICATE KEY UPDATE heartbeat_at = VALUES(heartbeat_at)
+            """,
+            (node_id,),
+        )
+    finally:
+        cursor.close()
+
+
+def remove_node(connection, node_id) -> None:
+    cursor = connection.cursor()
+    try:
+        cursor.execute("DELETE FROM scheduler_nodes WHERE node_id = %s", (node_id,))
+    finally:
+        cursor.close()
+
+
+def fetch_live_nodes(connection):
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            """
+            SELECT node_id
+            FROM scheduler_nodes
+            WHERE heartbeat_at >= UTC_TIMESTAMP(6) - INTERVAL %s SECOND
+            ORDER BY node_id
+            """,
+            (SCHEDULER_CONFIG["heartbeat_ttl_seconds"],),
+        )
+        return [row[0] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def acquire_competitor_lease(connection, competitor_id, node_id, lease_seconds) -> bool:
+    lease_token = uuid.uuid4().hex
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            """
+            INSERT INTO competitor_leases (competitor_id, node_id, lease_token, lease_until)
+            VALUES (%s, %s, %s, UTC_TIMESTAMP(6) + INTERVAL %s SECOND)
+            ON DUPLICATE KEY UPDATE
+                node_id = IF(lease_until < UTC_TIMESTAMP(6), VALUES(node_id), node_id),
+                lease_token = IF(lease_until < UTC_TIMESTAMP(6), VALUES(lease_token), lease_token),
+                lease_until = IF(lease_until < UTC_TIMESTAMP(6), VALUES(lease_until), lease_until)
+            """,
+            (competitor_id, node_id, lease_token, int(lease_seconds)),
+        )
+        cursor.execute(
+            "SELECT lease_token FROM competitor_leases WHERE competitor_id = %s",
+            (competitor_id,),
+        )
+        row = cursor.fetchone()
+        return bool(row) and row[0] == lease_token
+    finally:
+        cursor.close()
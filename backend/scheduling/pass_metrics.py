@@ -0,0 +1,111 @@
+import time
+
+
+class ScrapePassStats:
+    def __init__(self, node_id, started_at, budget_seconds):
+        self.node_id = node_id
+        self.started_at = started_at
+        self.budget_seconds = budget_seconds
+        self.deadline = time.monotonic() + budget_seconds
+        self._started = time.monotonic()
+        self.duration_seconds = None
+        self.due_count = 0
+        self.scraped_count = 0
+        self.failed_count = 0
+        self.deferred_count = 0
+        self.max_lag_seconds = 0.0
+        self._total_lag_seconds = 0.0
+        self.max_write_wait_seconds = 0.0
+
+    def budget_exhausted(self) -> bool:
+        return time.monotonic() >= self.deadline
+
+    def record_due(self, competitor) -> None:
+        self.due_count += 1
+        next_scrape_at = competitor.get("next_scrape_at")
+        lag_seconds = max(0.0, (self.started_at - next_scrape_at).total_seconds()) if next_scrape_at else 0.0
+        self.max_lag_seconds = max(self.max_lag_seconds, lag_seconds)
+        self._total_lag_seconds += lag_seconds
+
+    def record_write_wait(self, fetched_at) -> None:
+        self.max_write_wait_seconds = max(self.max_write_wait_seconds, time.monotonic() - fetched_at)
+
+    @property
+    def avg_lag_seconds(self) -> float:
+        return self._total_lag_seconds / self.due_count if self.due_count else 0.0
+
+    def finish(self) -> None:
+        self.duration_seconds = time.monotonic() - self._started
+
+    def to_dict(self):
+        return {
+            "node_id": self.node_id,
+            "started_at": self.started_at,
+            "duration_seconds": round(self.duration_seconds or 0.0, 3),
+            "budget_seconds": self.budget_seconds,
+            "due_count": self.due_count,
+            "scraped_count": self.scraped_count,
+            "failed_count": self.failed_count,
+            "deferred_count": self.deferred_count,
+            "max_lag_seconds": round(self.max_lag_seconds, 3),
+            "avg_lag_seconds": round(self.avg_lag_seconds, 3),
+            "max_write_wait_seconds": round(self.max_write_wait_seconds, 3),
+            "budget_exhausted": self.deferred_count > 0,
+        }
+
+
+def record_pass_metrics(connection, stats) -> None:
+    metrics = stats.to_dict()
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            """
+            INSERT INTO scrape_pass_metrics (
+                node_id, started_at, duration_seconds, budget_seconds, due_count, scraped_count, failed_count,
+                deferred_count, max_lag_seconds, avg_lag_seconds, max_write_wait_seconds, budget_exhausted
+            )
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """,
+            (
+                metrics["node_id"],
+                metrics["started_at"],
+                metrics["duration_seconds"],
+                metrics["budget_seconds"],
+                metrics["due_count"],
+                metrics["scraped_count"],
+                metrics["failed_count"],
+                metrics["deferred_count"],
+                metrics["max_lag_seconds"],
+                metrics["avg_lag_seconds"],
+                metrics["max_write_wait_seconds"],
+                metrics["budget_exhausted"],
+            ),
+        )
+    finally:
+        cursor.close()
+
+
+def fetch_pass_metrics(connection, limit=100):
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute(
+            """
+            SELECT id, node_id, started_at, duration_seconds, budget_seconds, due_count, scraped_count,
+                   failed_count, deferred_count, max_lag_seconds, avg_lag_seconds, max_write_wait_seconds,
+                   budget_exhausted
+            FROM scrape_pass_metrics
+            ORDER BY started_at DESC, id DESC
+            LIMIT %s
+            """,
+            (limit,),
+        )
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    for row in rows:
+        for field in ("duration_seconds", "max_lag_seconds", "avg_lag_seconds", "max_write_wait_seconds"):
+            if row[field] is not None:
+                row[field] = float(row[field])
+        row["budget_exhausted"] = bool(row["budget_exhausted"])
+    return rows
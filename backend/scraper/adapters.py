@@ -0,0 +1,123 @@
+import html
+import json
+import re
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+from config import EXTRACTOR_CONFIG
+from scraper.embedded_data import iter_embedded_dishes
+from scraper.stream_parser import iter_html_dishes
+from scraper.structured_data import extract_structured_dishes, iter_json_ld_dishes
+
+JSON_LD_PATTERN = re.compile(
+    r"<script\b[^>]*type\s*=\s*[\"']?application/ld\+json[\"']?[^>]*>(.*?)</script\s*>",
+    re.IGNORECASE | re.DOTALL,
+)
+TITLE_PATTERN = re.compile(r"<title\b[^>]*>(.*?)</title\s*>", re.IGNORECASE | re.DOTALL)
+
+
+def _page_title(html_content: str):
+    title_match = TITLE_PATTERN.search(html_content)
+    if not title_match:
+        return None
+    return " ".join(html.unescape(title_match.group(1)).split()) or None
+
+
+def _unique_by_name(dishes):
+    seen_names = set()
+    unique_dishes = []
+    for dish in dishes:
+        normalized = dish.dish_name.lower()
+        if normalized not in seen_names:
+            seen_names.add(normalized)
+            unique_dishes.append(dish)
+    return unique_dishes
+
+
+def extract_menu_dom(html_content: str):
+    return None, list(iter_html_dishes([html_content]))
+
+
+def extract_json_ld(html_content: str):
+    dishes = []
+    for script_match in JSON_LD_PATTERN.finditer(html_content):
+        try:
+            document = json.loads(script_match.group(1))
+        except ValueError:
+            continue
+        dishes.extend(iter_json_ld_dishes(document))
+    return _page_title(html_content), dishes
+
+
+def extract_embedded_json(html_content: str):
+    return _page_title(html_content), _unique_by_name(iter_embedded_dishes(html_content))
+
+
+class ExtractorAdapter:
+    __slots__ = ("name", "extract")
+
+    def __init__(self, name, extract):
+        self.name = name
+        self.extract = extract
+
+    def __repr__(self):
+        return f"ExtractorAdapter({self.name!r})"
+
+
+ADAPTERS = {
+    adapter.name: adapter
+    for adapter in (
+        ExtractorAdapter("menu_dom", extract_menu_dom),
+        ExtractorAdapter("json_ld", extract_json_ld),
+        ExtractorAdapter("embedded_json", extract_embedded_json),
+        ExtractorAdapter("structured", extract_structured_dishes),
+    )
+}
+
+
+def _compile_mapping(mapping, label):
+    compiled = {}
+    for key, adapter_name in mapping.items():
+        if adapter_name not in ADAPTERS:
+            raise ValueError(f"Unknown extractor adapter {adapter_name!r} for {label} {key!r}")
+        compiled[key.strip().lower()] = ADAPTERS[adapter_name]
+    return compiled
+
+
+PLATFORM_ADAPTERS = _compile_mapping(EXTRACTOR_CONFIG["platform_adapters"], "platform")
+DOMAIN_ADAPTERS = _compile_mapping(EXTRACTOR_CONFIG["domain_adapters"], "domain")
+SOURCE_ADAPTERS = _compile_mapping(EXTRACTOR_CONFIG["source_adapters"], "source")
+
+
+def get_adapter(name) -> ExtractorAdapter:
+    return ADAPTERS[name]
+
+
+def _website_host(website_url):
+    try:
+        host = urlsplit(website_url if "//" in website_url else f"//{website_url}").hostname or ""
+    except ValueError:
+        return ""
+    return host.lower()
+
+
+@lru_cache(maxsize=1024)
+def _resolve(platform, host, source):
+    if source != "website":
+        return SOURCE_ADAPTERS[source]
+
+    labels = host.split(".") if host else []
+    for index in range(len(labels) - 1):
+        adapter = DOMAIN_ADAPTERS.get(".".join(labels[index:]))
+        if adapter:
+            return adapter
+    return PLATFORM_ADAPTERS.get(platform) or SOURCE_ADAPTERS[source]
+
+
+def resolve_adapter(platform=None, website_url=None, source="website") -> ExtractorAdapter:
+    normalized_platform = (platform or "").strip().lower()
+    return _resolve(normalized_platform, _website_host(website_url or ""), source)
+
+
+def resolve_competitor_adapter(competitor, source) -> ExtractorAdapter:
+    return resolve_adapter(competitor.get("platform"), competitor.get("website_url"), source)
@@ -1,89 +1,58 @@
 import os
-import re
 
-from bs4 import BeautifulSoup
+from config import SCRAPER_CONFIG
+from pricing.records import PriceColumns
+from scraper.file_source import load_page, read_page_bytes
+from scraper.adapters import resolve_adapter
+from scraper.parse_pool import parse_html_bytes
 
 
-def _extract_from_menu_dom(soup: BeautifulSoup):
-    restaurants = soup.find_all("div", class_="restaurant-card")
-    containers = restaurants if restaurants else [soup]
+def _resolve_mock_file(file_name):
+    normalized_name = os.path.basename((file_name or "").strip())
+    if not normalized_name:
+        return None, None
 
-    dishes_list = []
-    for restaurant in containers:
-        menu_items = restaurant.find_all("div", class_="menu-item")
+    file_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "mock_sites", normalized_name)
+    return normalized_name, file_path
 
-        for item in menu_items:
-            name_node = item.find("span", class_="dish-name")
-            price_node = item.find("span", class_="dish-price") or item.find("span", class_="price")
 
-            if not name_node or not price_node:
-                continue
+def iter_competitor_file(file_name, snapshot=None, adapter=None):
+    normalized_name, file_path = _resolve_mock_file(file_name)
+    if not normalized_name:
+        return
 
-            try:
-                dish_name = name_node.text.strip()
-                dish_price = float(price_node.text.strip())
-            except (AttributeError, TypeError, ValueError):
-                continue
-
-            dishes_list.append({"dish_name": dish_name, "price": dish_price})
-
-    return dishes_list
-
-
-def _extract_from_embedded_script(html_content: str):
-    pattern = re.compile(
-        r"name\s*:\s*'(?P<name>[^']+)'\s*,\s*category\s*:\s*'[^']+'\s*,\s*basePrice\s*:\s*(?P<price>\d+(?:\.\d+)?)",
-        re.IGNORECASE,
-    )
-    matches = pattern.findall(html_content)
-
-    dishes_list = []
-    seen_names = set()
-    for name, price_text in matches:
-        dish_name = (name or "").strip()
-        if not dish_name:
-            continue
-
-        normalized = dish_name.lower()
-        if normalized in seen_names:
-            continue
+    try:
+        page = load_page(file_path)
+    except OSError:
+        return
 
-        try:
-            dish_price = float(price_text)
-        except (TypeError, ValueError):
-            continue
+    if snapshot:
+        snapshot.adopt(page.content_hash, page.size, lambda: read_page_bytes(file_path))
 
-        seen_names.add(normalized)
-        dishes_list.append({"dish_name": dish_name, "price": dish_price})
+    adapter = adapter or resolve_adapter(source="file")
+    dishes = page.parsed.get(adapter.name)
+    if dishes is None:
+        if SCRAPER_CONFIG["parse_backend"] == "process":
+            _, dishes = parse_html_bytes(read_page_bytes(file_path), adapter.name)
+        else:
+            dishes = PriceColumns(adapter.extract(page.text)[1])
+        page.parsed[adapter.name] = dishes
 
-    return dishes_list
+    yield from dishes
 
 
 def scrape_competitor_file(file_name):
-    try:
-        normalized_name = os.path.basename((file_name or "").strip())
-        if not normalized_name:
-            return []
-
-        file_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "mock_sites", normalized_name)
-
-        with open(file_path, "r", encoding="utf-8") as html_file:
-            html_content = html_file.read()
-    except FileNotFoundError:
-        return []
-    except OSError:
+    normalized_name, file_path = _resolve_mock_file(file_name)
+    if not normalized_name or not os.path.isfile(file_path):
         return []
 
     try:
-        soup = BeautifulSoup(html_content, "html.parser")
-        dishes_list = _extract_from_menu_dom(soup)
-        if not dishes_list:
-            dishes_list = _extract_from_embedded_script(html_content)
+        dishes = PriceColumns(iter_competitor_file(normalized_name))
 
         return {
             "competitor": normalized_name,
-            "total_dishes": len(dishes_list),
-            "data": dishes_list,
+            "total_dishes": len(dishes),
+            "data": dishes.to_dicts(),
         }
     except Exception:
         return []
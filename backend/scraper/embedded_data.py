@@ -0,0 +1,156 @@
+import re
+
+from config import SCRAPER_CONFIG
+from pricing.records import PriceObservation
+
+SCRIPT_OPEN_PATTERN = re.compile(r"<script\b[^>]*>", re.IGNORECASE)
+SCRIPT_CLOSE_PATTERN = re.compile(r"</script\s*>", re.IGNORECASE)
+# An unterminated string is consumed up to the end of its line as one "broken" token, so the
+# scan resumes past it instead of retrying a string at every later position (quadratic time).
+TOKEN_PATTERN = re.compile(
+    r"(?P<string>\"(?:[^\"\\\n]|\\.)*\"|'(?:[^'\\\n]|\\.)*')"
+    r"|(?P<broken>\"(?:[^\"\\\n]|\\.)*\\?|'(?:[^'\\\n]|\\.)*\\?)"
+    r"|(?P<number>-?\d+(?:\.\d+)?)"
+    r"|(?P<ident>[A-Za-z_$][\w$]*)"
+    r"|(?P<punct>[{}\[\]:,])"
+)
+PRICE_HINT_PATTERN = re.compile(r"price|cost|amount|mrp", re.IGNORECASE)
+ESCAPE_PATTERN = re.compile(
+    r"\\u(?P<high>[dD][89abAB][0-9a-fA-F]{2})\\u(?P<low>[dD][c-fC-F][0-9a-fA-F]{2})"
+    r"|\\u\{(?P<code_point>[0-9a-fA-F]{1,6})\}"
+    r"|\\(?:u(?P<unicode>[0-9a-fA-F]{4})|x(?P<hex>[0-9a-fA-F]{2})|(?P<char>.))",
+    re.DOTALL,
+)
+SIMPLE_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "v": "\v", "0": "\0"}
+PRICE_TEXT_PATTERN = re.compile(r"\d+(?:\.\d+)?")
+
+NAME_KEYS = ("name", "dish_name", "dishname", "item_name", "itemname", "title")
+PRICE_KEYS = ("baseprice", "price", "dish_price", "dishprice", "cost", "amount", "mrp")
+
+_STRING = "string"
+_NUMBER = "number"
+_IDENT = "ident"
+_PUNCT = "punct"
+_BROKEN = "broken"
+
+
+def iter_script_blocks(html_content: str):
+    position = 0
+    while True:
+        open_match = SCRIPT_OPEN_PATTERN.search(html_content, position)
+        if not open_match:
+            return
+
+        close_match = SCRIPT_CLOSE_PATTERN.search(html_content, open_match.end())
+        if not close_match:
+            yield html_content[open_match.end():]
+            return
+
+        yield html_content[open_match.end():close_match.start()]
+        position = close_match.end()
+
+
+def _decode_escape(escape_match) -> str:
+    if escape_match.group("high"):
+        high = int(escape_match.group("high"), 16)
+        low = int(escape_match.group("low"), 16)
+        return chr(0x10000 + ((high - 0xD800) << 10) + (low - 0xDC00))
+
+    hex_digits = escape_match.group("code_point") or escape_match.group("unicode") or escape_match.group("hex")
+    if hex_digits:
+        code_point = int(hex_digits, 16)
+        if code_point > 0x10FFFF or 0xD800 <= code_point <= 0xDFFF:
+            return "\ufffd"
+        return chr(code_point)
+
+    escaped_char = escape_match.group("char")
+    return SIMPLE_ESCAPES.get(escaped_char, escaped_char)
+
+
+def _iter_tokens(script_text: str):
+    for token_match in TOKEN_PATTERN.finditer(script_text, 0, SCRAPER_CONFIG["max_script_chars"]):
+        kind = token_match.lastgroup
+        value = token_match.group()
+        if kind == _BROKEN:
+            continue
+        if kind == _STRING:
+            value = ESCAPE_PATTERN.sub(_decode_escape, value[1:-1])
+        yield kind, value
+
+
+def iter_object_literals(script_text: str):
+    stack = []
+    previous_kind = None
+    previous_value = None
+
+    for kind, value in _iter_tokens(script_text):
+        frame = stack[-1] if stack else None
+
+        if kind == _PUNCT and value in "{[":
+            stack.append({"is_object": value == "{", "pairs": {}, "pending_key": None})
+            if frame:
+                frame["pending_key"] = None
+        elif kind == _PUNCT and value in "}]":
+            if stack:
+                closed_frame = stack.pop()
+                if closed_frame["is_object"] and closed_frame["pairs"]:
+                    yield closed_frame["pairs"]
+        elif kind == _PUNCT and value == ":":
+            if frame and frame["is_object"] and previous_kind in (_IDENT, _STRING):
+                frame["pending_key"] = previous_value.lower()
+        elif kind == _PUNCT and value == ",":
+            if frame:
+                frame["pending_key"] = None
+        elif frame and frame["is_object"] and frame["pending_key"] is not None:
+            frame["pairs"].setdefault(frame["pending_key"], (kind, value))
+            frame["pending_key"] = None
+
+        previous_kind = kind
+        previous_value = value
+
+
+def _first_value(pairs, keys):
+    for key in keys:
+        if key in pairs:
+            return pairs[key]
+    return None
+
+
+def dish_from_object(pairs):
+    name_entry = _first_value(pairs, NAME_KEYS)
+    price_entry = _first_value(pairs, PRICE_KEYS)
+    if not name_entry or not price_entry or name_entry[0] != _STRING:
+        return None
+
+    dish_name = name_entry[1].strip()
+    if not dish_name:
+        return None
+
+    price_kind, price_value = price_entry
+    if price_kind == _STRING:
+        price_match = PRICE_TEXT_PATTERN.search(price_value.replace(",", ""))
+        if not price_match:
+            return None
+        price_value = price_match.group()
+    elif price_kind != _NUMBER:
+        return None
+
+    try:
+        dish_price = float(price_value)
+    except (TypeError, ValueError):
+        return None
+
+    if dish_price < 0:
+        return None
+
+    return PriceObservation(dish_name, dish_price)
+
+
+def iter_embedded_dishes(html_content: str):
+    for script_text in iter_script_blocks(html_content):
+        if not PRICE_HINT_PATTERN.search(script_text):
+            continue
+        for pairs in iter_object_literals(script_text):
+            dish = dish_from_object(pairs)
+            if dish:
+                yield dish
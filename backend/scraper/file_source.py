@@ -0,0 +1,74 @@
+import hashlib
+import mmap
+import os
+import threading
+from collections import OrderedDict
+
+from config import FILE_SOURCE_CONFIG
+
+
+class SourcePage:
+    __slots__ = ("file_path", "mtime_ns", "size", "content_hash", "text", "parsed")
+
+    def __init__(self, file_path, mtime_ns, size, content_hash, text):
+        self.file_path = file_path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.content_hash = content_hash
+        self.text = text
+        self.parsed = {}
+
+
+_pages = OrderedDict()
+_cached_bytes = 0
+_pages_lock = threading.Lock()
+
+
+def _read_page(file_path) -> SourcePage:
+    with open(file_path, "rb") as page_file:
+        file_stat = os.fstat(page_file.fileno())
+        if file_stat.st_size >= FILE_SOURCE_CONFIG["mmap_min_bytes"]:
+            with mmap.mmap(page_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                content_hash = hashlib.sha256(mapped).hexdigest()
+                text = str(mapped, "utf-8", "replace")
+        else:
+            raw_bytes = page_file.read()
+            content_hash = hashlib.sha256(raw_bytes).hexdigest()
+            text = raw_bytes.decode("utf-8", errors="replace")
+
+    return SourcePage(file_path, file_stat.st_mtime_ns, file_stat.st_size, content_hash, text)
+
+
+def load_page(file_path) -> SourcePage:
+    global _cached_bytes
+    file_stat = os.stat(file_path)
+
+    with _pages_lock:
+        page = _pages.get(file_path)
+        if page and page.mtime_ns == file_stat.st_mtime_ns and page.size == file_stat.st_size:
+            _pages.move_to_end(file_path)
+            return page
+
+    page = _read_page(file_path)
+    if page.size > FILE_SOURCE_CONFIG["max_cached_bytes"]:
+        return page
+
+    with _pages_lock:
+        previous = _pages.pop(file_path, None)
+        if previous:
+            _cached_bytes -= previous.size
+        _pages[file_path] = page
+        _cached_bytes += page.size
+        while _cached_bytes > FILE_SOURCE_CONFIG["max_cached_bytes"] and _pages:
+            _, evicted = _pages.popitem(last=False)
+            _cached_bytes -= evicted.size
+    return page
+
+
+def read_page_bytes(file_path) -> bytes:
+    with open(file_path, "rb") as page_file:
+        if os.fstat(page_file.fileno()).st_size < FILE_SOURCE_CONFIG["mmap_min_bytes"]:
+            return page_file.read()
+        with mmap.mmap(page_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return mapped[:]
+
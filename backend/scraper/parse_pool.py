@@ -0,0 +1,62 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from config import SCRAPER_CONFIG
+from pricing.records import PriceColumns
+
+WARMUP_HTML = '<div class="menu-item"><span class="dish-name">Warmup</span><span class="dish-price">1</span></div>'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _warm_worker():
+    from scraper.adapters import get_adapter
+
+    get_adapter("menu_dom").extract(WARMUP_HTML)
+
+
+def _worker_pid():
+    return os.getpid()
+
+
+def _parse_in_worker(raw_html: bytes, adapter_name: str, encoding: str):
+    from scraper.adapters import get_adapter
+
+    try:
+        html_content = raw_html.decode(encoding, errors="replace")
+    except LookupError:
+        html_content = raw_html.decode("utf-8", errors="replace")
+    title, dishes = get_adapter(adapter_name).extract(html_content)
+    return title, PriceColumns(dishes)
+
+
+def get_parse_pool():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            worker_count = SCRAPER_CONFIG["parse_workers"] or os.cpu_count() or 1
+            _executor = ProcessPoolExecutor(
+                max_workers=worker_count,
+                mp_context=multiprocessing.get_context(SCRAPER_CONFIG["parse_start_method"]),
+                initializer=_warm_worker,
+            )
+            warmup_futures = [_executor.submit(_worker_pid) for _ in range(worker_count)]
+            for future in warmup_futures:
+                future.result()
+        return _executor
+
+
+def parse_html_bytes(raw_html: bytes, adapter_name: str, encoding="utf-8"):
+    future = get_parse_pool().submit(_parse_in_worker, raw_html, adapter_name, encoding)
+    return future.result(timeout=SCRAPER_CONFIG["parse_timeout_seconds"])
+
+
+def shutdown_parse_pool() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
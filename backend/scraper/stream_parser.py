@@ -0,0 +1,139 @@
+from html.parser import HTMLParser
+
+from pricing.records import PriceObservation
+from scraper.embedded_data import PRICE_HINT_PATTERN, dish_from_object, iter_object_literals
+
+PRICE_CLASSES = {"dish-price", "price"}
+
+
+def _class_names(attrs):
+    for name, value in attrs:
+        if name == "class" and value:
+            return set(value.split())
+    return set()
+
+
+class MenuStreamParser(HTMLParser):
+    def __init__(self, collect_embedded=True):
+        super().__init__(convert_charrefs=True)
+        self.collect_embedded = collect_embedded
+        self._ready = []
+        self._menu_item_depth = None
+        self._div_depth = 0
+        self._field = None
+        self._field_parts = []
+        self._dish_name = None
+        self._dish_price = None
+        self._in_script = False
+        self._script_parts = []
+        self._embedded_dishes = []
+        self._embedded_names = set()
+        self.dom_dish_count = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "script":
+            self._in_script = True
+            self._script_parts = []
+            return
+
+        if tag == "div":
+            self._div_depth += 1
+            if self._menu_item_depth is None and "menu-item" in _class_names(attrs):
+                self._menu_item_depth = self._div_depth
+                self._dish_name = None
+                self._dish_price = None
+            return
+
+        if tag == "span" and self._menu_item_depth is not None and self._field is None:
+            class_names = _class_names(attrs)
+            if "dish-name" in class_names and self._dish_name is None:
+                self._field = "name"
+                self._field_parts = []
+            elif class_names & PRICE_CLASSES and self._dish_price is None:
+                self._field = "price"
+                self._field_parts = []
+
+    def handle_endtag(self, tag):
+        if tag == "script":
+            self._in_script = False
+            self._collect_embedded("".join(self._script_parts))
+            self._script_parts = []
+            return
+
+        if tag == "span" and self._field is not None:
+            text = "".join(self._field_parts).strip()
+            if self._field == "name":
+                self._dish_name = text
+            else:
+                self._dish_price = text
+            self._field = None
+            self._field_parts = []
+            return
+
+        if tag == "div":
+            if self._menu_item_depth == self._div_depth:
+                self._finish_menu_item()
+                self._menu_item_depth = None
+            self._div_depth = max(0, self._div_depth - 1)
+
+    def handle_data(self, data):
+        if self._in_script:
+            if self.collect_embedded and not self.dom_dish_count:
+                self._script_parts.append(data)
+        elif self._field is not None:
+            self._field_parts.append(data)
+
+    def _finish_menu_item(self):
+        if not self._dish_name or self._dish_price is None:
+            return
+
+        try:
+            dish_price = float(self._dish_price)
+        except (TypeError, ValueError):
+            return
+
+        self.dom_dish_count += 1
+        self._embedded_dishes = []
+        self._embedded_names = set()
+        self._ready.append(PriceObservation(self._dish_name, dish_price))
+
+    def _collect_embedded(self, script_text):
+        if not self.collect_embedded or self.dom_dish_count or not PRICE_HINT_PATTERN.search(script_text):
+            return
+
+        for pairs in iter_object_literals(script_text):
+            dish = dish_from_object(pairs)
+            if not dish:
+                continue
+
+            normalized = dish.dish_name.lower()
+            if normalized in self._embedded_names:
+                continue
+
+            self._embedded_names.add(normalized)
+            self._embedded_dishes.append(dish)
+
+    def pop_dishes(self):
+        ready = self._ready
+        self._ready = []
+        return ready
+
+    def finish(self):
+        self.close()
+        if self._in_script:
+            self._in_script = False
+            self._collect_embedded("".join(self._script_parts))
+
+        remaining = self.pop_dishes()
+        if not self.dom_dish_count:
+            remaining.extend(self._embedded_dishes)
+        self._embedded_dishes = []
+        return remaining
+
+
+def iter_html_dishes(chunks, collect_embedded=True):
+    parser = MenuStreamParser(collect_embedded=collect_embedded)
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from parser.pop_dishes()
+    yield from parser.finish()
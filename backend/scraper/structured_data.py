@@ -0,0 +1,214 @@
+import json
+import re
+
+from pricing.records import PriceObservation
+from scraper.stream_parser import MenuStreamParser
+
+JSON_LD_TYPE = "application/ld+json"
+MENU_ITEM_TYPES = {"menuitem", "product"}
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr",
+}
+HEURISTIC_PRICE_PATTERN = re.compile(r"^(?:₹|Rs\.?|INR)\s*(\d+(?:,\d{3})*(?:\.\d{1,2})?)(?:\s*/-)?$", re.IGNORECASE)
+PRICE_VALUE_PATTERN = re.compile(r"\d+(?:\.\d+)?")
+
+
+def _parse_price(raw_value):
+    if isinstance(raw_value, (int, float)) and not isinstance(raw_value, bool):
+        price = float(raw_value)
+    else:
+        price_match = PRICE_VALUE_PATTERN.search(str(raw_value or "").replace(",", ""))
+        if not price_match:
+            return None
+        price = float(price_match.group())
+    return price if price >= 0 else None
+
+
+def _node_types(node):
+    raw_types = node.get("@type")
+    if isinstance(raw_types, str):
+        raw_types = [raw_types]
+    if not isinstance(raw_types, list):
+        return set()
+    return {str(raw_type).rsplit("/", 1)[-1].lower() for raw_type in raw_types}
+
+
+def _offer_price(node):
+    offers = node.get("offers")
+    if isinstance(offers, list):
+        offers = offers[0] if offers else None
+    if isinstance(offers, dict):
+        for key in ("price", "lowPrice"):
+            if offers.get(key) is not None:
+                return _parse_price(offers[key])
+    if node.get("price") is not None:
+        return _parse_price(node["price"])
+    return None
+
+
+def iter_json_ld_dishes(document):
+    stack = [document]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+            continue
+        if not isinstance(node, dict):
+            continue
+
+        if _node_types(node) & MENU_ITEM_TYPES:
+            dish_name = str(node.get("name") or "").strip()
+            dish_price = _offer_price(node)
+            if dish_name and dish_price is not None:
+                yield PriceObservation(dish_name, dish_price)
+
+        stack.extend(reversed([value for value in node.values() if isinstance(value, (dict, list))]))
+
+
+class StructuredMenuParser(MenuStreamParser):
+    def __init__(self):
+        super().__init__()
+        self.title = None
+        self._title_parts = None
+        self._skip_text = False
+        self._json_ld_parts = None
+        self._json_ld_dishes = []
+        self._depth = 0
+        self._scopes = []
+        self._itemprop = None
+        self._microdata_dishes = []
+        self._last_text = None
+        self._heuristic_dishes = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "script" and (dict(attrs).get("type") or "").strip().lower() == JSON_LD_TYPE:
+            self._json_ld_parts = []
+            return
+        if tag == "title" and self.title is None:
+            self._title_parts = []
+        if tag in ("style", "noscript"):
+            self._skip_text = True
+
+        super().handle_starttag(tag, attrs)
+        if tag in VOID_ELEMENTS:
+            self._handle_microdata(attrs, void=True)
+            return
+
+        self._depth += 1
+        self._handle_microdata(attrs, void=False)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if self._json_ld_parts is not None and tag == "script":
+            self._collect_json_ld("".join(self._json_ld_parts))
+            self._json_ld_parts = None
+            return
+        if tag == "title" and self._title_parts is not None:
+            self.title = " ".join("".join(self._title_parts).split()) or None
+            self._title_parts = None
+        if tag in ("style", "noscript"):
+            self._skip_text = False
+
+        super().handle_endtag(tag)
+        if tag in VOID_ELEMENTS:
+            return
+
+        if self._itemprop and self._itemprop[1] == self._depth:
+            prop_name, _, parts = self._itemprop
+            self._itemprop = None
+            self._assign_itemprop(prop_name, "".join(parts).strip())
+        while self._scopes and self._scopes[-1]["depth"] >= self._depth:
+            self._close_scope(self._scopes.pop())
+        self._depth = max(0, self._depth - 1)
+
+    def handle_data(self, data):
+        if self._json_ld_parts is not None:
+            self._json_ld_parts.append(data)
+            return
+        if self._title_parts is not None:
+            self._title_parts.append(data)
+            return
+
+        super().handle_data(data)
+        if self._in_script or self._skip_text:
+            return
+
+        if self._itemprop:
+            self._itemprop[2].append(data)
+
+        text = data.strip()
+        if not text:
+            return
+        price_match = HEURISTIC_PRICE_PATTERN.match(text)
+        if price_match:
+            if self._last_text:
+                self._heuristic_dishes.append(
+                    PriceObservation(self._last_text, float(price_match.group(1).replace(",", "")))
+                )
+            self._last_text = None
+        elif 2 <= len(text) <= 80:
+            self._last_text = text
+
+    def _handle_microdata(self, attrs, void):
+        attributes = dict(attrs)
+        prop_name = (attributes.get("itemprop") or "").strip().lower()
+
+        if "itemscope" in attributes:
+            item_type = (attributes.get("itemtype") or "").rsplit("/", 1)[-1].lower()
+            if void:
+                return
+            self._scopes.append(
+                {"depth": self._depth, "type": item_type, "prop": prop_name, "name": None, "price": None}
+            )
+            return
+
+        if not prop_name or not self._scopes:
+            return
+        if "content" in attributes or void:
+            self._assign_itemprop(prop_name, (attributes.get("content") or "").strip())
+        elif self._itemprop is None:
+            self._itemprop = (prop_name, self._depth, [])
+
+    def _assign_itemprop(self, prop_name, value):
+        if not self._scopes or not value:
+            return
+        scope = self._scopes[-1]
+        if prop_name == "name" and scope["name"] is None:
+            scope["name"] = value
+        elif prop_name in ("price", "lowprice") and scope["price"] is None:
+            scope["price"] = _parse_price(value)
+
+    def _close_scope(self, scope):
+        if scope["type"] in MENU_ITEM_TYPES:
+            if scope["name"] and scope["price"] is not None:
+                self._microdata_dishes.append(PriceObservation(scope["name"], scope["price"]))
+            return
+        if scope["prop"] == "offers" and scope["price"] is not None and self._scopes:
+            parent = self._scopes[-1]
+            if parent["price"] is None:
+                parent["price"] = scope["price"]
+
+    def _collect_json_ld(self, script_text):
+        try:
+            document = json.loads(script_text)
+        except ValueError:
+            return
+        self._json_ld_dishes.extend(iter_json_ld_dishes(document))
+
+    def finish(self):
+        dom_dishes = super().finish()
+        for dishes in (self._json_ld_dishes, self._microdata_dishes, dom_dishes, self._heuristic_dishes):
+            if dishes:
+                return dishes
+        return []
+
+
+def extract_structured_dishes(html_content: str):
+    parser = StructuredMenuParser()
+    parser.feed(html_content)
+    dishes = parser.finish()
+    return parser.title, dishes
@@ -0,0 +1,168 @@
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+from functools import lru_cache
+
+from config import DB_CONFIG, STORAGE_CONFIG
+
+try:
+    import mysql.connector
+    from mysql.connector import Error as MySQLError
+except ImportError:
+    mysql = None
+    MySQLError = None
+
+DatabaseError = (MySQLError, sqlite3.Error) if MySQLError else (sqlite3.Error,)
+
+INTERVAL_PATTERN = re.compile(r"UTC_TIMESTAMP\(6?\)\s*([+-])\s*INTERVAL\s+%s\s+SECOND", re.IGNORECASE)
+UTC_TIMESTAMP_PATTERN = re.compile(r"UTC_TIMESTAMP\(6?\)", re.IGNORECASE)
+IF_PATTERN = re.compile(r"\bIF\(", re.IGNORECASE)
+FOR_UPDATE_PATTERN = re.compile(r"\s+FOR\s+UPDATE\b", re.IGNORECASE)
+UPSERT_PATTERN = re.compile(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b", re.IGNORECASE)
+VALUES_REFERENCE_PATTERN = re.compile(r"\bVALUES\((\w+)\)", re.IGNORECASE)
+INSERT_PATTERN = re.compile(r"^\s*INSERT\b", re.IGNORECASE)
+
+SQLITE_NOW = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+_sqlite_setup_lock = threading.Lock()
+_sqlite_ready = False
+
+
+def is_embedded_storage() -> bool:
+    return STORAGE_CONFIG["backend"] == "sqlite"
+
+
+@lru_cache(maxsize=512)
+def translate_query(query: str) -> str:
+    translated = INTERVAL_PATTERN.sub(
+        lambda match: f"strftime('%Y-%m-%d %H:%M:%f', 'now', '{match.group(1)}' || %s || ' seconds')",
+        query,
+    )
+    translated = UTC_TIMESTAMP_PATTERN.sub(SQLITE_NOW, translated)
+    translated = IF_PATTERN.sub("IIF(", translated)
+    translated = FOR_UPDATE_PATTERN.sub("", translated)
+
+    upsert_match = UPSERT_PATTERN.search(translated)
+    if upsert_match:
+        update_clause = VALUES_REFERENCE_PATTERN.sub(r"excluded.\1", translated[upsert_match.end():])
+        translated = translated[:upsert_match.start()] + "ON CONFLICT DO UPDATE SET" + update_clause
+
+    return translated.replace("%s", "?")
+
+
+def _convert_datetime(raw_value: bytes):
+    text = raw_value.decode()
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return text
+
+
+def _setup_sqlite() -> None:
+    global _sqlite_ready
+    with _sqlite_setup_lock:
+        if _sqlite_ready:
+            return
+        sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+        sqlite3.register_adapter(date, lambda value: value.isoformat())
+        sqlite3.register_converter("DATETIME", _convert_datetime)
+        sqlite3.register_converter("TIMESTAMP", _convert_datetime)
+        _sqlite_ready = True
+
+
+class SQLiteCursor:
+    def __init__(self, connection, dictionary=False):
+        self._cursor = connection.cursor()
+        self._dictionary = dictionary
+        self.lastrowid = None
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def column_names(self):
+        return tuple(column[0] for column in self._cursor.description or ())
+
+    def _shape(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return dict(zip(self.column_names, row))
+
+    def execute(self, query, params=()):
+        translated = translate_query(query)
+        self._cursor.execute(translated, tuple(params or ()))
+        self.lastrowid = self._cursor.lastrowid
+        if INSERT_PATTERN.match(translated) and self._cursor.rowcount > 1:
+            self.lastrowid = self._cursor.lastrowid - self._cursor.rowcount + 1
+
+    def executemany(self, query, seq_params):
+        self._cursor.executemany(translate_query(query), [tuple(params) for params in seq_params])
+        self.lastrowid = self._cursor.lastrowid
+
+    def fetchone(self):
+        return self._shape(self._cursor.fetchone())
+
+    def fetchmany(self, size=1):
+        return [self._shape(row) for row in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._shape(row) for row in self._cursor.fetchall()]
+
+    def __iter__(self):
+        for row in self._cursor:
+            yield self._shape(row)
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    def __init__(self, path):
+        _setup_sqlite()
+        self._connection = sqlite3.connect(
+            path,
+            timeout=STORAGE_CONFIG["sqlite_busy_timeout_seconds"],
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,
+        )
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._closed = False
+
+    def cursor(self, dictionary=False, buffered=None):
+        return SQLiteCursor(self._connection, dictionary=dictionary)
+
+    def start_transaction(self):
+        if not self._connection.in_transaction:
+            self._connection.execute("BEGIN IMMEDIATE")
+
+    def commit(self):
+        self._connection.commit()
+
+    def rollback(self):
+        self._connection.rollback()
+
+    def is_connected(self):
+        return not self._closed
+
+    def close(self):
+        if not self._closed:
+            self._connection.close()
+            self._closed = True
+
+
+def get_connection(include_database=True):
+    if is_embedded_storage():
+        return SQLiteConnection(STORAGE_CONFIG["sqlite_path"])
+
+    connection_options = {
+        "host": DB_CONFIG["host"],
+        "user": DB_CONFIG["user"],
+        "password": DB_CONFIG["password"],
+    }
+    if include_database:
+        connection_options["database"] = DB_CONFIG["database"]
+    return mysql.connector.connect(**connection_options)
@@ -0,0 +1,212 @@
+import os
+import re
+from array import array
+from datetime import timedelta
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from config import ARCHIVE_CONFIG
+
+ARCHIVE_SCHEMA = pa.schema(
+    [
+        ("id", pa.int64()),
+        ("dish_id", pa.int64()),
+        ("dish_name", pa.string()),
+        ("metric", pa.string()),
+        ("price_value", pa.float64()),
+        ("recorded_at", pa.timestamp("us")),
+    ]
+)
+MONTH_PARTITIONING = ds.partitioning(pa.schema([("month", pa.string())]), flavor="hive")
+PART_FILE_PATTERN = re.compile(r"^part-(\d+)-(\d+)(?:-\d+)?\.parquet$")
+
+
+def hot_window_start(now):
+    return now - timedelta(days=ARCHIVE_CONFIG["hot_days"])
+
+
+def _restaurant_dir(restaurant_id) -> str:
+    return os.path.join(ARCHIVE_CONFIG["root_dir"], f"restaurant_id={int(restaurant_id)}")
+
+
+def _superseded_parts(partition_dir, min_id, max_id, new_ids):
+    # A part is superseded only when every one of its ids was selected again, i.e. it was
+    # written by a run whose DELETE never committed. Overlapping id ranges alone prove nothing.
+    superseded = set()
+    for file_name in os.listdir(partition_dir):
+        part_match = PART_FILE_PATTERN.match(file_name)
+        if not part_match or int(part_match.group(1)) > max_id or int(part_match.group(2)) < min_id:
+            continue
+        part_ids = pq.read_table(os.path.join(partition_dir, file_name), columns=["id"])["id"]
+        if pc.all(pc.is_in(part_ids, value_set=new_ids)).as_py():
+            superseded.add(file_name)
+    return superseded
+
+
+class _PartitionWriter:
+    def __init__(self, restaurant_id, month):
+        self.partition_dir = os.path.join(_restaurant_dir(restaurant_id), f"month={month}")
+        os.makedirs(self.partition_dir, exist_ok=True)
+        self.temp_path = os.path.join(self.partition_dir, f".part-{os.getpid()}.tmp")
+        self.min_id = None
+        self.max_id = None
+        self._ids = array("q")
+        self._writer = pq.ParquetWriter(
+            self.temp_path,
+            ARCHIVE_SCHEMA,
+            compression=ARCHIVE_CONFIG["compression"],
+            use_dictionary=["dish_name", "metric"],
+        )
+        self._columns = {field.name: [] for field in ARCHIVE_SCHEMA}
+        self.row_count = 0
+
+    def append(self, row):
+        row_id = row[0]
+        if self.min_id is None or row_id < self.min_id:
+            self.min_id = row_id
+        if self.max_id is None or row_id > self.max_id:
+            self.max_id = row_id
+        self._ids.append(row_id)
+        for name, value in zip(self._columns, row):
+            self._columns[name].append(value)
+        self.row_count += 1
+        if len(self._columns["id"]) >= ARCHIVE_CONFIG["row_group_rows"]:
+            self.flush()
+
+    def flush(self):
+        if not self._columns["id"]:
+            return
+        self._writer.write_batch(pa.RecordBatch.from_pydict(self._columns, schema=ARCHIVE_SCHEMA))
+        for values in self._columns.values():
+            values.clear()
+
+    def close(self):
+        self.flush()
+        self._writer.close()
+        superseded = _superseded_parts(
+            self.partition_dir, self.min_id, self.max_id, pa.array(self._ids, type=pa.int64())
+        )
+        file_name = f"part-{self.min_id}-{self.max_id}.parquet"
+        suffix = 0
+        while os.path.exists(os.path.join(self.partition_dir, file_name)) and file_name not in superseded:
+            suffix += 1
+            file_name = f"part-{self.min_id}-{self.max_id}-{suffix}.parquet"
+        os.replace(self.temp_path, os.path.join(self.partition_dir, file_name))
+        for superseded_name in superseded - {file_name}:
+            os.remove(os.path.join(self.partition_dir, superseded_name))
+
+    def abort(self):
+        self._writer.close()
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+
+def archive_price_history(read_connection, write_connection, cutoff, delete_rows=True) -> int:
+    cursor = write_connection.cursor()
+    try:
+        cursor.execute("SELECT MAX(id) FROM dish_price_history WHERE recorded_at < %s", (cutoff,))
+        max_id = cursor.fetchone()[0]
+    finally:
+        cursor.close()
+
+    if max_id is None:
+        return 0
+
+    read_cursor = read_connection.cursor(buffered=False)
+    writer = None
+    archived_rows = 0
+    try:
+        read_cursor.execute(
+            """
+            SELECT restaurant_id, id, dish_id, dish_name, metric, price_value, recorded_at
+            FROM dish_price_history
+            WHERE recorded_at < %s AND id <= %s
+            ORDER BY restaurant_id ASC, recorded_at ASC, id ASC
+            """,
+            (cutoff, max_id),
+        )
+        partition_key = None
+        for restaurant_id, *row in read_cursor:
+            row_key = (restaurant_id, row[-1].strftime("%Y-%m"))
+            if row_key != partition_key:
+                if writer:
+                    writer.close()
+                writer = _PartitionWriter(*row_key)
+                partition_key = row_key
+            writer.append(row)
+            archived_rows += 1
+
+        if writer:
+            writer.close()
+            writer = None
+    except BaseException:
+        if writer:
+            writer.abort()
+        raise
+    finally:
+        read_cursor.close()
+
+    if not delete_rows:
+        return archived_rows
+
+    cursor = write_connection.cursor()
+    try:
+        cursor.execute(
+            "DELETE FROM dish_price_history WHERE recorded_at < %s AND id <= %s",
+            (cutoff, max_id),
+        )
+    finally:
+        cursor.close()
+    return archived_rows
+
+
+def read_archived_daily_totals(restaurant_id, metric, start_at, end_at, dish_id=None):
+    restaurant_dir = _restaurant_dir(restaurant_id)
+    if not os.path.isdir(restaurant_dir):
+        return {}
+
+    dataset = ds.dataset(
+        restaurant_dir,
+        format="parquet",
+        partitioning=MONTH_PARTITIONING,
+        ignore_prefixes=[".", "_"],
+    )
+    predicate = (
+        (ds.field("month") >= start_at.strftime("%Y-%m"))
+        & (ds.field("month") <= end_at.strftime("%Y-%m"))
+        & (ds.field("metric") == metric)
+        & (ds.field("recorded_at") >= pa.scalar(start_at, type=pa.timestamp("us")))
+        & (ds.field("recorded_at") < pa.scalar(end_at, type=pa.timestamp("us")))
+        & ds.field("price_value").is_valid()
+    )
+    if dish_id is not None:
+        predicate = predicate & (ds.field("dish_id") == dish_id)
+
+    table = dataset.to_table(columns=["id", "recorded_at", "price_value"], filter=predicate)
+    if not table.num_rows:
+        return {}
+    if len(dataset.files) > 1:
+        # Parts that partially overlap (a re-archive of some but not all of an older part's
+        # rows) are both kept, so count each history row id once.
+        unique_rows = table.group_by("id").aggregate([("recorded_at", "min"), ("price_value", "min")])
+        table = pa.table(
+            {"recorded_at": unique_rows["recorded_at_min"], "price_value": unique_rows["price_value_min"]}
+        )
+
+    days = pc.strftime(table["recorded_at"], format="%Y-%m-%d")
+    totals = (
+        pa.table({"day": days, "price_value": table["price_value"]})
+        .group_by("day")
+        .aggregate([("price_value", "sum"), ("price_value", "count")])
+    )
+    return {
+        day: (price_sum, price_count)
+        for day, price_sum, price_count in zip(
+            totals["day"].to_pylist(),
+            totals["price_value_sum"].to_pylist(),
+            totals["price_value_count"].to_pylist(),
+        )
+    }
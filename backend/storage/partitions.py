@@ -0,0 +1,110 @@
+import calendar
+from datetime import datetime
+
+from config import PARTITION_CONFIG, STORAGE_CONFIG
+
+PARTITIONED_TABLES = {
+    "dish_price_history": "recorded_at",
+    "alerts": "created_at",
+}
+CATCH_ALL_PARTITION = "pmax"
+
+
+def is_partitioning_enabled() -> bool:
+    return PARTITION_CONFIG["enabled"] and STORAGE_CONFIG["backend"] == "mysql"
+
+
+def use_utc_session(connection) -> None:
+    # Partition bounds are UTC epochs (UNIX_TIMESTAMP), so every date compared against them
+    # must be read in UTC too, or rows near a bound can be dropped without being archived.
+    if STORAGE_CONFIG["backend"] != "mysql":
+        return
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SET time_zone = '+00:00'")
+    finally:
+        cursor.close()
+
+
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(month: datetime, count: int) -> datetime:
+    month_index = month.year * 12 + month.month - 1 + count
+    return datetime(month_index // 12, month_index % 12 + 1, 1)
+
+
+def _partition_bound(month: datetime) -> int:
+    return calendar.timegm(month.timetuple())
+
+
+def _partition_definition(month: datetime) -> str:
+    upper_bound = add_months(month, 1)
+    return f"PARTITION p{month:%Y%m} VALUES LESS THAN ({_partition_bound(upper_bound)})"
+
+
+def _month_range(first_month: datetime, last_month: datetime):
+    month = first_month
+    while month <= last_month:
+        yield month
+        month = add_months(month, 1)
+
+
+def list_partitions(cursor, database, table_name):
+    cursor.execute(
+        """
+        SELECT PARTITION_NAME, PARTITION_DESCRIPTION
+        FROM INFORMATION_SCHEMA.PARTITIONS
+        WHERE TABLE_SCHEMA = %s
+          AND TABLE_NAME = %s
+          AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION ASC
+        """,
+        (database, table_name),
+    )
+    return cursor.fetchall()
+
+
+def ensure_monthly_partitions(cursor, database, table_name, now, months_ahead) -> None:
+    column_name = PARTITIONED_TABLES[table_name]
+    last_month = add_months(month_start(now), months_ahead)
+    partitions = list_partitions(cursor, database, table_name)
+
+    if not partitions:
+        cursor.execute(f"SELECT MIN({column_name}) FROM {table_name}")
+        oldest_value = cursor.fetchone()[0]
+        first_month = month_start(min(oldest_value, now) if oldest_value else now)
+
+        cursor.execute(f"UPDATE {table_name} SET {column_name} = CURRENT_TIMESTAMP WHERE {column_name} IS NULL")
+        cursor.execute(f"ALTER TABLE {table_name} DROP PRIMARY KEY, ADD PRIMARY KEY (id, {column_name})")
+        definitions = [_partition_definition(month) for month in _month_range(first_month, last_month)]
+        definitions.append(f"PARTITION {CATCH_ALL_PARTITION} VALUES LESS THAN MAXVALUE")
+        cursor.execute(
+            f"ALTER TABLE {table_name} PARTITION BY RANGE (UNIX_TIMESTAMP({column_name})) ({', '.join(definitions)})"
+        )
+        return
+
+    bounded = [description for name, description in partitions if name != CATCH_ALL_PARTITION]
+    next_month = datetime.utcfromtimestamp(int(bounded[-1])) if bounded else month_start(now)
+    if next_month > last_month:
+        return
+
+    definitions = [_partition_definition(month) for month in _month_range(next_month, last_month)]
+    definitions.append(f"PARTITION {CATCH_ALL_PARTITION} VALUES LESS THAN MAXVALUE")
+    cursor.execute(
+        f"ALTER TABLE {table_name} REORGANIZE PARTITION {CATCH_ALL_PARTITION} INTO ({', '.join(definitions)})"
+    )
+
+
+def drop_partitions_before(cursor, database, table_name, cutoff_month) -> list:
+    cutoff_bound = _partition_bound(month_start(cutoff_month))
+    partitions = list_partitions(cursor, database, table_name)
+    expired = [
+        name
+        for name, description in partitions
+        if name != CATCH_ALL_PARTITION and int(description) <= cutoff_bound
+    ]
+    if expired:
+        cursor.execute(f"ALTER TABLE {table_name} DROP PARTITION {', '.join(expired)}")
+    return expired
@@ -0,0 +1,153 @@
+import gzip
+import hashlib
+import os
+import shutil
+import tempfile
+
+from config import SNAPSHOT_CONFIG
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+BLOB_EXTENSIONS = (".zst", ".gz")
+
+
+def _objects_dir() -> str:
+    return os.path.join(SNAPSHOT_CONFIG["root_dir"], "objects")
+
+
+def _blob_path(content_hash, extension) -> str:
+    return os.path.join(_objects_dir(), content_hash[:2], f"{content_hash}{extension}")
+
+
+def find_blob(content_hash):
+    for extension in BLOB_EXTENSIONS:
+        blob_path = _blob_path(content_hash, extension)
+        if os.path.isfile(blob_path):
+            return blob_path
+    return None
+
+
+def read_snapshot(content_hash) -> bytes:
+    blob_path = find_blob(content_hash)
+    if not blob_path:
+        raise FileNotFoundError(f"Snapshot blob {content_hash} not found")
+
+    with open(blob_path, "rb") as blob_file:
+        if blob_path.endswith(".zst"):
+            if zstandard is None:
+                raise RuntimeError("zstandard is required to read .zst snapshots")
+            return zstandard.ZstdDecompressor().stream_reader(blob_file).read()
+        return gzip.GzipFile(fileobj=blob_file, mode="rb").read()
+
+
+class SnapshotWriter:
+    def __init__(self):
+        self._hasher = hashlib.sha256()
+        self._spool = tempfile.SpooledTemporaryFile(max_size=SNAPSHOT_CONFIG["spool_bytes"])
+        self.byte_size = 0
+        self._known_hash = None
+
+    def adopt(self, content_hash, byte_size, read_bytes) -> None:
+        if find_blob(content_hash):
+            self._known_hash = content_hash
+            self.byte_size = byte_size
+        else:
+            self.write(read_bytes())
+
+    def write(self, chunk: bytes) -> None:
+        self._hasher.update(chunk)
+        self._spool.write(chunk)
+        self.byte_size += len(chunk)
+
+    def _compress_to(self, target_file) -> None:
+        level = SNAPSHOT_CONFIG["compression_level"]
+        if zstandard is not None:
+            with zstandard.ZstdCompressor(level=level).stream_writer(target_file, closefd=False) as writer:
+                shutil.copyfileobj(self._spool, writer)
+        else:
+            with gzip.GzipFile(fileobj=target_file, mode="wb", compresslevel=level, mtime=0) as writer:
+                shutil.copyfileobj(self._spool, writer)
+
+    def save(self):
+        try:
+            if self._known_hash:
+                return self._known_hash
+            if not self.byte_size:
+                return None
+
+            content_hash = self._hasher.hexdigest()
+            if find_blob(content_hash):
+                return content_hash
+
+            extension = ".zst" if zstandard is not None else ".gz"
+            blob_path = _blob_path(content_hash, extension)
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            self._spool.seek(0)
+            descriptor, temp_path = tempfile.mkstemp(prefix=".snapshot-", dir=os.path.dirname(blob_path))
+            try:
+                with os.fdopen(descriptor, "wb") as temp_file:
+                    self._compress_to(temp_file)
+                os.replace(temp_path, blob_path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+            return content_hash
+        finally:
+            self._spool.close()
+
+    def discard(self) -> None:
+        self._spool.close()
+
+
+def record_snapshot(connection, competitor, source, writer, captured_at):
+    content_hash = writer.save()
+    if not content_hash:
+        return None
+
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            """
+            INSERT INTO competitor_snapshots (competitor_id, restaurant_id, source, content_hash, byte_size, captured_at)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            """,
+            (competitor["id"], competitor.get("restaurant_id"), source, content_hash, writer.byte_size, captured_at),
+        )
+    finally:
+        cursor.close()
+    return content_hash
+
+
+def fetch_snapshot_index(connection, competitor_id=None, restaurant_id=None, since=None, until=None):
+    query = """
+        SELECT s.competitor_id, s.restaurant_id, s.content_hash, s.captured_at,
+               s.source, c.platform, c.website_url
+        FROM competitor_snapshots s
+        LEFT JOIN competitors c ON c.id = s.competitor_id
+        WHERE 1 = 1
+    """
+    params = []
+    if competitor_id is not None:
+        query += " AND s.competitor_id = %s"
+        params.append(competitor_id)
+    if restaurant_id is not None:
+        query += " AND s.restaurant_id = %s"
+        params.append(restaurant_id)
+    if since is not None:
+        query += " AND s.captured_at >= %s"
+        params.append(since)
+    if until is not None:
+        query += " AND s.captured_at < %s"
+        params.append(until)
+    query += " ORDER BY s.captured_at ASC, s.id ASC"
+
+    cursor = connection.cursor()
+    try:
+        cursor.execute(query, tuple(params))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
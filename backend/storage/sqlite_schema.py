@@ -0,0 +1,308 @@
+EMBEDDED_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        restaurant_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+        restaurant_name VARCHAR(255),
+        owner_name VARCHAR(255),
+        email VARCHAR(255) UNIQUE,
+        password VARCHAR(255),
+        category_level VARCHAR(20) DEFAULT 'medium',
+        role VARCHAR(20) DEFAULT 'staff',
+        market_area VARCHAR(100) NOT NULL DEFAULT '',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        email_normalized VARCHAR(255) GENERATED ALWAYS AS (LOWER(TRIM(email))) STORED
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_users_email_normalized ON users (email_normalized)",
+    """
+    CREATE TABLE IF NOT EXISTS dishes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        restaurant_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+        dish_name VARCHAR(255),
+        category VARCHAR(255),
+        our_price FLOAT,
+        competitor_avg FLOAT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS competitors (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        restaurant_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+        name VARCHAR(255),
+        mock_file VARCHAR(255),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        restaurant_name VARCHAR(255),
+        platform VARCHAR(100),
+        website_url VARCHAR(500),
+        dishes_tracked INTEGER DEFAULT 0,
+        status VARCHAR(20) DEFAULT 'Active',
+        scraped_title VARCHAR(500),
+        last_updated DATETIME,
+        scrape_interval_seconds INTEGER,
+        next_scrape_at DATETIME,
+        menu_fingerprint CHAR(40),
+        last_changed_at DATETIME,
+        last_scraped_at DATETIME
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_competitors_next_scrape ON competitors (next_scrape_at, id)",
+    """
+    CREATE TABLE IF NOT EXISTS alerts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        restaurant_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+        dish_name VARCHAR(255),
+        old_price FLOAT,
+        new_price FLOAT,
+        message VARCHAR(255),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        is_read BOOLEAN DEFAULT FALSE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS dish_price_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        restaurant_id INTEGER NOT NULL,
+        dish_id INTEGER,
+        dish_name VARCHAR(255),
+        metric VARCHAR(32) NOT NULL,
+        price_value FLOAT,
+        competitor_id INTEGER,
+        recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_price_history_restaurant_metric_time
+    ON dish_price_history (restaurant_id, metric, recorded_at)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_price_history_dish_metric_time
+    ON dish_price_history (dish_id, metric, recorded_at)
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS restaurant_summaries (
+        restaurant_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+        total_competitors INTEGER NOT NULL DEFAULT 0,
+        dishes_tracked_total INTEGER NOT NULL DEFAULT 0,
+        low_count INTEGER NOT NULL DEFAULT 0,
+        low_dishes_tracked INTEGER NOT NULL DEFAULT 0,
+        medium_count INTEGER NOT NULL DEFAULT 0,
+        medium_dishes_tracked INTEGER NOT NULL DEFAULT 0,
+        premium_count INTEGER NOT NULL DEFAULT 0,
+        premium_dishes_tracked INTEGER NOT NULL DEFAULT 0,
+        last_scraped_at DATETIME,
+        last_updated DATETIME,
+        refreshed_at DATETIME
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS restaurant_pricing_versions (
+        restaurant_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+        version BIGINT NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS scheduler_nodes (
+        node_id VARCHAR(191) PRIMARY KEY,
+        heartbeat_at DATETIME NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_scheduler_nodes_heartbeat ON scheduler_nodes (heartbeat_at)",
+    """
+    CREATE TABLE IF NOT EXISTS competitor_menu_items (
+        competitor_id INTEGER NOT NULL REFERENCES competitors(id) ON DELETE CASCADE,
+        dish_key VARCHAR(255) NOT NULL,
+        dish_name VARCHAR(255) NOT NULL,
+        price DECIMAL(10, 2) NOT NULL,
+        ewma_mean REAL,
+        ewma_var REAL,
+        sample_count INTEGER,
+        pending_price DECIMAL(10, 2),
+        pending_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (competitor_id, dish_key)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS price_anomalies (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        competitor_id INTEGER NOT NULL,
+        restaurant_id INTEGER,
+        dish_name VARCHAR(255) NOT NULL,
+        observed_price DECIMAL(10, 2) NOT NULL,
+        expected_price DECIMAL(10, 2),
+        score DECIMAL(10, 2),
+        status VARCHAR(16) NOT NULL,
+        detected_at DATETIME NOT NULL
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_price_anomalies_restaurant_time
+    ON price_anomalies (restaurant_id, detected_at)
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS competitor_menu_changes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        competitor_id INTEGER NOT NULL,
+        restaurant_id INTEGER,
+        dish_name VARCHAR(255) NOT NULL,
+        change_type VARCHAR(16) NOT NULL,
+        old_price DECIMAL(10, 2),
+        new_price DECIMAL(10, 2),
+        change_percent DECIMAL(10, 2),
+        detected_at DATETIME NOT NULL
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_menu_changes_restaurant_time
+    ON competitor_menu_changes (restaurant_id, detected_at)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_menu_changes_competitor_time
+    ON competitor_menu_changes (competitor_id, detected_at)
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS competitor_snapshots (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        competitor_id INTEGER NOT NULL,
+        restaurant_id INTEGER,
+        source VARCHAR(16) NOT NULL,
+        content_hash CHAR(64) NOT NULL,
+        byte_size INTEGER NOT NULL,
+        captured_at DATETIME NOT NULL
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_competitor_snapshots_competitor_time
+    ON competitor_snapshots (competitor_id, captured_at)
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_competitor_snapshots_time ON competitor_snapshots (captured_at)",
+    """
+    CREATE TABLE IF NOT EXISTS scrape_pass_metrics (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        node_id VARCHAR(191) NOT NULL,
+        started_at DATETIME NOT NULL,
+        duration_seconds DECIMAL(10, 3) NOT NULL,
+        budget_seconds INTEGER NOT NULL,
+        due_count INTEGER NOT NULL,
+        scraped_count INTEGER NOT NULL,
+        failed_count INTEGER NOT NULL,
+        deferred_count INTEGER NOT NULL,
+        max_lag_seconds DECIMAL(12, 3) NOT NULL,
+        avg_lag_seconds DECIMAL(12, 3) NOT NULL,
+        max_write_wait_seconds DECIMAL(10, 3) NOT NULL,
+        budget_exhausted INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_scrape_pass_metrics_started ON scrape_pass_metrics (started_at)",
+    """
+    CREATE TABLE IF NOT EXISTS market_price_index (
+        area VARCHAR(100) NOT NULL,
+        dish_key VARCHAR(255) NOT NULL,
+        dish_name VARCHAR(255) NOT NULL,
+        observation_count INTEGER NOT NULL,
+        price_sum REAL NOT NULL,
+        mean_price REAL NOT NULL,
+        min_price REAL NOT NULL,
+        max_price REAL NOT NULL,
+        p25_price REAL NOT NULL,
+        median_price REAL NOT NULL,
+        p75_price REAL NOT NULL,
+        updated_at DATETIME NOT NULL,
+        PRIMARY KEY (area, dish_key)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS market_index_sources (
+        area VARCHAR(100) NOT NULL DEFAULT '',
+        source_key CHAR(40) NOT NULL,
+        dish_key VARCHAR(255) NOT NULL,
+        price DECIMAL(10, 2) NOT NULL,
+        observed_at DATETIME NOT NULL,
+        PRIMARY KEY (area, dish_key, source_key)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS price_forecasts (
+        restaurant_id INTEGER NOT NULL,
+        dish_id INTEGER NOT NULL,
+        forecast_date DATE NOT NULL,
+        predicted_price DECIMAL(10, 2) NOT NULL,
+        lower_price DECIMAL(10, 2) NOT NULL,
+        upper_price DECIMAL(10, 2) NOT NULL,
+        generated_at DATETIME NOT NULL,
+        PRIMARY KEY (restaurant_id, dish_id, forecast_date)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_price_forecasts_generated ON price_forecasts (generated_at)",
+    """
+    CREATE TABLE IF NOT EXISTS competitor_health (
+        competitor_id INTEGER PRIMARY KEY REFERENCES competitors(id) ON DELETE CASCADE,
+        state VARCHAR(16) NOT NULL DEFAULT 'closed',
+        consecutive_failures INTEGER NOT NULL DEFAULT 0,
+        opened_at DATETIME,
+        probe_started_at DATETIME,
+        last_failure_kind VARCHAR(32),
+        last_failure_reason VARCHAR(1000),
+        last_failure_at DATETIME
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS competitor_dead_letters (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        competitor_id INTEGER NOT NULL REFERENCES competitors(id) ON DELETE CASCADE,
+        restaurant_id INTEGER,
+        failure_kind VARCHAR(32) NOT NULL,
+        failure_reason VARCHAR(1000),
+        failure_count INTEGER NOT NULL,
+        retry_at DATETIME,
+        created_at DATETIME NOT NULL,
+        resolved_at DATETIME
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_dead_letters_restaurant
+    ON competitor_dead_letters (restaurant_id, resolved_at, created_at)
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_dead_letters_competitor ON competitor_dead_letters (competitor_id, resolved_at)",
+    """
+    CREATE TABLE IF NOT EXISTS competitor_leases (
+        competitor_id INTEGER PRIMARY KEY REFERENCES competitors(id) ON DELETE CASCADE,
+        node_id VARCHAR(191) NOT NULL,
+        lease_token CHAR(32) NOT NULL,
+        lease_until DATETIME NOT NULL
+    )
+    """,
+)
+
+
+EMBEDDED_ADDED_COLUMNS = (
+    ("dish_price_history", "competitor_id", "INTEGER"),
+    ("users", "market_area", "VARCHAR(100) NOT NULL DEFAULT ''"),
+    ("competitor_menu_items", "ewma_mean", "REAL"),
+    ("competitor_menu_items", "ewma_var", "REAL"),
+    ("competitor_menu_items", "sample_count", "INTEGER"),
+    ("competitor_menu_items", "pending_price", "DECIMAL(10, 2)"),
+    ("competitor_menu_items", "pending_count", "INTEGER NOT NULL DEFAULT 0"),
+    ("market_index_sources", "area", "VARCHAR(100) NOT NULL DEFAULT ''"),
+)
+
+EMBEDDED_DROPPED_COLUMNS = (("market_price_index", "sketch"),)
+
+
+def ensure_embedded_schema(connection) -> None:
+    cursor = connection.cursor()
+    try:
+        for statement in EMBEDDED_SCHEMA:
+            cursor.execute(statement)
+        for table_name, column_name, column_definition in EMBEDDED_ADDED_COLUMNS:
+            cursor.execute(f"PRAGMA table_info({table_name})")
+            if column_name not in {row[1] for row in cursor.fetchall()}:
+                cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_definition}")
+        for table_name, column_name in EMBEDDED_DROPPED_COLUMNS:
+            cursor.execute(f"PRAGMA table_info({table_name})")
+            if column_name in {row[1] for row in cursor.fetchall()}:
+                cursor.execute(f"ALTER TABLE {table_name} DROP COLUMN {column_name}")
+        connection.commit()
+    finally:
+        cursor.close()
@@ -1,4 +1,6 @@
-import { useMemo } from 'react'
+import { useEffect, useState } from 'react'
+import axios from 'axios'
+import { useAuth } from '../context/AuthContext'
 import { useData } from '../context/DataContext'
 
 function getSuggestionColor(suggestion) {
@@ -15,49 +17,40 @@ function getSuggestionBorder(suggestion) {
 
 function RecommendationCard() {
   const { dishes } = useData()
+  const { accessToken } = useAuth()
+  const [recommendations, setRecommendations] = useState([])
+  const effectiveAccessToken = accessToken || localStorage.getItem('access_token') || ''
 
-  const recommendations = useMemo(() => {
-    return dishes
-      .map((dish) => {
-        const ourPrice = Number(dish.ourPrice)
-        const competitorAvg = Number(dish.competitorAvg)
+  useEffect(() => {
+    const fetchRecommendations = async () => {
+      if (!effectiveAccessToken) {
+        setRecommendations([])
+        return
+      }
 
-        if (!Number.isFinite(ourPrice) || !Number.isFinite(competitorAvg) || competitorAvg <= 0) {
-          return null
-        }
+      try {
+        const response = await axios.get('http://localhost:5000/api/recommendations', {
+          headers: {
+            Authorization: `Bearer ${effectiveAccessToken}`,
+          },
+          params: { limit: 3 },
+        })
 
-        const percentDiff = ((ourPrice - competitorAvg) / competitorAvg) * 100
-        const roundedAbs = Math.round(Math.abs(percentDiff))
+        const items = Array.isArray(response.data?.recommendations) ? response.data.recommendations : []
+        setRecommendations(
+          items.map((item) => ({
+            dish: item.dish_name,
+            suggestion: item.suggestion,
+            reason: item.reason,
+          })),
+        )
+      } catch (apiError) {
+        setRecommendations([])
+      }
+    }
 
-        if (percentDiff > 2) {
-          return {
-            dish: dish.dishName,
-            suggestion: `Reduce price by ${roundedAbs}%`,
-            reason: `Price is ${roundedAbs}% higher than competitor average`,
-            score: Math.abs(percentDiff),
-          }
-        }
-
-        if (percentDiff < -2) {
-          return {
-            dish: dish.dishName,
-            suggestion: `Increase price by ${roundedAbs}%`,
-            reason: `Currently priced ${roundedAbs}% below competitor average`,
-            score: Math.abs(percentDiff),
-          }
-        }
-
-        return {
-          dish: dish.dishName,
-          suggestion: 'Keep price unchanged',
-          reason: 'Price is competitive in the market',
-          score: 0,
-        }
-      })
-      .filter(Boolean)
-      .sort((a, b) => b.score - a.score)
-      .slice(0, 3)
-  }, [dishes])
+    fetchRecommendations()
+  }, [dishes, effectiveAccessToken])
 
   if (!recommendations.length) {
     return <p className="text-sm text-gray-500">No pricing recommendations available yet.</p>
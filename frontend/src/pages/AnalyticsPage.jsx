@@ -37,18 +37,19 @@ function buildFallbackTrendData(dishes, selectedDish) {
   }))
 }
 
-function getDifferencePercent(dish) {
-  const parsed = Number.parseFloat(dish.difference)
-
-  if (!Number.isNaN(parsed)) {
-    return parsed
-  }
-
-  if (!dish.competitorAvg) {
-    return 0
-  }
-
-  return ((dish.ourPrice - dish.competitorAvg) / dish.competitorAvg) * 100
+const INSIGHT_STYLES = {
+  higher: {
+    message: (dishName) => `${dishName}: Priced significantly above market`,
+    classes: 'border-red-300 bg-red-50/50',
+  },
+  lower: {
+    message: (dishName) => `${dishName}: Priced below competitors`,
+    classes: 'border-amber-300 bg-amber-50/50',
+  },
+  competitive: {
+    message: (dishName) => `${dishName}: Competitively positioned`,
+    classes: 'border-emerald-300 bg-emerald-50/50',
+  },
 }
 
 function AnalyticsPage() {
@@ -61,6 +62,7 @@ function AnalyticsPage() {
   const [priceTrendData, setPriceTrendData] = useState([])
   const [isTrendLoading, setIsTrendLoading] = useState(false)
   const [trendError, setTrendError] = useState('')
+  const [recommendationData, setRecommendationData] = useState(null)
   const effectiveAccessToken = accessToken || localStorage.getItem('access_token') || ''
 
   useEffect(() => {
@@ -78,50 +80,44 @@ function AnalyticsPage() {
     localStorage.setItem(ANALYTICS_TREND_SELECTION_KEY, selectedDishId)
   }, [selectedDishId])
 
-  const averageDifference = useMemo(() => {
-    if (dishes.length === 0) {
-      return 0
-    }
-
-    const totalDifference = dishes.reduce((sum, dish) => sum + getDifferencePercent(dish), 0)
-    return totalDifference / dishes.length
-  }, [dishes])
-
-  const highestPricedDish = useMemo(() => {
-    if (dishes.length === 0) {
-      return null
-    }
-
-    return dishes.reduce((highest, dish) => (dish.ourPrice > highest.ourPrice ? dish : highest), dishes[0])
-  }, [dishes])
+  useEffect(() => {
+    const fetchRecommendations = async () => {
+      if (!effectiveAccessToken) {
+        setRecommendationData(null)
+        return
+      }
 
-  const lowestPricedDish = useMemo(() => {
-    if (dishes.length === 0) {
-      return null
+      try {
+        const response = await axios.get('http://localhost:5000/api/recommendations', {
+          headers: {
+            Authorization: `Bearer ${effectiveAccessToken}`,
+          },
+        })
+        setRecommendationData(response.data || null)
+      } catch (apiError) {
+        setRecommendationData(null)
+      }
     }
 
-    return dishes.reduce((lowest, dish) => (dish.ourPrice < lowest.ourPrice ? dish : lowest), dishes[0])
-  }, [dishes])
+    fetchRecommendations()
+  }, [dishes, effectiveAccessToken])
 
-  const competitorUndercutPercent = useMemo(() => {
-    if (dishes.length === 0) {
-      return 0
-    }
-
-    const undercutCount = dishes.filter((dish) => dish.competitorAvg < dish.ourPrice).length
-    return (undercutCount / dishes.length) * 100
-  }, [dishes])
+  const recommendationSummary = recommendationData?.summary || null
+  const averageDifference = Number(recommendationSummary?.average_gap_percent || 0)
+  const highestPricedDish = recommendationSummary?.highest_priced_dish || null
+  const lowestPricedDish = recommendationSummary?.lowest_priced_dish || null
+  const competitorUndercutPercent = Number(recommendationSummary?.undercut_percent || 0)
 
   const kpis = useMemo(
     () => [
       { label: 'Average Price Difference', value: `${averageDifference.toFixed(1)}%` },
       {
         label: 'Highest Priced Dish',
-        value: highestPricedDish ? `${highestPricedDish.dishName} (₹${highestPricedDish.ourPrice})` : 'N/A',
+        value: highestPricedDish ? `${highestPricedDish.dish_name} (₹${highestPricedDish.our_price})` : 'N/A',
       },
       {
         label: 'Lowest Priced Dish',
-        value: lowestPricedDish ? `${lowestPricedDish.dishName} (₹${lowestPricedDish.ourPrice})` : 'N/A',
+        value: lowestPricedDish ? `${lowestPricedDish.dish_name} (₹${lowestPricedDish.our_price})` : 'N/A',
       },
       { label: 'Competitor Undercut %', value: `${competitorUndercutPercent.toFixed(0)}%` },
     ],
@@ -207,38 +203,20 @@ function AnalyticsPage() {
     [dishes],
   )
 
-  const aiInsights = useMemo(
-    () =>
-      dishes.map((dish) => {
-        const diff = getDifferencePercent(dish)
-
-        if (diff > 5) {
-          return {
-            id: dish.id,
-            status: 'higher',
-            message: `${dish.dishName}: Priced significantly above market`,
-            classes: 'border-red-300 bg-red-50/50',
-          }
-        }
+  const aiInsights = useMemo(() => {
+    const recommendations = Array.isArray(recommendationData?.recommendations) ? recommendationData.recommendations : []
 
-        if (diff < -5) {
-          return {
-            id: dish.id,
-            status: 'lower',
-            message: `${dish.dishName}: Priced below competitors`,
-            classes: 'border-amber-300 bg-amber-50/50',
-          }
-        }
+    return recommendations.map((item) => {
+      const style = INSIGHT_STYLES[item.position] || INSIGHT_STYLES.competitive
 
-        return {
-          id: dish.id,
-          status: 'competitive',
-          message: `${dish.dishName}: Competitively positioned`,
-          classes: 'border-emerald-300 bg-emerald-50/50',
-        }
-      }),
-    [dishes],
-  )
+      return {
+        id: item.dish_id,
+        status: item.position in INSIGHT_STYLES ? item.position : 'competitive',
+        message: style.message(item.dish_name),
+        classes: style.classes,
+      }
+    })
+  }, [recommendationData])
 
   const filteredInsights = useMemo(() => {
     if (insightFilter === 'all') {